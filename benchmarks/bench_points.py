@@ -0,0 +1,91 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark of bulk point extraction against the per-point path.
+
+    Run from blender:
+        blender -b --python benchmarks/bench_points.py -- [strokes] [points]
+"""
+
+import bpy      # type: ignore
+import numpy as np      # type: ignore
+
+from importlib import util
+from os import path
+import sys
+import time
+
+
+def load_addon():
+    """Import the add-on package from this repository."""
+
+    root = path.dirname(path.dirname(path.abspath(__file__)))
+    spec = util.spec_from_file_location(
+        'recorder',
+        path.join(root, '__init__.py'),
+        submodule_search_locations=[root]
+    )
+    module = util.module_from_spec(spec)
+    sys.modules['recorder'] = module
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def create_frame(stroke_count: int, point_count: int):
+    """Create a frame filled with random strokes."""
+
+    gpen = bpy.data.grease_pencils.new('bench_points')
+    frame = gpen.layers.new('bench').frames.new(1)
+    rng = np.random.default_rng(0)
+
+    for _ in range(stroke_count):
+        stroke = frame.strokes.new()
+        stroke.points.add(point_count)
+        co = rng.random(point_count * 3, dtype=np.float32)
+        stroke.points.foreach_set('co', co)
+
+    return frame
+
+
+def measure(func, frame, repeat: int) -> float:
+    """Get the best time of repeated calls in seconds."""
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(frame)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main(argv: list) -> None:
+    stroke_count = int(argv[0]) if len(argv) > 0 else 1000
+    point_count = int(argv[1]) if len(argv) > 1 else 100
+
+    points = load_addon().lib.points
+    frame = create_frame(stroke_count, point_count)
+
+    fast = measure(points.read_frame_points, frame, 5)
+    slow = measure(points.read_frame_points_slow, frame, 1)
+
+    print(f'strokes: { stroke_count }, points per stroke: { point_count }')
+    print(f'foreach_get: { fast * 1000:.2f} ms')
+    print(f'per point:   { slow * 1000:.2f} ms')
+    print(f'speedup:     { slow / fast:.1f}x')
+
+
+if __name__ == '__main__':
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    main(args)
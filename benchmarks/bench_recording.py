@@ -0,0 +1,259 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Benchmark of observers and recording on the fake bpy module.
+
+    Measures tick cost of observe_layers and observe_strokes, latency
+    of __new_record__ and memory used by a recording as layers and
+    strokes scale. Runs without blender:
+
+        python benchmarks/bench_recording.py --output results.json
+
+    Results are written into the temporary directory by default.
+"""
+
+from os import path
+import sys
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.insert(0, path.join(ROOT, 'benchmarks', 'fake_bpy'))
+
+import bpy      # type: ignore  # noqa: E402
+import bpy.app.timers as timers     # type: ignore  # noqa: E402
+import numpy as np      # type: ignore  # noqa: E402
+
+from importlib import util     # noqa: E402
+import argparse     # noqa: E402
+import json     # noqa: E402
+import os       # noqa: E402
+import platform     # noqa: E402
+import tempfile     # noqa: E402
+import time     # noqa: E402
+import tracemalloc      # noqa: E402
+
+
+def load_addon():
+    """Import and register the add-on package from this repository."""
+
+    # user directory is read by the add-on on import
+    os.environ.setdefault('USERPROFILE', tempfile.gettempdir())
+
+    spec = util.spec_from_file_location(
+        'recorder',
+        path.join(ROOT, '__init__.py'),
+        submodule_search_locations=[ROOT]
+    )
+    module = util.module_from_spec(spec)
+    sys.modules['recorder'] = module
+    spec.loader.exec_module(module)
+    module.register()
+
+    # observers are scheduled by the clock of fake timers
+    module.lib.scheduler.clock = lambda: timers.clock[0]
+
+    return module
+
+
+class Recording():
+    """Tracked Grease Pencil filled with random strokes."""
+
+    def __init__(self, lib, layer_count: int, stroke_count: int,
+                 point_count: int, storage: str = '') -> None:
+        self.rng = np.random.default_rng(0)
+        self.point_count = point_count
+
+        self.gpen = bpy.data.grease_pencils.new('bench_recording')
+        for index in range(layer_count):
+            frame = self.gpen.layers.new(f'layer{ index }').frames.new(1)
+            for _ in range(stroke_count):
+                self.add_stroke(frame)
+
+        settings = lib.data.record_settings
+        settings.use_storage = bool(storage)
+        settings.storage_path = storage
+
+        lib.data.start_tracking(self.gpen)
+        self.lib = lib
+        self.observer = lib.data.get_active_observer(self.gpen)
+
+    def add_stroke(self, frame) -> None:
+        stroke = frame.strokes.new()
+        stroke.points.add(self.point_count)
+        co = self.rng.random(self.point_count * 3, dtype=np.float32)
+        stroke.points.foreach_set('co', co)
+
+    def frame_observer(self, layer):
+        return self.observer.layer_observers[layer].active_frame
+
+    def close(self) -> None:
+        self.lib.data.stop_tracking(self.gpen)
+        self.lib.data.records.clear()
+        bpy.data.grease_pencils.remove(self.gpen)
+
+
+def best_time(func, repeat: int) -> float:
+    """Get the best time of repeated calls in seconds."""
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def bench_ticks(lib, layer_count: int, stroke_count: int,
+                point_count: int, repeat: int) -> dict:
+    """Measure ticks of observers which find no change."""
+
+    tracking = lib.tracking
+    recording = Recording(lib, layer_count, stroke_count, point_count)
+    observer = recording.observer
+    frame_observer = recording.frame_observer(recording.gpen.layers[0])
+
+    result = {
+        'layers': layer_count,
+        'strokes': stroke_count,
+        'points': point_count,
+        'observe_layers_us': best_time(
+            lambda: tracking.observe_layers(observer), repeat) * 1e6,
+        'observe_strokes_us': best_time(
+            lambda: tracking.observe_strokes(frame_observer), repeat) * 1e6
+    }
+
+    recording.close()
+    return result
+
+
+def bench_records(lib, layer_count: int, stroke_count: int,
+                  point_count: int, step_count: int, storage: str) -> dict:
+    """Record a stroke per step and measure latency and memory."""
+
+    tracemalloc.start()
+    recording = Recording(
+        lib,
+        layer_count,
+        stroke_count,
+        point_count,
+        storage
+    )
+    observer = recording.observer
+    base, _ = tracemalloc.get_traced_memory()
+
+    latencies = list()
+    new_record = observer.__new_record__
+
+    def timed_record(*args) -> None:
+        start = time.perf_counter()
+        new_record(*args)
+        latencies.append(time.perf_counter() - start)
+
+    for layer_observer in observer.layer_observers.values():
+        layer_observer.set_add_function(timed_record)
+
+    layers = recording.gpen.layers
+    for step in range(step_count):
+        frame_observer = recording.frame_observer(layers[step % len(layers)])
+        recording.add_stroke(frame_observer.get_frame())
+        lib.tracking.observe_strokes(frame_observer)
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies_us = np.array(latencies) * 1e6
+    store = observer.store
+    result = {
+        'layers': layer_count,
+        'strokes': stroke_count,
+        'points': point_count,
+        'steps': step_count,
+        'storage': bool(storage),
+        'new_record_us': {
+            'mean': float(latencies_us.mean()),
+            'median': float(np.median(latencies_us)),
+            'p95': float(np.percentile(latencies_us, 95)),
+            'max': float(latencies_us.max())
+        },
+        'memory_bytes': {
+            'traced': current - base,
+            'peak': peak - base,
+            'journal': observer.journal.memory_size(),
+            'store': store.memory_size() if store is not None else 0
+        }
+    }
+
+    recording.close()
+    return result
+
+
+def main(argv: list) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output',
+                        default=path.join(tempfile.gettempdir(),
+                                          'bench_recording.json'),
+                        help='path of the JSON results')
+    parser.add_argument('--layers', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--strokes', type=int, nargs='+',
+                        default=[10, 100, 1000])
+    parser.add_argument('--points', type=int, default=50)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--storage', action='store_true',
+                        help='write the recording log during recording')
+    args = parser.parse_args(argv)
+
+    lib = load_addon().lib
+    storage = tempfile.mkdtemp(prefix='bench_recording_') \
+        if args.storage else ''
+
+    ticks = list()
+    records = list()
+    for layer_count in args.layers:
+        for stroke_count in args.strokes:
+            ticks.append(bench_ticks(
+                lib,
+                layer_count,
+                stroke_count,
+                args.points,
+                args.repeat
+            ))
+            records.append(bench_records(
+                lib,
+                layer_count,
+                stroke_count,
+                args.points,
+                args.steps,
+                storage
+            ))
+            print(f'layers: { layer_count }, strokes: { stroke_count }, '
+                  f'tick: { ticks[-1]["observe_strokes_us"]:.1f} us, '
+                  f'record: { records[-1]["new_record_us"]["median"]:.1f} us')
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'ticks': ticks,
+        'records': records
+    }
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+
+    print(f'Results saved to { args.output }')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,37 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Minimal stand-in for blender's bpy module.
+
+    Emulates the parts of the API used by the add-on, so observers and
+    recording can be measured outside of blender. Put the fake_bpy
+    directory on sys.path before importing the add-on.
+"""
+
+from . import (  # noqa: F401
+    app,
+    msgbus,
+    ops,
+    path,
+    props,
+    types,
+    utils
+)
+from .types import (
+    Context,
+    Data
+)
+
+
+context = Context()
+data = Data()
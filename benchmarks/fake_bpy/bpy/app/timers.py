@@ -0,0 +1,56 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Timers driven by a deterministic clock.
+
+    Time does not pass on its own, run() advances the clock and calls
+    all timers which become due in order of their due times.
+"""
+
+
+registered = dict()         # function -> due time
+clock = [0.0]
+
+
+def register(function, first_interval: float = 0.0,
+             persistent: bool = False) -> None:
+    registered[function] = clock[0] + first_interval
+
+
+def unregister(function) -> None:
+    if function not in registered:
+        raise ValueError('Error: function is not registered')
+    del registered[function]
+
+
+def is_registered(function) -> bool:
+    return function in registered
+
+
+def run(until: float) -> None:
+    """Advance the clock to until and call timers due meanwhile."""
+
+    while registered:
+        function, due = min(registered.items(), key=lambda item: item[1])
+        if due > until:
+            break
+
+        clock[0] = max(clock[0], due)
+        interval = function()
+        if function in registered:
+            if interval is None:
+                del registered[function]
+            else:
+                registered[function] = clock[0] + interval
+
+    clock[0] = until
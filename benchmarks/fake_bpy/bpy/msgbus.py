@@ -0,0 +1,31 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+subscriptions = list()
+
+
+def subscribe_rna(key, owner, args, notify, options=set()) -> None:
+    subscriptions.append((key, owner, args, notify))
+
+
+def clear_by_owner(owner) -> None:
+    subscriptions[:] = [item for item in subscriptions if item[1] is not owner]
+
+
+def publish_rna(key) -> None:
+    """Notify subscribers of key, blender does it on property change."""
+
+    for subscribed_key, _, args, notify in list(subscriptions):
+        if subscribed_key == key:
+            notify(*args)
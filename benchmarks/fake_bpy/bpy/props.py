@@ -0,0 +1,42 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from .types import Property
+
+
+def IntProperty(**kwargs):
+    return Property('int', kwargs)
+
+
+def FloatProperty(**kwargs):
+    return Property('float', kwargs)
+
+
+def BoolProperty(**kwargs):
+    return Property('bool', kwargs)
+
+
+def StringProperty(**kwargs):
+    return Property('string', kwargs)
+
+
+def EnumProperty(**kwargs):
+    return Property('enum', kwargs)
+
+
+def PointerProperty(**kwargs):
+    return Property('pointer', kwargs)
+
+
+def CollectionProperty(**kwargs):
+    return Property('collection', kwargs)
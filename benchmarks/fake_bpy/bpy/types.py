@@ -0,0 +1,463 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Fake blender types.
+
+    Properties declared on classes are created per instance, collections
+    are plain lists with the methods of blender collections. Stroke points
+    are stored in float arrays accessed through foreach_get/foreach_set.
+"""
+
+
+from array import array
+
+
+DEFAULTS = {
+    'int': 0,
+    'float': 0.0,
+    'bool': False,
+    'string': '',
+    'pointer': None,
+    'enum': ''
+}
+
+
+class Property():
+    """Property descriptor created by functions of bpy.props."""
+
+    def __init__(self, kind: str, options: dict) -> None:
+        self.kind = kind
+        self.options = options
+        self.key = f'_property_{ id(self) }'
+
+    def make(self):
+        if self.kind == 'collection':
+            return PropertyCollection(self.options['type'])
+        return self.options.get('default', DEFAULTS[self.kind])
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        values = instance.__dict__
+        if self.key not in values:
+            values[self.key] = self.make()
+        return values[self.key]
+
+    def __set__(self, instance, value) -> None:
+        instance.__dict__[self.key] = value
+
+
+class PropertyCollection(list):
+    def __init__(self, item_type) -> None:
+        super().__init__()
+        self.item_type = item_type
+
+    def add(self):
+        item = self.item_type()
+        self.append(item)
+        return item
+
+    def remove(self, index: int) -> None:
+        if not isinstance(index, int):
+            raise TypeError('remove expects an index')
+        del self[index]
+
+    def move(self, from_index: int, to_index: int) -> None:
+        self.insert(to_index, self.pop(from_index))
+
+
+class bpy_struct():
+    def __init__(self, *args, **kwargs) -> None:
+        for cls in reversed(type(self).__mro__):
+            for name, value in getattr(cls, '__annotations__', {}).items():
+                if isinstance(value, Property):
+                    self.__dict__[name] = value.make()
+
+    def as_pointer(self) -> int:
+        return id(self)
+
+    def path_resolve(self, path: str, coerce: bool = True):
+        if coerce:
+            return getattr(self, path)
+        # message bus keys of properties
+        return (self, path)
+
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class Operator(bpy_struct):
+    def report(self, kind: set, message: str) -> None:
+        self.reports = getattr(self, 'reports', list())
+        self.reports.append((kind, message))
+
+
+class Panel(bpy_struct):
+    pass
+
+
+class UIList(bpy_struct):
+    pass
+
+
+class Object(bpy_struct):
+    def __init__(self, name: str = 'Object') -> None:
+        super().__init__()
+        self.name = name
+        self.type = 'EMPTY'
+        self.hide_render = False
+
+
+class Material(bpy_struct):
+    pass
+
+
+class GPencilStrokePoints():
+    sizes = {'co': 3, 'pressure': 1, 'strength': 1, 'vertex_color': 4}
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.attributes = {name: array('f') for name in self.sizes}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return GPencilStrokePoint(self, index)
+
+    def __iter__(self):
+        return (GPencilStrokePoint(self, i) for i in range(self.count))
+
+    def add(self, count: int) -> None:
+        self.count += count
+        for name, size in self.sizes.items():
+            default = 1.0 if name in ('pressure', 'strength') else 0.0
+            self.attributes[name].extend([default] * (count * size))
+
+    def foreach_get(self, name: str, sequence) -> None:
+        sequence[:] = self.attributes[name]
+
+    def foreach_set(self, name: str, sequence) -> None:
+        self.attributes[name] = array('f', sequence)
+
+
+class GPencilStrokePoint():
+    def __init__(self, points: GPencilStrokePoints, index: int) -> None:
+        self.points = points
+        self.index = index
+
+    @property
+    def co(self) -> tuple:
+        start = self.index * 3
+        return tuple(self.points.attributes['co'][start:start + 3])
+
+    @co.setter
+    def co(self, value) -> None:
+        start = self.index * 3
+        self.points.attributes['co'][start:start + 3] = array('f', value)
+
+    @property
+    def pressure(self) -> float:
+        return self.points.attributes['pressure'][self.index]
+
+    @property
+    def strength(self) -> float:
+        return self.points.attributes['strength'][self.index]
+
+
+class GPencilStroke(bpy_struct):
+    copied = (
+        'material_index',
+        'line_width',
+        'hardness',
+        'use_cyclic',
+        'display_mode',
+        'vertex_color_fill'
+    )
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.points = GPencilStrokePoints()
+        self.material_index = 0
+        self.line_width = 10
+        self.hardness = 1.0
+        self.use_cyclic = False
+        self.display_mode = '3DSPACE'
+        self.vertex_color_fill = (0.0, 0.0, 0.0, 0.0)
+
+
+class GPencilStrokes(list):
+    def foreach_get(self, name: str, sequence) -> None:
+        values = list()
+        for stroke in self:
+            value = getattr(stroke, name)
+            if isinstance(value, tuple):
+                values.extend(value)
+            else:
+                values.append(value)
+        sequence[:] = values
+
+    def new(self) -> GPencilStroke:
+        stroke = GPencilStroke()
+        self.append(stroke)
+        return stroke
+
+    def remove(self, stroke: GPencilStroke) -> None:
+        for index, item in enumerate(self):
+            if item is stroke:
+                del self[index]
+                return
+        raise ValueError('Stroke not found')
+
+
+class GPencilFrame(bpy_struct):
+    def __init__(self, frame_number: int = 0) -> None:
+        super().__init__()
+        self.frame_number = frame_number
+        self.strokes = GPencilStrokes()
+
+
+class GPencilFrames(list):
+    def __add_frame__(self, frame: GPencilFrame) -> GPencilFrame:
+        self.append(frame)
+        self.sort(key=lambda item: item.frame_number)
+        return frame
+
+    def new(self, frame_number: int, active: bool = False) -> GPencilFrame:
+        if any(frame.frame_number == frame_number for frame in self):
+            raise RuntimeError(f'Frame { frame_number } already exists')
+        return self.__add_frame__(GPencilFrame(frame_number))
+
+    def copy(self, source: GPencilFrame) -> GPencilFrame:
+        """Copy frame onto the first free frame number after it."""
+
+        number = source.frame_number
+        while any(frame.frame_number == number for frame in self):
+            number += 1
+
+        frame = GPencilFrame(number)
+        for stroke in source.strokes:
+            new = frame.strokes.new()
+            for name in GPencilStroke.copied:
+                setattr(new, name, getattr(stroke, name))
+            new.points.count = stroke.points.count
+            new.points.attributes = {
+                name: array('f', values)
+                for name, values in stroke.points.attributes.items()
+            }
+
+        return self.__add_frame__(frame)
+
+    def remove(self, frame: GPencilFrame) -> None:
+        for index, item in enumerate(self):
+            if item is frame:
+                del self[index]
+                return
+        raise ValueError('Frame not found')
+
+
+class GPencilLayer(bpy_struct):
+    def __init__(self, info: str) -> None:
+        super().__init__()
+        self.info = info
+        self.frames = GPencilFrames()
+        self.hide = False
+        self.opacity = 1.0
+
+    @property
+    def active_frame(self):
+        """Get the last frame at or before the current frame."""
+
+        current = contexts[0].scene.frame_current
+        active = None
+        for frame in self.frames:
+            if frame.frame_number <= current:
+                active = frame
+        return active
+
+
+class GreasePencilLayers(list):
+    def new(self, name: str, set_active: bool = True) -> GPencilLayer:
+        layer = GPencilLayer(name)
+        self.append(layer)
+        return layer
+
+    def remove(self, layer: GPencilLayer) -> None:
+        for index, item in enumerate(self):
+            if item is layer:
+                del self[index]
+                return
+        raise ValueError('Layer not found')
+
+    def move(self, layer: GPencilLayer, direction: str) -> None:
+        index = self.index(layer)
+        target = index - 1 if direction == 'UP' else index + 1
+        if 0 <= target < len(self):
+            self[index], self[target] = self[target], self[index]
+
+
+class ID(bpy_struct):
+    def __init__(self, name: str = '') -> None:
+        super().__init__()
+        self.name = name
+
+    @property
+    def original(self):
+        return self
+
+
+class GreasePencil(ID):
+    def __init__(self, name: str = 'GPencil') -> None:
+        super().__init__(name)
+        self.layers = GreasePencilLayers()
+        self.materials = list()
+
+
+class Camera(ID):
+    pass
+
+
+class ImageSettings():
+    def __init__(self) -> None:
+        self.file_format = 'PNG'
+        self.color_mode = 'RGBA'
+
+
+class FFmpegSettings():
+    def __init__(self) -> None:
+        self.format = 'MPEG4'
+        self.codec = 'H264'
+        self.constant_rate_factor = 'MEDIUM'
+        self.ffmpeg_preset = 'GOOD'
+
+
+class RenderSettings():
+    def __init__(self) -> None:
+        self.filepath = ''
+        self.fps = 24
+        self.resolution_x = 1920
+        self.resolution_y = 1080
+        self.resolution_percentage = 100
+        self.engine = 'BLENDER_EEVEE'
+        self.film_transparent = False
+        self.image_settings = ImageSettings()
+        self.ffmpeg = FFmpegSettings()
+
+
+class ViewSettings():
+    def __init__(self) -> None:
+        self.view_transform = 'Filmic'
+        self.look = 'None'
+        self.exposure = 0.0
+        self.gamma = 1.0
+
+
+class ImageStrip():
+    def __init__(self, name: str, filepath: str, frame_start: int) -> None:
+        self.name = name
+        self.filepath = filepath
+        self.frame_start = frame_start
+        self.frame_final_duration = 1
+        self.elements = [filepath]
+
+
+class SequenceStrips(list):
+    def new_image(self, name: str, filepath: str, frame_start: int,
+                  channel: int) -> ImageStrip:
+        strip = ImageStrip(name, filepath, frame_start)
+        self.append(strip)
+        return strip
+
+
+class SequenceEditor():
+    def __init__(self) -> None:
+        self.sequences = SequenceStrips()
+
+
+class Scene(ID):
+    def __init__(self, name: str = 'Scene') -> None:
+        super().__init__(name)
+        self.frame_current = 1
+        self.frame_start = 1
+        self.frame_end = 250
+        self.render = RenderSettings()
+        self.camera = None
+        self.world = None
+        self.objects = list()
+        self.view_settings = ViewSettings()
+        self.sequence_editor = None
+
+    def sequence_editor_create(self) -> SequenceEditor:
+        if self.sequence_editor is None:
+            self.sequence_editor = SequenceEditor()
+        return self.sequence_editor
+
+    def sequence_editor_clear(self) -> None:
+        self.sequence_editor = None
+
+    def frame_set(self, frame: int) -> None:
+        self.frame_current = frame
+
+
+class Context():
+    def __init__(self) -> None:
+        self.scene = Scene()
+        self.selected_objects = list()
+        self.object = None
+        self.area = None
+        self.window = None
+        self.window_manager = None
+        contexts[0] = self
+
+
+class BlendDataGreasePencils(list):
+    def new(self, name: str) -> GreasePencil:
+        gpen = GreasePencil(name)
+        self.append(gpen)
+        return gpen
+
+    def remove(self, gpen: GreasePencil) -> None:
+        for index, item in enumerate(self):
+            if item is gpen:
+                del self[index]
+                return
+        raise ValueError('Grease Pencil not found')
+
+
+class BlendDataScenes(list):
+    def new(self, name: str) -> Scene:
+        scene = Scene(name)
+        self.append(scene)
+        return scene
+
+    def remove(self, scene: Scene) -> None:
+        self[:] = [item for item in self if item is not scene]
+
+
+class Data():
+    def __init__(self) -> None:
+        self.filepath = ''
+        self.screens = dict()
+        self.grease_pencils = BlendDataGreasePencils()
+        self.scenes = BlendDataScenes()
+
+
+# context used by layers to find the current frame
+contexts = [None]
@@ -0,0 +1,25 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+registered = list()
+
+
+def register_class(cls) -> None:
+    registered.append(cls)
+
+
+def unregister_class(cls) -> None:
+    if cls not in registered:
+        raise RuntimeError(f'{ cls.__name__ } is not registered')
+    registered.remove(cls)
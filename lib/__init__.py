@@ -27,13 +27,16 @@ from .utils import (
     log
 )
 from . import database
+from .scheduler import scheduler
 from .observers import (
     GPenObserver,
     LayerObserver
 )
 from .tracking import (
     ChangeGroup,
-    LayerChangesGroup
+    LayerChangesGroup,
+    register_handlers,
+    unregister_handlers
 )
 
 
@@ -46,6 +49,7 @@ __all__ = [
     'get_timestamp',
     'log',
     'data',
+    'scheduler',
     'GPenObserver',
     'LayerObserver',
     'ChangeGroup'
@@ -59,6 +63,7 @@ classes = [
 
 def register():
     register_classes(classes)
+    register_handlers()
 
     GreasePencil.layer_index = IntProperty(
         name='layers_index',
@@ -72,6 +77,10 @@ def register():
 
 
 def unregister():
+    scheduler.clear()
+    data.cancel_render()
+    data.store_data()
+    unregister_handlers()
     unregister_classes(classes)
 
     try:
@@ -0,0 +1,459 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Columnar file of a recording opened by memory mapping.
+
+    The file is built from a recording log. Instead of records, it holds
+    one contiguous array per column, so columns are read as NumPy views
+    into the mapped file and any step is found without decoding records:
+
+        header:   magic (6 bytes), version (u16), section count (u16)
+        sections: name (8 bytes), offset (u64), size in bytes (u64)
+
+    Sections are aligned to 64 bytes. Strokes are kept in order of
+    addition, points of stroke i are points[i]:points[i + 1] of point
+    columns. A stroke is present after step s when its added step is
+    at most s and its removed step is greater than s. Layer names and
+    texts of changes are strings separated by zero bytes.
+
+    Steps restart in every recording session of a log, so steps of a
+    session are moved after the last step of the previous one, which
+    holds its first step. Strokes left by the previous session are
+    removed on that step, as every session starts by recording all
+    strokes of the drawing.
+
+    All numbers are little-endian.
+"""
+
+
+import numpy as np      # type: ignore
+
+from .storage import (
+    KIND_CHANGE,
+    KIND_REMOVE,
+    KIND_SESSION,
+    KIND_STROKE,
+    ChangeRecord,
+    RecordingLogReader,
+    StrokeRecord
+)
+
+from collections import defaultdict, deque
+from typing import Union
+import mmap
+import os
+import struct
+
+
+MAGIC = b'ARCOL\x00'
+VERSION = 2
+
+HEADER = struct.Struct('<6sHH')
+SECTION = struct.Struct('<8sQQ')
+ALIGNMENT = 64
+
+# removed step of strokes which are never removed
+NEVER = 0xFFFFFFFF
+
+# section name -> dtype and number of values per row
+COLUMNS = {
+    # points
+    'co': ('<f4', 3),
+    'pressure': ('<f4', 1),
+    'strength': ('<f4', 1),
+    # strokes
+    'points': ('<i8', 1),       # stroke count + 1 point offsets
+    'added': ('<u4', 1),
+    'removed': ('<u4', 1),
+    'layer': ('<u2', 1),
+    'material': ('<i4', 1),
+    'hash': ('<u4', 1),
+    'width': ('<i4', 1),
+    'hardness': ('<f4', 1),
+    'cyclic': ('u1', 1),
+    # changes
+    'steps': ('<u4', 1),
+    'times': ('<f8', 1),
+    'clayer': ('<u2', 1),
+    # sessions
+    'sessions': ('<u4', 1),     # first step
+    'origins': ('<i4', 1),      # frame of step 0 in the timeline
+    # strings
+    'layers': ('u1', 1),
+    'texts': ('u1', 1),
+    'icons': ('u1', 1),
+}
+
+
+def columnar_path(directory: str, name: str) -> str:
+    """Get path of the columnar file for Grease Pencil of a given name."""
+
+    safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)
+    return os.path.join(directory, f'{ safe_name }.arcol')
+
+
+def columnar_version(path: str) -> int:
+    """Get version of a columnar file, 0 if it cannot be read."""
+
+    try:
+        with open(path, 'rb') as columnar_file:
+            magic, version, _ = HEADER.unpack(
+                columnar_file.read(HEADER.size)
+            )
+    except (OSError, struct.error):
+        return 0
+
+    return version if magic == MAGIC else 0
+
+
+def aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def join_strings(strings: list) -> bytes:
+    return b'\x00'.join(text.encode('utf-8') for text in strings)
+
+
+class LogColumns():
+    """Metadata of strokes and changes of a recording log.
+
+        Gathered in one pass over the log, point data stay in the log.
+        Removed strokes are paired with the oldest present stroke with
+        the same key in the same layer. Steps are moved after steps of
+        previous sessions.
+    """
+
+    def __init__(self, reader: RecordingLogReader) -> None:
+        self.offsets: list = list()         # log offsets of strokes
+        self.layer_names: dict[str, int] = dict()
+        self.point_count = 0
+        self.sessions = [0]
+        self.origins = [0]
+        strokes = defaultdict(list)
+        changes = defaultdict(list)
+        present: dict[tuple, deque] = defaultdict(deque)
+        base = 0                            # first step of the session
+        last = -1                           # last step of the log
+
+        for offset in reader.index():
+            kind = reader.kind(offset)
+            if kind == KIND_SESSION:
+                record = reader.decode(offset)
+                if last < 0:
+                    # nothing has been recorded before the first session
+                    self.origins[0] = record.origin
+                    continue
+
+                base = last + 1
+                for indices in present.values():
+                    for index in indices:
+                        strokes['removed'][index] = base
+                present.clear()
+                self.sessions.append(base)
+                self.origins.append(record.origin)
+                last = base
+            elif kind == KIND_STROKE:
+                record = reader.decode(offset)
+                layer = self.__layer__(record.layer)
+                step = base + record.step
+                last = max(last, step)
+                present[layer, record.key].append(len(self.offsets))
+                self.offsets.append(offset)
+                self.point_count += record.key[0]
+                strokes['added'].append(step)
+                strokes['removed'].append(NEVER)
+                strokes['layer'].append(layer)
+                strokes['material'].append(record.key[1])
+                strokes['hash'].append(record.key[2])
+                strokes['width'].append(record.line_width)
+                strokes['hardness'].append(record.hardness)
+                strokes['cyclic'].append(record.use_cyclic)
+            elif kind == KIND_REMOVE:
+                record = reader.decode(offset)
+                layer = self.__layer__(record.layer)
+                indices = present.get((layer, record.key))
+                if indices:
+                    strokes['removed'][indices.popleft()] = \
+                        base + record.step
+            elif kind == KIND_CHANGE:
+                record = reader.decode(offset)
+                step = base + record.step
+                last = max(last, step)
+                changes['steps'].append(step)
+                changes['times'].append(record.time)
+                changes['clayer'].append(self.__layer__(record.layer))
+                changes['texts'].append(record.text)
+                changes['icons'].append(record.icon)
+
+        # strokes are searched by their added step
+        order = np.argsort(strokes['added'], kind='stable')
+        self.offsets = [self.offsets[index] for index in order]
+        self.strokes = {
+            name: np.asarray(values)[order]
+            for name, values in strokes.items()
+        }
+        self.changes = changes
+
+    def __layer__(self, name: str) -> int:
+        return self.layer_names.setdefault(name, len(self.layer_names))
+
+    def sections(self) -> dict:
+        """Get sizes in bytes of all sections."""
+
+        stroke_count = len(self.offsets)
+        change_count = len(self.changes['steps'])
+        rows = {
+            'co': self.point_count,
+            'pressure': self.point_count,
+            'strength': self.point_count,
+            'points': stroke_count + 1,
+            'steps': change_count,
+            'times': change_count,
+            'clayer': change_count,
+            'sessions': len(self.sessions),
+            'origins': len(self.origins),
+            'layers': len(join_strings(list(self.layer_names))),
+            'texts': len(join_strings(self.changes['texts'])),
+            'icons': len(join_strings(self.changes['icons'])),
+        }
+        sizes = dict()
+        for name, (dtype, width) in COLUMNS.items():
+            count = rows.get(name, stroke_count)
+            sizes[name] = count * width * np.dtype(dtype).itemsize
+
+        return sizes
+
+
+def write_columnar(reader: RecordingLogReader, path: str) -> None:
+    """Write columnar file of a recording log.
+
+        The file is allocated at its full size and columns are filled
+        through a writable mapping, so point data are copied straight
+        from the log without being gathered in memory. The file is
+        written under a temporary name and replaced at the end.
+    """
+
+    columns = LogColumns(reader)
+    sizes = columns.sections()
+
+    offset = aligned(HEADER.size + SECTION.size * len(sizes))
+    table = list()
+    for name, size in sizes.items():
+        table.append((name, offset, size))
+        offset = aligned(offset + size)
+    file_size = offset
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w+b') as columnar_file:
+        columnar_file.truncate(file_size)
+        with mmap.mmap(columnar_file.fileno(), file_size) as buffer:
+            HEADER.pack_into(buffer, 0, MAGIC, VERSION, len(table))
+            views = dict()
+            for index, (name, offset, size) in enumerate(table):
+                SECTION.pack_into(
+                    buffer,
+                    HEADER.size + index * SECTION.size,
+                    name.encode(),
+                    offset,
+                    size
+                )
+                dtype = np.dtype(COLUMNS[name][0])
+                views[name] = np.frombuffer(
+                    buffer,
+                    dtype,
+                    size // dtype.itemsize,
+                    offset
+                )
+
+            for name, values in columns.strokes.items():
+                views[name][:] = values
+            for name in ('steps', 'times', 'clayer'):
+                views[name][:] = columns.changes[name]
+            views['sessions'][:] = columns.sessions
+            views['origins'][:] = columns.origins
+            views['layers'][:] = np.frombuffer(
+                join_strings(list(columns.layer_names)), np.uint8)
+            for name in ('texts', 'icons'):
+                views[name][:] = np.frombuffer(
+                    join_strings(columns.changes[name]), np.uint8)
+
+            points = views['points']
+            co = views['co'].reshape(-1, 3)
+            points[0] = 0
+            start = 0
+            for index, log_offset in enumerate(columns.offsets):
+                record = reader.decode(log_offset)
+                end = start + len(record.pressure)
+                co[start:end] = record.co
+                views['pressure'][start:end] = record.pressure
+                views['strength'][start:end] = record.strength
+                points[index + 1] = end
+                start = end
+
+            # views have to be released before the mapping is closed
+            del views, points, co
+            buffer.flush()
+
+    os.replace(temp_path, path)
+
+
+class ColumnarRecording():
+    """Reader of a columnar file.
+
+        The file is memory-mapped, columns are read-only NumPy views into
+        the mapping, so opening the file and reading any step costs only
+        the pages which are touched.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map: Union[mmap.mmap, None] = None
+        self.columns: dict[str, np.ndarray] = dict()
+
+        try:
+            self.map = mmap.mmap(
+                self.file.fileno(),
+                0,
+                access=mmap.ACCESS_READ
+            )
+            magic, version, count = HEADER.unpack_from(self.map, 0)
+        except (ValueError, struct.error):
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            # older files are rebuilt from their logs
+            self.close()
+            raise ValueError(f'{ path } is not a supported columnar file.')
+
+        for index in range(count):
+            name, offset, size = SECTION.unpack_from(
+                self.map,
+                HEADER.size + index * SECTION.size
+            )
+            name = name.rstrip(b'\x00').decode()
+            if name not in COLUMNS:
+                continue        # sections of newer versions
+
+            dtype, width = COLUMNS[name]
+            column = np.frombuffer(
+                self.map,
+                dtype,
+                size // np.dtype(dtype).itemsize,
+                offset
+            )
+            self.columns[name] = column.reshape(-1, 3) if width == 3 \
+                else column
+
+        self.layer_names = self.__strings__('layers')
+
+    def __len__(self) -> int:
+        return len(self.columns['added'])
+
+    def __strings__(self, name: str) -> list:
+        text = self.columns[name].tobytes().decode('utf-8', 'replace')
+        return text.split('\x00')
+
+    def close(self) -> None:
+        """Close the file, views of columns must be released before."""
+
+        self.columns.clear()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def step_count(self) -> int:
+        """Get number of the last recorded step."""
+
+        last = 0
+        for name in ('added', 'steps'):
+            if len(self.columns[name]):
+                last = max(last, int(self.columns[name].max()))
+
+        return last
+
+    def session_steps(self, index: int = -1) -> tuple:
+        """Get first and last step of a session, the latest by default.
+
+            Files without sessions hold a single session.
+        """
+
+        sessions = self.columns.get('sessions')
+        if sessions is None or not len(sessions):
+            return 0, self.step_count()
+
+        index = range(len(sessions))[index]
+        if index + 1 < len(sessions):
+            last = int(sessions[index + 1]) - 1
+        else:
+            last = self.step_count()
+
+        return int(sessions[index]), last
+
+    def stroke(self, index: int) -> StrokeRecord:
+        """Get stroke at index with views of its point data."""
+
+        columns = self.columns
+        start, end = columns['points'][index:index + 2]
+        return StrokeRecord(
+            int(columns['added'][index]),
+            self.layer_names[columns['layer'][index]],
+            (int(end - start), int(columns['material'][index]),
+             int(columns['hash'][index])),
+            int(columns['width'][index]),
+            float(columns['hardness'][index]),
+            bool(columns['cyclic'][index]),
+            columns['co'][start:end],
+            columns['pressure'][start:end],
+            columns['strength'][start:end]
+        )
+
+    def strokes_at(self, step: int, layer: Union[str, None] = None
+                   ) -> np.ndarray:
+        """Get indices of strokes present after step, in order of addition.
+
+            Strokes are sorted by added step, so only strokes added up to
+            the step are tested.
+        """
+
+        columns = self.columns
+        count = int(np.searchsorted(columns['added'], step, side='right'))
+        present = columns['removed'][:count] > step
+        if layer is not None:
+            if layer not in self.layer_names:
+                return np.empty(0, dtype=np.intp)
+            present &= columns['layer'][:count] \
+                == self.layer_names.index(layer)
+
+        return np.flatnonzero(present)
+
+    def changes(self) -> list:
+        """Get records of all changes."""
+
+        columns = self.columns
+        texts = self.__strings__('texts')
+        icons = self.__strings__('icons')
+        return [
+            ChangeRecord(int(step), float(time),
+                         self.layer_names[layer], text, icon)
+            for step, time, layer, text, icon in zip(
+                columns['steps'],
+                columns['times'],
+                columns['clayer'],
+                texts,
+                icons
+            )
+        ]
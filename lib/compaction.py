@@ -0,0 +1,163 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Timing of recorded steps in the exported video.
+
+    Recording produces one step per detected change. Compaction maps
+    a frame budget onto the steps, so the length of the video and the
+    number of renders follow the budget instead of the change count.
+    Real-time playback maps the video onto recorded times of changes.
+"""
+
+
+import numpy as np      # type: ignore
+
+from .journal import MODIFIED
+
+
+# modification of a stroke changes less of the drawing than a new stroke
+MODIFIED_WEIGHT = 0.5
+# weight of changes without strokes, such as changes of layers
+LAYER_WEIGHT = 1.0
+# steps changing less than this are near-duplicates of their neighbours,
+# a single modified stroke weighs more
+MIN_WEIGHT = MODIFIED_WEIGHT / 2
+
+
+def step_weights(journals: list, step_count: int) -> np.ndarray:
+    """Get amount of change of every step from journals of observers.
+
+        Weight of a change is the number of changed strokes, modified
+        strokes count only partially. Changes of layers do not change
+        strokes, they count as a single stroke. Index 0 belongs to step 1.
+    """
+
+    weights = np.zeros(step_count + 1, dtype=np.float64)
+    for journal in journals:
+        if not len(journal):
+            continue
+
+        steps = journal.column('steps').astype(np.intp)
+        sizes = journal.column('sizes').astype(np.float64)
+        sizes[sizes == 0] = LAYER_WEIGHT
+        sizes[journal.column('kinds') == MODIFIED] *= MODIFIED_WEIGHT
+        valid = steps <= step_count
+        np.add.at(weights, steps[valid], sizes[valid])
+
+    return weights[1:]
+
+
+def compact_steps(weights: np.ndarray, budget: int,
+                  change_weight: float = 0.5) -> np.ndarray:
+    """Select step shown on every output frame.
+
+        Output frames are spread evenly over progress of the recording,
+        which blends the share of all changes done so far with the share
+        of steps done so far by change_weight. Consecutive small changes
+        are merged, as they hardly move the progress, and near-duplicate
+        steps are never shown. Frames may repeat a step, so the result
+        has exactly budget frames. Steps are numbered from 1.
+    """
+
+    step_count = len(weights)
+    if step_count == 0 or budget <= 0:
+        return np.empty(0, dtype=np.intp)
+    if budget >= step_count:
+        # every step is shown, repeated evenly to fill the budget
+        return np.arange(budget) * step_count // budget + 1
+
+    total = weights.sum()
+    by_steps = np.arange(1, step_count + 1) / step_count
+    if total > 0:
+        by_weight = np.cumsum(weights) / total
+        progress = change_weight * by_weight + (1 - change_weight) * by_steps
+    else:
+        progress = by_steps
+
+    targets = np.arange(1, budget + 1) / budget
+    selected = np.searchsorted(progress, targets - 1e-12)
+
+    # move near-duplicate steps onto the next real change
+    eligible = np.flatnonzero(weights >= MIN_WEIGHT)
+    eligible = np.append(eligible, step_count - 1)
+    selected = eligible[np.searchsorted(eligible, selected)]
+
+    return selected + 1
+
+
+def step_times(journals: list, step_count: int) -> np.ndarray:
+    """Get time of every step in seconds since the first step.
+
+        Index 0 belongs to step 1. Steps missing in the journals take
+        the time of the previous step.
+    """
+
+    times = np.full(step_count + 1, -1, dtype=np.int64)
+    for journal in journals:
+        if not len(journal):
+            continue
+
+        steps = journal.column('steps').astype(np.intp)
+        valid = steps <= step_count
+        np.maximum.at(times, steps[valid], journal.column('timestamps')[valid])
+
+    times = times[1:]
+    known = times >= 0
+    if not known.any():
+        return np.zeros(step_count)
+
+    # fill missing steps by the previous known time
+    positions = np.where(known, np.arange(step_count), 0)
+    np.maximum.accumulate(positions, out=positions)
+    times = times[positions]
+    times = np.where(times >= 0, times, times[known][0])
+
+    return (times - times[0]) / 1e9
+
+
+def realtime_starts(times: np.ndarray, speed: float = 1.0,
+                    max_gap: float = np.inf) -> np.ndarray:
+    """Get start of every step in seconds of the video.
+
+        Time between steps is divided by speed and clamped to max_gap
+        seconds of the video, so idle pauses do not stall the video.
+    """
+
+    if len(times) == 0:
+        return np.empty(0)
+
+    gaps = np.minimum(np.diff(times) / speed, max_gap)
+    return np.concatenate(([0.0], np.cumsum(gaps)))
+
+
+def realtime_steps(times: np.ndarray, fps: int, speed: float = 1.0,
+                   max_gap: float = np.inf) -> np.ndarray:
+    """Select step shown on every output frame to follow real time.
+
+        Steps are started by realtime_starts, steps shorter than one
+        frame are skipped. Steps are numbered from 1.
+    """
+
+    if len(times) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    starts = realtime_starts(times, speed, max_gap)
+
+    # the last step is shown for at least one frame
+    frame_count = int(np.ceil(starts[-1] * fps)) + 1
+    frame_times = np.arange(frame_count) / fps
+
+    steps = np.searchsorted(starts, frame_times + 1e-9, side='right')
+    steps[-1] = len(times)
+
+    return steps
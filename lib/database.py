@@ -12,12 +12,47 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import bpy                              # type: ignore
+import numpy as np                      # type: ignore
 from bpy.types import GreasePencil     # type: ignore
 
-from .observers import GPenObserver
+from .observers import (
+    GPenObserver,
+    StepCounter
+)
+from .columnar import (
+    VERSION as COLUMNAR_VERSION,
+    columnar_path,
+    columnar_version,
+    write_columnar,
+    ColumnarRecording
+)
+from .compaction import (
+    compact_steps,
+    realtime_steps,
+    step_times,
+    step_weights
+)
+from .encoder import (
+    CODECS,
+    QUALITIES
+)
+from .frame_render import FrameRender
+from .render_cache import RenderCache
+from .render_job import RenderJob
+from .scheduler import scheduler
+from .storage import (
+    log_name,
+    log_path,
+    RecordingLog,
+    RecordingLogReader
+)
+from .utils import log
 
+from tempfile import gettempdir
 from typing import Union
 from os import (
+    cpu_count,
     mkdir,
     environ,
     path
@@ -27,11 +62,31 @@ from os import (
 class RenderSettings():
     """Class for storing render settings."""
 
+    timing_modes = ('STEPS', 'TIMELAPSE', 'REALTIME')
+
     def __init__(self) -> None:
         self._render_path = path.join(environ['USERPROFILE'], 'Videos')
         self.use_viewport = True
         self.framerate = 24
         self.create_dir = ''
+        self.codec = 'H264'
+        self.quality = 'MEDIUM'
+        # one frame per step, fit into target length or follow real time
+        self.timing = 'STEPS'
+        self.target_length = 60.0      # seconds
+        self.change_weight = 0.5
+        self.speed = 10.0
+        self.max_gap = 1.0             # seconds of the video
+        # reuse frames rendered by previous exports
+        self.use_cache = True
+        self.cache_path = path.join(gettempdir(), 'action_recorder_cache')
+        self.cache_size = 2048         # MB
+        # export in a background job, so the scene can be edited meanwhile
+        self.background = False
+        # render in background blender processes
+        self.parallel = False
+        self.workers = max(1, (cpu_count() or 2) // 2)
+        self.retries = 1
 
     @property
     def render_path(self):
@@ -61,18 +116,70 @@ class RenderSettings():
                 valid_path = False
 
         valid_framerate = self.framerate > 0
+        valid_workers = self.workers > 0 and self.retries >= 0
+        valid_codec = self.codec in CODECS and self.quality in QUALITIES
+        valid_cache = self.cache_size > 0
+        valid_timing = (self.timing in self.timing_modes
+                        and self.target_length > 0
+                        and 0.0 <= self.change_weight <= 1.0
+                        and self.speed > 0 and self.max_gap > 0)
+
+        return (valid_path and valid_framerate and valid_workers
+                and valid_codec and valid_cache and valid_timing)
+
+
+class RecordSettings():
+    """Class for storing recording settings.
 
-        return valid_path and valid_framerate
+        Settings are applied to Grease Pencils when their tracking starts.
+    """
+
+    snapshot_modes = ('FULL', 'DELTA')
+
+    def __init__(self) -> None:
+        self.snapshot_mode = 'DELTA'
+        self.sparse_keyframes = True
+        self.min_interval = 0.05
+        self.max_interval = 4.0
+        self.event_driven = True
+        self.fallback_interval = 10.0
+        self.change_window = 100
+        self.coalesce_window = 0.0      # seconds
+        self.use_storage = True
+        self.storage_path = path.join(gettempdir(), 'action_recorder')
+
+    def valid(self) -> bool:
+        """Check if the record settings are valid."""
+
+        valid_mode = self.snapshot_mode in self.snapshot_modes
+        valid_interval = (0.0 < self.min_interval <= self.max_interval
+                          and self.fallback_interval > 0.0)
+        valid_window = self.change_window > 0
+        valid_coalesce = self.coalesce_window >= 0.0
+        valid_storage = not self.use_storage or bool(self.storage_path)
+
+        return (valid_mode and valid_interval and valid_window
+                and valid_coalesce and valid_storage)
 
 
-# TODO: implement data storage
 class ObserverDatabase():
-    """Database class for storing tracked data."""
+    """Database class for storing tracked data.
+
+        Recorded changes are also written into a recording log per
+        blend file and Grease Pencil, which is read only when exported.
+    """
 
     def __init__(self) -> None:
-        self.records: list[GPenObserver] = list()       # list of tracked gpens
-        self.active_observer: Union[GPenObserver, None] = None
+        self.records: dict[int, GPenObserver] = dict()  # tracked gpens by id
+        self.active_observers: dict[int, GPenObserver] = dict()
+        self.steps: Union[StepCounter, None] = None
         self.render_settings = RenderSettings()
+        self.record_settings = RecordSettings()
+        self.logs: dict[str, RecordingLog] = dict()
+        self.columnar: dict[str, ColumnarRecording] = dict()
+        self.render_cache: Union[RenderCache, None] = None
+        self.render_job: Union[RenderJob, None] = None
+        self.frame_render: Union[FrameRender, None] = None
         self.load_data()
 
     def __del__(self):
@@ -81,28 +188,87 @@ class ObserverDatabase():
     def is_active(self) -> bool:
         """Check if any gpen is being observed."""
 
-        return bool(self.active_observer)
+        return bool(self.active_observers)
 
     def is_observed(self, gpen: GreasePencil) -> bool:
         """Check if concrete gpen is being observed"""
 
-        if self.is_active():
-            return self.active_observer.id == id(gpen)
-        else:
-            return False
+        return gpen.as_pointer() in self.active_observers
 
     def get_active_layer_count(self) -> int:
         """Get number of layers of observed gpen."""
 
-        if self.is_active():
-            return self.active_observer.get_layer_count()
+        observer = self.get_active_observer()
+        if observer is not None:
+            return observer.get_layer_count()
         else:
             return 0
 
-    def get_active_observer(self) -> Union[GPenObserver, None]:
-        """Get active observer or None if there is no active observer"""
+    def get_active_observer(self, gpen: Union[GreasePencil, None] = None
+                            ) -> Union[GPenObserver, None]:
+        """Get active observer or None if there is no active observer
+
+            Returns observer of gpen if it is being observed, otherwise
+            the first of observed gpens.
+        """
+
+        if gpen is not None:
+            observer = self.active_observers.get(gpen.as_pointer())
+            if observer is not None:
+                return observer
+
+        return next(iter(self.active_observers.values()), None)
+
+    def get_active_observers(self) -> list:
+        """Get observers of all observed gpens."""
+
+        return list(self.active_observers.values())
+
+    def get_step_count(self) -> int:
+        """Get number of steps recorded by all observers."""
+
+        return self.steps.count if self.steps is not None else 0
+
+    def get_render_frames(self) -> list:
+        """Get frame numbers shown by the exported video in order.
+
+            Time-lapse fits steps into the target length, real-time
+            timing follows recorded times of steps. Frames may repeat
+            and small or short changes may be skipped.
+        """
+
+        step_count = self.get_step_count()
+        if step_count == 0:
+            return list()
+
+        settings = self.render_settings
+        journals = [observer.journal for observer in self.records.values()]
+        if settings.timing == 'TIMELAPSE':
+            budget = max(1, round(settings.target_length
+                                  * settings.framerate))
+            steps = compact_steps(
+                step_weights(journals, step_count),
+                budget,
+                settings.change_weight
+            )
+        elif settings.timing == 'REALTIME':
+            steps = realtime_steps(
+                step_times(journals, step_count),
+                settings.framerate,
+                settings.speed,
+                settings.max_gap
+            )
+        else:
+            steps = np.arange(1, step_count + 1)
+
+        # state after step N is placed onto frame origin + N - 1
+        return (steps + self.steps.origin - 1).tolist()
+
+    def find_observer(self,
+                      gpen: GreasePencil) -> Union[GPenObserver, None]:
+        """Get GPenObserver object for gpen if it is being tracked."""
 
-        return self.active_observer
+        return self.records.get(gpen.as_pointer())
 
     def get_observer(self, gpen: GreasePencil) -> GPenObserver:
         """Get GPenObserver object for gpen.
@@ -110,33 +276,186 @@ class ObserverDatabase():
             Returns observer for new and previously tracked gpens.
         """
 
-        gpen_id = id(gpen)
-        for observer in self.records:
-            if observer.id == gpen_id:
-                return observer
+        observer = self.records.get(gpen.as_pointer())
+        if observer is not None:
+            return observer
+
+        if self.steps is None:
+            # all observers share steps and the timeline
+            self.steps = StepCounter(bpy.context.scene.frame_current)
 
-        observer = GPenObserver(gpen)
-        self.records.append(observer)
+        observer = GPenObserver(
+            gpen,
+            self.record_settings,
+            self.steps,
+            self.open_log(gpen.name)
+        )
+        self.records[observer.id] = observer
 
         return observer
 
     def start_tracking(self, gpen: GreasePencil):
         """Start tracking Grease Pencil."""
 
-        self.active_observer = self.get_observer(gpen)
-        self.active_observer.set_active(True)
+        observer = self.get_observer(gpen)
+        self.active_observers[observer.id] = observer
+        observer.set_active(True)
+
+    def stop_tracking(self, gpen: Union[GreasePencil, None] = None):
+        """Stop tracking Grease Pencil or all Grease Pencils if gpen
+            is not given."""
+
+        if gpen is None:
+            observers = list(self.active_observers.values())
+        else:
+            observers = [self.active_observers.get(gpen.as_pointer())]
+
+        for observer in observers:
+            if observer is not None:
+                observer.set_active(False)
+                del self.active_observers[observer.id]
+
+    def clear_observers(self) -> None:
+        """Stop and forget all observers.
+
+            Used before another file is loaded, which frees the observed
+            structs. Pending changes are recorded while structs exist.
+        """
+
+        for observer in self.active_observers.values():
+            try:
+                observer.set_active(False)
+            except ReferenceError:
+                pass        # struct has been freed already
+
+        for observer in self.records.values():
+            bpy.msgbus.clear_by_owner(observer.msgbus_owner)
+
+        self.active_observers.clear()
+        self.records.clear()
+        self.steps = None
+        scheduler.clear()
+        self.store_data()
+
+    def get_render_cache(self) -> RenderCache:
+        """Get cache of rendered frames in the directory from settings."""
+
+        settings = self.render_settings
+        cache = self.render_cache
+        if cache is None or cache.directory != settings.cache_path:
+            cache = RenderCache(settings.cache_path, 0)
+            self.render_cache = cache
+        cache.max_size = settings.cache_size * 1024 * 1024
+
+        return cache
+
+    def is_rendering(self) -> bool:
+        """Check if a background or frame by frame render is running."""
 
-    def stop_tracking(self):
-        """Stop tracking Grease Pencil."""
+        return any(
+            job is not None and job.is_running()
+            for job in (self.render_job, self.frame_render)
+        )
 
-        self.active_observer.set_active(False)
-        self.active_observer = None
+    def cancel_render(self) -> None:
+        """Cancel running renders."""
+
+        if self.render_job is not None:
+            self.render_job.cancel()
+        if self.frame_render is not None:
+            self.frame_render.cancel()
+
+    def get_log_path(self, name: str) -> str:
+        """Get path of recording log for Grease Pencil of a given name
+            in the current blend file."""
+
+        return log_path(
+            self.record_settings.storage_path,
+            name,
+            bpy.data.filepath
+        )
+
+    def open_log(self, name: str) -> Union[RecordingLog, None]:
+        """Open recording log for Grease Pencil of a given name."""
+
+        if not self.record_settings.use_storage:
+            return None
+
+        # logs are kept by path, as storage path and blend file may change
+        file_path = self.get_log_path(name)
+        if file_path not in self.logs or not self.logs[file_path].is_open():
+            try:
+                self.logs[file_path] = RecordingLog(file_path)
+            except (OSError, ValueError) as e:
+                log(f'Cannot open recording log { file_path }: { e }',
+                    'error')
+                return None
+
+        return self.logs[file_path]
+
+    def get_columnar(self,
+                     name: str) -> Union[ColumnarRecording, None]:
+        """Get columnar file of Grease Pencil recording.
+
+            The file is rebuilt from the recording log when the log
+            has been written since.
+        """
+
+        source = self.get_log_path(name)
+        key = log_name(name, bpy.data.filepath)
+        file_path = columnar_path(self.record_settings.storage_path, key)
+        if not path.isfile(source):
+            return None
+
+        columnar = self.columnar.get(key)
+        try:
+            if (not path.isfile(file_path)
+                    or path.getmtime(file_path) < path.getmtime(source)
+                    or columnar_version(file_path) != COLUMNAR_VERSION):
+                if columnar is not None:
+                    columnar.close()
+                    columnar = None
+                reader = RecordingLogReader(source)
+                try:
+                    write_columnar(reader, file_path)
+                finally:
+                    reader.close()
+
+            if columnar is None:
+                columnar = ColumnarRecording(file_path)
+        except (OSError, ValueError, BufferError) as e:
+            log(f'Cannot open columnar recording { file_path }: { e }',
+                'error')
+            self.columnar.pop(key, None)
+            return None
+
+        self.columnar[key] = columnar
+        return columnar
 
     def store_data(self):
-        """Store recorded data."""
+        """Store recorded data.
+
+            Records are written as they happen, so only the files
+            are closed here.
+        """
+
+        for recording_log in self.logs.values():
+            recording_log.close()
+        self.logs.clear()
+
+        for columnar in self.columnar.values():
+            try:
+                columnar.close()
+            except BufferError:
+                pass        # columns of the recording are still in use
+        self.columnar.clear()
 
     def load_data(self):
-        """Load recorded data."""
+        """Load recorded data.
+
+            Recording logs are not opened here, logs of the current blend
+            file are read only when their columnar file is needed.
+        """
 
 
 # universal database instance
@@ -0,0 +1,231 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np      # type: ignore
+
+from .utils import log
+
+from collections import namedtuple
+from typing import Union
+import os
+import shutil
+import subprocess
+
+
+# container and codec used by blender and ffmpeg, crf values per quality
+Codec = namedtuple(
+    'Codec',
+    'container blender_codec extension ffmpeg_args crf'
+)
+
+CODECS = {
+    'H264': Codec(
+        'MPEG4',
+        'H264',
+        '.mp4',
+        ('-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-movflags', '+faststart'),
+        {'HIGH': 18, 'MEDIUM': 23, 'LOW': 28}
+    ),
+    'VP9': Codec(
+        'WEBM',
+        'WEBM',
+        '.webm',
+        ('-c:v', 'libvpx-vp9', '-pix_fmt', 'yuv420p', '-b:v', '0'),
+        {'HIGH': 24, 'MEDIUM': 31, 'LOW': 40}
+    ),
+}
+
+QUALITIES = ('HIGH', 'MEDIUM', 'LOW')
+
+# GIF is written by ffmpeg only, colors are reduced to an optimal palette
+GIF_FILTER = 'split[a][b];[a]palettegen[p];[b][p]paletteuse'
+
+
+def find_ffmpeg() -> Union[str, None]:
+    """Get path of ffmpeg executable or None if it is not installed."""
+
+    return shutil.which('ffmpeg')
+
+
+def video_path(base_path: str, codec: str) -> str:
+    """Get path of video file with extension of the codec."""
+
+    return base_path + CODECS[codec].extension
+
+
+def ffmpeg_command(ffmpeg: str, inputs: list, output: str,
+                   codec: str, quality: str) -> list:
+    """Build ffmpeg command line encoding inputs with a codec preset."""
+
+    preset = CODECS[codec]
+    return [
+        ffmpeg,
+        '-y',
+        '-loglevel', 'error',
+        *inputs,
+        *preset.ffmpeg_args,
+        '-crf', str(preset.crf[quality]),
+        output
+    ]
+
+
+def encode_images(pattern: str, start: int, output: str, fps: int,
+                  codec: str, quality: str,
+                  ffmpeg: Union[str, None] = None) -> bool:
+    """Encode numbered image sequence into a video with ffmpeg.
+
+        Pattern uses printf syntax of ffmpeg, e.g. capture%04d.png.
+        Returns True if the video was written.
+    """
+
+    ffmpeg = ffmpeg or find_ffmpeg()
+    if ffmpeg is None:
+        return False
+
+    command = ffmpeg_command(
+        ffmpeg,
+        ['-framerate', str(fps), '-start_number', str(start), '-i', pattern],
+        output,
+        codec,
+        quality
+    )
+    result = subprocess.run(command, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        log(f'Encoding has failed: { result.stderr.decode(errors="replace") }',
+            'error')
+
+    return result.returncode == 0
+
+
+def write_concat_list(images: list, list_path: str, fps: int) -> None:
+    """Write ffconcat list of images held for a number of frames."""
+
+    with open(list_path, 'w') as list_file:
+        list_file.write('ffconcat version 1.0\n')
+        for image, count in images:
+            escaped = image.replace("'", "'\\''")
+            list_file.write(f"file '{ escaped }'\nduration { count / fps }\n")
+        # duration of the last entry is applied only if it is repeated
+        list_file.write(f"file '{ escaped }'\n")
+
+
+def sequence_command(ffmpeg: str, list_path: str, output: str, fps: int,
+                     codec: str, quality: str) -> list:
+    """Build ffmpeg command line encoding images of ffconcat list."""
+
+    return ffmpeg_command(
+        ffmpeg,
+        ['-f', 'concat', '-safe', '0', '-i', list_path, '-r', str(fps)],
+        output,
+        codec,
+        quality
+    )
+
+
+def encode_sequence(images: list, output: str, fps: int, codec: str,
+                    quality: str, ffmpeg: Union[str, None] = None) -> bool:
+    """Encode images held for a number of frames into a video with ffmpeg.
+
+        Images are given as pairs of path and frame count, so repeated
+        frames are stored only once. Returns True if the video was written.
+    """
+
+    ffmpeg = ffmpeg or find_ffmpeg()
+    if ffmpeg is None or not images:
+        return False
+
+    list_path = output + '.ffconcat'
+    write_concat_list(images, list_path, fps)
+    command = sequence_command(ffmpeg, list_path, output, fps, codec, quality)
+    result = subprocess.run(command, stderr=subprocess.PIPE)
+    os.remove(list_path)
+    if result.returncode != 0:
+        log(f'Encoding has failed: { result.stderr.decode(errors="replace") }',
+            'error')
+
+    return result.returncode == 0
+
+
+class FrameEncoder():
+    """Encoder piping raw frames into an ffmpeg process.
+
+        Frames are written as (height, width, 4) uint8 RGBA arrays and
+        encoded while they are produced, so no images are stored.
+        Codec GIF writes an animated GIF instead of a video.
+    """
+
+    def __init__(self, output: str, width: int, height: int, fps: int,
+                 codec: str = 'H264', quality: str = 'MEDIUM',
+                 ffmpeg: Union[str, None] = None) -> None:
+        ffmpeg = ffmpeg or find_ffmpeg()
+        if ffmpeg is None:
+            raise FileNotFoundError('ffmpeg executable has not been found.')
+
+        self.output = output
+        self.width = width
+        self.height = height
+        self.frame_count = 0
+
+        inputs = [
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgba',
+            '-s', f'{ width }x{ height }',
+            '-framerate', str(fps),
+            '-i', '-'
+        ]
+        if codec == 'GIF':
+            command = [
+                ffmpeg,
+                '-y',
+                '-loglevel', 'error',
+                *inputs,
+                '-vf', GIF_FILTER,
+                output
+            ]
+        else:
+            # encoders of yuv420p need even dimensions
+            scale = ('-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2')
+            command = ffmpeg_command(ffmpeg, inputs, output, codec, quality)
+            command[-1:-1] = scale
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def write(self, frame: np.ndarray) -> None:
+        """Write single RGBA frame."""
+
+        if frame.shape != (self.height, self.width, 4):
+            raise ValueError(f'Frame of shape { frame.shape } does not match '
+                             f'the video size { self.width }x{ self.height }.')
+
+        self.process.stdin.write(
+            np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+        )
+        self.frame_count += 1
+
+    def close(self) -> bool:
+        """Finish the video, returns True if it was encoded successfully."""
+
+        if not self.process.stdin.closed:
+            self.process.stdin.close()
+
+        return self.process.wait() == 0
@@ -0,0 +1,179 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np                      # type: ignore
+
+from .points import FramePoints
+
+from collections import defaultdict
+import zlib
+
+
+# indices of values inside of a fingerprint
+COUNT, MATERIAL, HASH, BOUNDS = range(4)
+
+# packed style of a stroke hashed after its points
+STYLE = np.dtype([
+    ('line_width', '<i4'),
+    ('hardness', '<f4'),
+    ('use_cyclic', 'u1')
+])
+
+
+def points_fingerprints(points: FramePoints) -> list:
+    """Get fingerprints of all strokes from their point data.
+
+        Fingerprint is a tuple of point count, material index, hash of
+        point coordinates, pressure and strength and stroke style and
+        bounds of the stroke. Bounds of all strokes are computed in
+        a single vectorized pass.
+    """
+
+    counts = points.counts.tolist()
+    materials = points.material_index.tolist()
+    offsets = points.offsets.tolist()
+
+    bounds = [()] * len(counts)
+    filled = [index for index, count in enumerate(counts) if count]
+    if filled:
+        starts = points.offsets[:-1][points.counts > 0]
+        lower = np.minimum.reduceat(points.co, starts, axis=0)
+        upper = np.maximum.reduceat(points.co, starts, axis=0)
+        extents = np.hstack((lower, upper)).tolist()
+        for index, extent in zip(filled, extents):
+            bounds[index] = tuple(extent)
+
+    co = memoryview(points.co.tobytes())
+    pressure = memoryview(points.pressure.tobytes())
+    strength = memoryview(points.strength.tobytes())
+
+    styles = np.empty(len(counts), dtype=STYLE)
+    styles['line_width'] = points.line_width
+    styles['hardness'] = points.hardness
+    styles['use_cyclic'] = points.use_cyclic
+    style = memoryview(styles.tobytes())
+    size = STYLE.itemsize
+    modes = [mode.encode() for mode in points.display_mode]
+
+    def stroke_hash(index: int, start: int, end: int) -> int:
+        value = zlib.crc32(co[start * 12:end * 12])
+        value = zlib.crc32(pressure[start * 4:end * 4], value)
+        value = zlib.crc32(strength[start * 4:end * 4], value)
+        value = zlib.crc32(style[index * size:(index + 1) * size], value)
+        return zlib.crc32(modes[index], value)
+
+    return [
+        (
+            counts[index],
+            materials[index],
+            stroke_hash(index, offsets[index], offsets[index + 1]),
+            bounds[index]
+        )
+        for index in range(len(counts))
+    ]
+
+
+class StrokeDiff():
+    """Difference between two lists of stroke fingerprints.
+
+        Added strokes are stored as indices into the new list, removed
+        strokes as indices into the old list and modified strokes as
+        pairs of old and new index.
+    """
+
+    __slots__ = ('added', 'removed', 'modified')
+
+    def __init__(self, added: list, removed: list, modified: list) -> None:
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def __repr__(self) -> str:
+        return (f'StrokeDiff(added={ self.added }, '
+                f'removed={ self.removed }, modified={ self.modified })')
+
+
+def diff_fingerprints(old: list, new: list) -> StrokeDiff:
+    """Compare two lists of stroke fingerprints.
+
+        Strokes with identical fingerprints are matched first. Remaining
+        strokes are paired in order as modified if they keep their point
+        count and material, as that holds for moved and sculpted strokes
+        and for strokes which only changed their style.
+        Everything left is reported as added or removed. Strokes which
+        only changed their drawing order are reported as modified.
+    """
+
+    if old == new:
+        return StrokeDiff([], [], [])
+
+    # skip common prefix and suffix, most changes happen at the end
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+
+    old_end, new_end = len(old), len(new)
+    while (old_end > start and new_end > start
+           and old[old_end - 1] == new[new_end - 1]):
+        old_end -= 1
+        new_end -= 1
+
+    # match identical strokes
+    unmatched_old = defaultdict(list)
+    for index in range(start, old_end):
+        unmatched_old[old[index]].append(index)
+
+    removed = list()
+    added = list()
+    matched = list()
+    for index in range(start, new_end):
+        candidates = unmatched_old.get(new[index])
+        if candidates:
+            matched.append((candidates.pop(0), index))
+        else:
+            added.append(index)
+
+    for indices in unmatched_old.values():
+        removed.extend(indices)
+    removed.sort()
+
+    if not (added or removed):
+        # only the order of strokes has changed
+        reordered = [pair for pair in matched if pair[0] != pair[1]]
+        return StrokeDiff([], [], reordered)
+
+    # pair the rest as modifications
+    modified = list()
+    if added and removed:
+        free = defaultdict(list)
+        for index in removed:
+            free[old[index][COUNT], old[index][MATERIAL]].append(index)
+
+        still_added = list()
+        for index in added:
+            candidates = free.get((new[index][COUNT], new[index][MATERIAL]))
+            if candidates:
+                modified.append((candidates.pop(0), index))
+            else:
+                still_added.append(index)
+
+        paired = {old_index for old_index, _ in modified}
+        removed = [index for index in removed if index not in paired]
+        added = still_added
+
+    return StrokeDiff(added, removed, modified)
@@ -0,0 +1,128 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from .render_cache import RenderCache
+
+from collections import deque
+from typing import Union
+import time
+
+
+class RenderProgress():
+    """Progress of a render with rate and estimated remaining time.
+
+        Rate is measured over recently finished frames, so it follows
+        changes in cost of frames.
+    """
+
+    window = 16
+
+    def __init__(self, total: int, done: int = 0) -> None:
+        self.total = total
+        self.done = done
+        self.finish_times = deque([time.monotonic()], maxlen=self.window)
+
+    def advance(self) -> None:
+        """Mark a frame as finished."""
+
+        self.done += 1
+        self.finish_times.append(time.monotonic())
+
+    def fps(self) -> float:
+        """Get number of frames rendered per second."""
+
+        times = self.finish_times
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def eta(self) -> Union[float, None]:
+        """Get estimated remaining time in seconds."""
+
+        fps = self.fps()
+        if fps == 0.0:
+            return None
+
+        return (self.total - self.done) / fps
+
+    def status(self) -> str:
+        """Get text describing the progress."""
+
+        text = f'Rendered { self.done } / { self.total } frames'
+        eta = self.eta()
+        if eta is None:
+            return text + '.'
+
+        minutes, seconds = divmod(int(eta), 60)
+        return (f'{ text }, { self.fps():.1f} fps, '
+                f'ETA { minutes }:{ seconds:02d}.')
+
+
+class FrameRender():
+    """State of a frame by frame render in the blender instance.
+
+        Rendered frames are stored in the render cache as they finish,
+        so a cancelled render resumes from the last finished frame.
+    """
+
+    def __init__(self, cache: RenderCache, keys: list, missing: dict,
+                 output: str) -> None:
+        self.cache = cache
+        self.keys = keys
+        self.output = output            # path of the video
+        self.queue = sorted(
+            (frame, key) for key, frame in missing.items()
+        )
+        self.next = 0
+        self.progress = RenderProgress(len(self.queue))
+        self.state = 'RENDERING'
+
+    def is_running(self) -> bool:
+        return self.state == 'RENDERING'
+
+    def is_finished(self) -> bool:
+        return self.next >= len(self.queue)
+
+    def can_resume(self) -> bool:
+        return self.state == 'CANCELLED' and not self.is_finished()
+
+    def pending(self) -> tuple:
+        """Get frame number and key of the next frame to render."""
+
+        return self.queue[self.next]
+
+    def finish_frame(self, image: str) -> None:
+        """Store rendered image of the pending frame into the cache."""
+
+        _, key = self.queue[self.next]
+        self.cache.put(key, image)
+        self.next += 1
+        self.progress.advance()
+
+    def cancel(self) -> None:
+        if self.is_running():
+            self.state = 'CANCELLED'
+
+    def status(self) -> str:
+        """Get text describing state of the render."""
+
+        if self.state == 'CANCELLED':
+            progress = self.progress
+            return (f'Render has been cancelled after { progress.done } / '
+                    f'{ progress.total } frames.')
+        if self.state == 'FINISHED':
+            return f'Render has finished: { self.output }'
+
+        return self.progress.status()
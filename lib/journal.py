@@ -0,0 +1,153 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np      # type: ignore
+
+from .fingerprint import StrokeDiff
+
+from array import array
+from typing import Union
+import time
+
+
+# kinds of changes
+ADDED, REMOVED, MODIFIED, MIXED = range(4)
+
+
+def diff_kind(diff: Union[StrokeDiff, None]) -> tuple:
+    """Get kind of change and number of changed strokes from a diff."""
+
+    if diff is None:
+        return MIXED, 0
+
+    counts = (len(diff.added), len(diff.removed), len(diff.modified))
+    present = [kind for kind, count in enumerate(counts) if count]
+
+    if len(present) == 1:
+        return present[0], sum(counts)
+    return MIXED, sum(counts)
+
+
+class StringTable():
+    """Table of interned strings referenced by their index."""
+
+    def __init__(self) -> None:
+        self.strings: list[str] = list()
+        self.ids: dict[str, int] = dict()
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, index: int) -> str:
+        return self.strings[index]
+
+    def intern(self, text: str) -> int:
+        """Get index of a string, adding it to the table if needed."""
+
+        index = self.ids.get(text)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(text)
+            self.ids[text] = index
+
+        return index
+
+
+class ChangeJournal():
+    """Columnar history of changes of a Grease Pencil.
+
+        Every change is stored as one row of typed arrays. Layer names,
+        texts and icons are interned in a shared string table, so
+        a change costs a few bytes regardless of its description.
+        Timestamps are nanoseconds of the monotonic clock, they are
+        converted to wall time through the time journal was created.
+    """
+
+    def __init__(self) -> None:
+        self.strings = StringTable()
+        self.start_ns = time.monotonic_ns()
+        self.start_time = time.time()
+
+        self.steps = array('I')
+        self.timestamps = array('q')
+        self.layers = array('I')
+        self.kinds = array('B')
+        self.sizes = array('I')         # number of changed strokes
+        self.texts = array('I')
+        self.icons = array('I')
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def append(self, step: int, timestamp: float, layer: str, kind: int,
+               size: int, text: str, icon: str) -> int:
+        """Append a change and return its index."""
+
+        intern = self.strings.intern
+
+        self.steps.append(step)
+        self.timestamps.append(timestamp)
+        self.layers.append(intern(layer))
+        self.kinds.append(kind)
+        self.sizes.append(size)
+        self.texts.append(intern(text))
+        self.icons.append(intern(icon))
+
+        return len(self.steps) - 1
+
+    def wall_time(self, index: int) -> float:
+        """Get time of a change in seconds since the epoch."""
+
+        return self.start_time + (self.timestamps[index] - self.start_ns) / 1e9
+
+    def get(self, index: int) -> tuple:
+        """Get change as a tuple of step, timestamp, layer name, kind,
+            size, text and icon."""
+
+        strings = self.strings
+        return (
+            self.steps[index],
+            self.timestamps[index],
+            strings[self.layers[index]],
+            self.kinds[index],
+            self.sizes[index],
+            strings[self.texts[index]],
+            strings[self.icons[index]]
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a copy of a column as a NumPy array.
+
+            The copy is needed, as arrays cannot grow while a view
+            of their buffer exists.
+        """
+
+        values = getattr(self, name)
+        return np.array(values, dtype=values.typecode)
+
+    def layer_changes(self, layer: str) -> np.ndarray:
+        """Get indices of all changes of a layer."""
+
+        layer_id = self.strings.ids.get(layer)
+        if layer_id is None:
+            return np.empty(0, dtype=np.intp)
+
+        return np.flatnonzero(self.column('layers') == layer_id)
+
+    def memory_size(self) -> int:
+        """Get number of bytes used by the columns."""
+
+        columns = (self.steps, self.timestamps, self.layers, self.kinds,
+                   self.sizes, self.texts, self.icons)
+        return sum(column.itemsize * len(column) for column in columns)
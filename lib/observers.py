@@ -13,7 +13,6 @@
 
 
 import bpy                                  # type: ignore
-import bpy.app.timers as timers             # type: ignore
 from bpy.types import (                     # type: ignore
     PropertyGroup,
     GPencilFrame,
@@ -21,30 +20,57 @@ from bpy.types import (                     # type: ignore
     GreasePencil
 )
 
-from .utils import (
-    get_timestamp,
-    log
-)
+from .utils import log
 from .tracking import (
     observe_layers,
     observe_strokes,
+    resubscribe,
+    subscribe,
+    unsubscribe,
     LayerChangesGroup
 )
+from .fingerprint import (
+    diff_fingerprints,
+    points_fingerprints,
+    StrokeDiff
+)
+from .journal import (
+    diff_kind,
+    ChangeJournal
+)
+from .points import read_frame_points
+from .scheduler import scheduler
+from .stats import stats
+from .trace import tracer
+from .storage import RecordingLog
+from .snapshots import (
+    LayerSnapshots,
+    StrokeStore
+)
 
 from typing import Callable, Union
 import functools
+import math
+import time
 
 
 class ActiveObserver():
     """Observer class used to actively observe changes in object.
 
         Change is observed actively, meaning that the observing
-        function is called periodically by blender.
+        function is called periodically by the shared scheduler.
+
+        The interval between calls is adaptive. It drops to min_interval
+        after a change is observed and grows by the backoff factor
+        with every call without a change, up to max_interval.
     """
 
     def __init__(self, observing_func: Callable) -> None:
         self.active = False
-        self.interval = 0.5
+        self.min_interval = 0.05
+        self.max_interval = 4.0
+        self.backoff = 2.0
+        self.interval = self.min_interval
         self.func = functools.partial(observing_func, self)
 
     def is_active(self) -> bool:
@@ -56,35 +82,85 @@ class ActiveObserver():
         """Set active status of observer."""
 
         self.active = status
-        registered = timers.is_registered(self.func)
+        scheduled = scheduler.is_scheduled(self)
 
-        if status and (not registered):
-            timers.register(self.func)
-        elif (not status) and registered:
-            timers.unregister(self.func)
+        if status and (not scheduled):
+            scheduler.add(self)
+        elif (not status) and scheduled:
+            scheduler.remove(self)
 
     def set_interval(self, interval: float) -> None:
         """Change the interval between observing functions calls"""
 
         if interval > 0.0:
-            self.interval = interval
+            self.interval = min(
+                max(interval, self.min_interval),
+                self.max_interval
+            )
         else:
             log('Function interval cannot be negative or equal to 0.', 'error')
 
+    def set_interval_bounds(self, min_interval: float,
+                            max_interval: float) -> None:
+        """Change the bounds of adaptive interval."""
+
+        if 0.0 < min_interval <= max_interval:
+            self.min_interval = min_interval
+            self.max_interval = max_interval
+            self.set_interval(self.interval)
+        else:
+            log('Invalid interval bounds.', 'error')
+
+    def adapt_interval(self, changed: bool) -> float:
+        """Get the interval until the next call of observing function.
+
+            Called by observing functions with the result of observation.
+        """
+
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(
+                self.interval * self.backoff,
+                self.max_interval
+            )
+
+        return self.interval
+
 
 class FrameObserver(ActiveObserver):
-    """Observer class used to observe changes in GPencilFrame object."""
+    """Observer class used to observe changes in GPencilFrame object.
+
+        Changes are found by comparing stroke fingerprints, so edits
+        keeping the stroke count are observed as well.
+
+        With a coalescing window, changes are held until the frame stays
+        unchanged for the window, so a burst of edits is recorded as one
+        change of the strokes it left changed.
+    """
 
     def __init__(self, observee: GPencilFrame,
-                 layer_name: str, add_fn: Callable):
+                 parent_layer: 'LayerObserver', add_fn: Callable):
         super().__init__(observe_strokes)
 
-        self.parent_layer = layer_name
+        self.parent_layer = parent_layer
         self.frame = observee
         self.strokes = self.frame.strokes
         self.last_count = self.strokes.__len__()
+        self.points = read_frame_points(self.frame)
+        self.fingerprints = points_fingerprints(self.points)
+        self.previous_fingerprints = self.fingerprints
         self.add_change = add_fn
 
+        self.coalesce_window = 0.0      # seconds, 0 records every change
+        # pending frame observers of the Grease Pencil
+        self.pending_frames: Union[set, None] = None
+        # fingerprints before the pending burst of changes
+        self.burst_fingerprints: Union[list, None] = None
+        self.burst_end = 0.0
+        self.burst_count = 0
+        self.last_change = 0.0
+
     def get_frame(self) -> GPencilFrame:
         """Get observed GPencilFrame object."""
 
@@ -102,24 +178,107 @@ class FrameObserver(ActiveObserver):
 
         return self.strokes.__len__()
 
-    def on_add(self) -> None:
-        """Method called in response to addition of a new stroke."""
+    def diff_strokes(self) -> StrokeDiff:
+        """Get strokes changed since the last call."""
 
-        self.add_change(
-            self.parent_layer,
-            None,       # TODO: work out referencing
-            'Stroke added.',
-            'PLUS',
+        points = read_frame_points(self.frame)
+        fingerprints = points_fingerprints(points)
+        diff = diff_fingerprints(self.fingerprints, fingerprints)
+
+        self.points = points
+        self.previous_fingerprints = self.fingerprints
+        self.fingerprints = fingerprints
+        self.last_count = len(fingerprints)
+
+        return diff
+
+    def set_active(self, status: bool) -> None:
+        """Set active status, pending changes are recorded on pause."""
+
+        if not status:
+            self.flush()
+
+        super().set_active(status)
+
+    def is_pending(self) -> bool:
+        """Check if a burst of changes waits to be recorded."""
+
+        return self.burst_fingerprints is not None
+
+    def on_change(self, diff: StrokeDiff) -> None:
+        """Method called in response to changed strokes."""
+
+        if self.coalesce_window <= 0.0:
+            self.__record_change__(diff)
+            return
+
+        if self.burst_fingerprints is None:
+            self.burst_fingerprints = self.previous_fingerprints
+            self.burst_count = 0
+            if self.pending_frames is not None:
+                self.pending_frames.add(self)
+        self.burst_count += 1
+        self.last_change = scheduler.clock()
+        self.burst_end = self.last_change + self.coalesce_window
+
+    def settle(self, interval: float) -> float:
+        """Record the pending burst if it has ended.
+
+            Gets interval until the next call of observing function,
+            which is shortened to the end of the pending burst.
+        """
+
+        remaining = self.burst_end - scheduler.clock()
+        if remaining > 0.0:
+            return min(interval, remaining)
+
+        self.flush()
+        return interval
+
+    def flush(self) -> None:
+        """Record pending burst of changes as a single change."""
+
+        if self.burst_fingerprints is None:
+            return
+
+        # the recorded change spans the whole burst
+        self.previous_fingerprints = self.burst_fingerprints
+        self.burst_fingerprints = None
+        if self.pending_frames is not None:
+            self.pending_frames.discard(self)
+        stats.count('coalesced', self.burst_count - 1)
+
+        diff = diff_fingerprints(self.previous_fingerprints, self.fingerprints)
+        if diff:
+            self.__record_change__(diff)
+
+    def __record_change__(self, diff: StrokeDiff) -> None:
+        """Report changed strokes as a new record."""
+
+        changes = (
+            (len(diff.added), 'added', 'PLUS'),
+            (len(diff.removed), 'removed', 'X'),
+            (len(diff.modified), 'modified', 'GREASEPENCIL'),
         )
+        changes = [change for change in changes if change[0]]
 
-    def on_remove(self) -> None:
-        """Method called in response to deletion of a stroke."""
+        count, kind, icon = changes[0]
+        if len(changes) == 1 and count == 1:
+            text = f'Stroke { kind }.'
+        else:
+            text = f'{ count } stroke{ "s" if count > 1 else "" } { kind }'
+            for count, kind, _ in changes[1:]:
+                text += f', { count } { kind }'
+            text += '.'
 
+        # strokes are not ID blocks, so they cannot be referenced by
+        # the change, which is found by its journal index instead
         self.add_change(
             self.parent_layer,
             None,
-            'Stroke removed.',
-            'X'
+            text,
+            icon,
+            diff
         )
 
 
@@ -130,20 +289,61 @@ class LayerObserver():
         changes in observed layer in UIList.
     """
 
-    def __init__(self, observee: GPencilLayer, add_fn: Callable) -> None:
-        self.id = id(observee)
+    def __init__(self, observee: GPencilLayer, add_fn: Callable,
+                 store: Union[StrokeStore, None] = None,
+                 start_step: int = 0, keep_initial: bool = False) -> None:
+        self.id = observee.as_pointer()
         self.layer = observee
+        self.name = observee.info
         self.add_change = add_fn
         self.active_frame = FrameObserver(
             self.layer.frames[-1],
-            self.layer.info,
+            self,
             add_fn
         )
 
+        # delta snapshots are used only if a stroke store is provided
+        if store is not None:
+            self.snapshots = LayerSnapshots(
+                store,
+                self.active_frame.get_frame(),
+                start_step
+            )
+        else:
+            self.snapshots = None
+            if keep_initial:
+                self.__keep_initial_frame__()
+
+    def __keep_initial_frame__(self) -> None:
+        """Keep a copy of the initial frame as a held keyframe.
+
+            Sparse keyframes move the observed frame forward only when the
+            layer changes, so without a copy the initial strokes would be
+            missing from the steps preceding the first change.
+        """
+
+        frames = self.layer.frames
+        current_frame = self.active_frame.get_frame()
+        frame_number = current_frame.frame_number
+
+        if len(frames) > 1 and frames[-2].frame_number >= frame_number - 1:
+            return
+
+        current_frame.frame_number = frame_number - 1
+        new_frame = frames.copy(current_frame)
+        new_frame.frame_number = frame_number
+        self.active_frame.set_frame(new_frame)
+
     def set_add_function(self, func: Callable) -> None:
         """Set a function to report a change to."""
 
         self.add_change = func
+        self.active_frame.add_change = func
+
+    def is_renamed(self) -> bool:
+        """Check if the layer has been renamed since the last check."""
+
+        return self.name != self.layer.info
 
     def get_layer(self) -> GPencilLayer:
         """Get tracked layer object."""
@@ -155,12 +355,103 @@ class LayerObserver():
 
         self.active_frame.set_active(status)
 
-    def advance_frame(self) -> None:
-        """Advance frame for this layer."""
+    def set_interval_bounds(self, min_interval: float,
+                            max_interval: float) -> None:
+        """Propagate interval bounds to child observers."""
+
+        self.active_frame.set_interval_bounds(min_interval, max_interval)
+
+    def set_coalesce_window(self, window: float,
+                            pending_frames: Union[set, None] = None) -> None:
+        """Propagate coalescing window and set collecting pending frame
+            observers to child observers."""
+
+        self.active_frame.coalesce_window = window
+        self.active_frame.pending_frames = pending_frames
+
+    def flush(self) -> None:
+        """Record pending changes of child observers."""
+
+        self.active_frame.flush()
+
+    def advance_frame(self, step: int, frame_number: int) -> None:
+        """Advance frame for this layer.
+
+            With delta snapshots only the difference to the previous step
+            is stored and the observed frame is moved to the new frame
+            number. Otherwise the observed frame is kept as a keyframe of
+            the finished step and its copy is observed from now on.
+        """
 
         current_frame = self.active_frame.get_frame()
-        new_frame = self.layer.frames.copy(current_frame)
-        self.active_frame.set_frame(new_frame)
+        start = time.perf_counter() if stats.enabled else 0.0
+
+        if self.snapshots is not None:
+            self.snapshots.record(
+                step,
+                current_frame,
+                self.active_frame.fingerprints,
+                self.active_frame.points
+            )
+            current_frame.frame_number = frame_number
+            if start:
+                stats.add('snapshot', time.perf_counter() - start)
+        else:
+            # the keyframe may have been held since an older step
+            current_frame.frame_number = frame_number - 1
+            new_frame = self.layer.frames.copy(current_frame)
+            new_frame.frame_number = frame_number
+            self.active_frame.set_frame(new_frame)
+            if start:
+                stats.add('frame_copy', time.perf_counter() - start)
+
+    def build_frames(self, origin: int) -> None:
+        """Rebuild recorded frames from delta snapshots."""
+
+        if self.snapshots is not None:
+            self.snapshots.materialize(
+                self.layer,
+                origin,
+                self.active_frame.get_frame().frame_number
+            )
+
+    def release_frames(self) -> None:
+        """Remove frames rebuilt from delta snapshots."""
+
+        if self.snapshots is not None:
+            self.snapshots.release(self.layer)
+
+    def keyframe_digests(self) -> dict:
+        """Get hashes of rebuilt frames by their frame number."""
+
+        if self.snapshots is None:
+            return dict()
+
+        return self.snapshots.digests
+
+
+class StepCounter():
+    """Counter of recorded steps shared by all observers.
+
+        The state after step N is placed onto frame origin + N - 1
+        of the timeline, so steps of all observers stay aligned.
+    """
+
+    def __init__(self, origin: int) -> None:
+        self.origin = origin
+        self.count = 0
+        self.start_ns = time.monotonic_ns()
+
+    def advance(self) -> int:
+        """Start a new step and return its number."""
+
+        self.count += 1
+        return self.count
+
+    def frame_number(self, step: int) -> int:
+        """Get frame number observed after the given step."""
+
+        return self.origin + step
 
 
 class GPenObserver(ActiveObserver, PropertyGroup):
@@ -170,16 +461,46 @@ class GPenObserver(ActiveObserver, PropertyGroup):
         items in UIList.
     """
 
-    def __init__(self, observee: GreasePencil) -> None:
+    def __init__(self, observee: GreasePencil, settings, steps: StepCounter,
+                 recording_log: Union[RecordingLog, None] = None) -> None:
         super().__init__(observe_layers)
 
-        self.id = id(observee)
+        self.id = observee.as_pointer()
         self.name = observee.name
         self.gpen = observee
         self.last_count = self.layers.__len__()
-        self.frame_count = 0
+        self.frame_count = 0        # number of steps of this gpen
+        self.steps = steps
+        self.sparse = settings.sparse_keyframes
+
+        # with events, polling is only a fallback for missed notifications
+        self.event_driven = settings.event_driven
+        self.msgbus_owner = object()
+        if self.event_driven:
+            max_interval = max(
+                settings.max_interval,
+                settings.fallback_interval
+            )
+        else:
+            max_interval = settings.max_interval
+        super().set_interval_bounds(settings.min_interval, max_interval)
+
+        self.journal = ChangeJournal()
+        self.change_window = settings.change_window
+        self.coalesce_window = settings.coalesce_window
+        # frame observers holding a burst of changes
+        self.pending_frames: set[FrameObserver] = set()
+        self.recording_log = recording_log
+        if self.recording_log is not None:
+            self.recording_log.append_session(time.time(), self.origin)
+
+        if settings.snapshot_mode == 'DELTA':
+            self.store = StrokeStore()
+        else:
+            self.store = None
 
         self.layer_observers = dict()
+        self.record_index: dict[str, int] = dict()  # name -> layer record
         for layer in observee.layers:
             self.__add_layer__(layer)
 
@@ -190,47 +511,222 @@ class GPenObserver(ActiveObserver, PropertyGroup):
     def layers(self):
         return self.gpen.layers
 
+    @property
+    def origin(self) -> int:
+        return self.steps.origin
+
     def __add_layer__(self, layer: GPencilLayer) -> None:
         """Add a new layer to track list"""
 
-        layer_observer = LayerObserver(layer, self.__new_record__)
+        layer_observer = LayerObserver(
+            layer,
+            self.__new_record__,
+            self.store,
+            self.steps.count,
+            self.sparse
+        )
+        layer_observer.set_interval_bounds(
+            self.min_interval,
+            self.max_interval
+        )
+        layer_observer.set_coalesce_window(
+            self.coalesce_window,
+            self.pending_frames
+        )
         # layer_observer.set_add_function()
         self.layer_observers[layer] = layer_observer
 
+        if self.recording_log is not None:
+            frame = layer_observer.active_frame
+            for index, key in enumerate(frame.fingerprints):
+                self.recording_log.append_stroke(
+                    self.steps.count,
+                    layer_observer.name,
+                    key,
+                    frame.points,
+                    index
+                )
+
+        self.record_index[layer_observer.name] = len(self.gpen.layer_records)
         item = self.gpen.layer_records.add()
-        item.layer_name = layer.info
+        item.layer_name = layer_observer.name
 
     def __remove_layer__(self, layer: GPencilLayer) -> None:
         """Remove a layer from track list"""
 
-        name = layer.info
-        self.layer_observers.pop(layer)
+        # removed layer cannot be accessed, use the name stored by observer
+        layer_observer = self.layer_observers.pop(layer)
+        self.pending_frames.discard(layer_observer.active_frame)
+        name = layer_observer.name
+        index = self.record_index.pop(name, None)
+
+        if index is not None:
+            self.gpen.layer_records.remove(index)
+            self.__index_records__()
+
+    def __index_records__(self) -> None:
+        """Rebuild index of layer records."""
+
+        self.record_index = {
+            item.layer_name: index
+            for index, item in enumerate(self.gpen.layer_records)
+        }
 
-        for item in self.gpen.layer_records:
-            if item.layer_name == name:
-                self.gpen.layer_records.remove(item)
-                break
+    def __rename_layer__(self, layer: LayerObserver) -> None:
+        """Update name of a renamed layer in records and indexes."""
 
-    def __new_record__(self, layer_name: str,
-                       obj: object, text: str, icon: str) -> None:
-        """Create a new record for a given layer"""
+        old_name, new_name = layer.name, layer.layer.info
+        layer.name = new_name
 
-        for item in self.gpen.layer_records:
-            item.change_index = len(item.changes)
-            if item.layer_name == layer_name:
-                change = item.changes.add()
-                change.obj = obj
-                change.text = text
-                change.icon = icon
+        index = self.record_index.pop(old_name, None)
+        if index is not None:
+            self.gpen.layer_records[index].layer_name = new_name
+            self.record_index[new_name] = index
 
-                break
+    def sync_layer_names(self) -> None:
+        """Check all layers for a change of name."""
 
         for layer in self.layer_observers.values():
-            layer.advance_frame()
-        scene = bpy.context.scene
-        scene.frame_set(scene.frame_current + 1)
+            if layer.is_renamed():
+                self.__rename_layer__(layer)
+
+    def __new_record__(self, layer: LayerObserver, obj: object, text: str,
+                       icon: str,
+                       diff: Union[StrokeDiff, None] = None) -> None:
+        """Create a new record for a given layer
+
+            The change is stored in the journal, the layer records only
+            keep a window of the latest changes for displaying.
+        """
+
+        # record pending changes of other layers which happened earlier
+        if self.pending_frames:
+            frame = layer.active_frame
+            if frame.coalesce_window:
+                last_change = frame.last_change
+            else:
+                last_change = math.inf
+            pending = sorted(
+                self.pending_frames,
+                key=lambda other: other.last_change
+            )
+            for other in pending:
+                # flushing records a change, which flushes earlier ones
+                if other.is_pending() and other.last_change <= last_change:
+                    other.flush()
+
+        start = time.perf_counter() if stats.enabled else 0.0
+
+        if layer.is_renamed():
+            self.__rename_layer__(layer)
+        layer_name = layer.name
+
+        step = self.steps.advance()
+        frame_number = self.steps.frame_number(step)
         self.frame_count += 1
 
+        kind, size = diff_kind(diff)
+        timestamp = time.monotonic_ns()
+        journal_index = self.journal.append(
+            step,
+            timestamp,
+            layer_name,
+            kind,
+            size,
+            text,
+            icon
+        )
+
+        index = self.record_index.get(layer_name)
+        if index is not None:
+            item = self.gpen.layer_records[index]
+            change = item.changes.add()
+            change.obj = obj
+            change.text = text
+            change.icon = icon
+            change.journal_index = journal_index
+            change.timestamp = (timestamp - self.steps.start_ns) / 1e9
+
+            if len(item.changes) > self.change_window:
+                item.changes.remove(0)
+            item.change_index = len(item.changes) - 1
+
+        if self.recording_log is not None:
+            self.__log_change__(layer, step, text, icon, diff)
+
+        if self.sparse:
+            # other layers hold their previous keyframe
+            layer.advance_frame(step, frame_number)
+        else:
+            for layer_observer in self.layer_observers.values():
+                layer_observer.advance_frame(step, frame_number)
+
+        if start:
+            frame_set_start = time.perf_counter()
+            bpy.context.scene.frame_set(frame_number)
+            end = time.perf_counter()
+            stats.add('frame_set', end - frame_set_start)
+            stats.add('new_record', end - start)
+        else:
+            bpy.context.scene.frame_set(frame_number)
+
+    def __log_change__(self, layer: LayerObserver, step: int, text: str,
+                       icon: str, diff: Union[StrokeDiff, None]) -> None:
+        """Write a change and its stroke data into the recording log."""
+
+        layer_name = layer.name
+        recording_log = self.recording_log
+        timestamp = self.journal.wall_time(-1)
+        recording_log.append_change(step, timestamp, layer_name, text, icon)
+
+        if diff is None:
+            return
+
+        frame = layer.active_frame
+        removed = diff.removed + [old for old, _ in diff.modified]
+        added = diff.added + [new for _, new in diff.modified]
+
+        for index in removed:
+            recording_log.append_remove(
+                step,
+                layer_name,
+                frame.previous_fingerprints[index]
+            )
+        for index in added:
+            recording_log.append_stroke(
+                step,
+                layer_name,
+                frame.fingerprints[index],
+                frame.points,
+                index
+            )
+
+    def build_frames(self) -> None:
+        """Rebuild full frames of all recorded steps.
+
+            Needed before rendering when delta snapshots are used.
+        """
+
+        for layer in self.layer_observers.values():
+            layer.flush()
+        for layer in self.layer_observers.values():
+            layer.build_frames(self.origin)
+
+    def release_frames(self) -> None:
+        """Remove frames created by build_frames."""
+
+        for layer in self.layer_observers.values():
+            layer.release_frames()
+
+    def keyframe_digests(self) -> dict:
+        """Get hashes of frames created by build_frames by layer pointer
+            and frame number."""
+
+        return {
+            layer.id: layer.keyframe_digests()
+            for layer in self.layer_observers.values()
+        }
+
     def get_gpen(self) -> GreasePencil:
         """Get observed GreasePencil object."""
 
@@ -243,13 +739,23 @@ class GPenObserver(ActiveObserver, PropertyGroup):
 
     def get_layer_records(self,
                           layer_name: str) -> Union[LayerChangesGroup, None]:
-        """Get layer records for given layer."""
+        """Get layer records for given layer.
+
+            Used while drawing the UI, so records of a layer renamed since
+            the last check are found by its observer without renaming them.
+        """
+
+        index = self.record_index.get(layer_name)
+        if index is None:
+            for layer in self.layer_observers.values():
+                if layer.layer.info == layer_name:
+                    index = self.record_index.get(layer.name)
+                    break
 
-        for item in self.gpen.layer_records:
-            if item.layer_name == layer_name:
-                return item
+            if index is None:
+                return None
 
-        return None
+        return self.gpen.layer_records[index]
 
     def set_active(self, status: bool) -> None:
         """Set active status and propagate it to child observers."""
@@ -259,10 +765,45 @@ class GPenObserver(ActiveObserver, PropertyGroup):
         for layer_observer in self.layer_observers.values():
             layer_observer.set_active(status)
 
+        if self.event_driven:
+            unsubscribe(self)
+            if status:
+                subscribe(self)
+
+    def __resubscribe__(self) -> None:
+        """Subscribe to the current layers once notifications are done."""
+
+        if self.event_driven and self.is_active():
+            bpy.app.timers.register(
+                functools.partial(resubscribe, self),
+                first_interval=0.0
+            )
+
+    def wake(self) -> None:
+        """Observe this Grease Pencil and its layers on the next tick."""
+
+        if not self.is_active():
+            return
+
+        observers = [self]
+        for layer_observer in self.layer_observers.values():
+            observers.append(layer_observer.active_frame)
+
+        scheduler.wake(observers)
+
+    def set_interval_bounds(self, min_interval: float,
+                            max_interval: float) -> None:
+        """Set interval bounds and propagate them to child observers."""
+
+        super().set_interval_bounds(min_interval, max_interval)
+
+        for layer_observer in self.layer_observers.values():
+            layer_observer.set_interval_bounds(min_interval, max_interval)
+
     def on_add(self) -> None:
         """Method called in response to addition of a new layer."""
 
-        log(get_timestamp() + ": layer added.", 'debug')
+        tracer.instant('layers', '{}: layer added.', self.name)
 
         layers = self.gpen.layers
 
@@ -270,10 +811,12 @@ class GPenObserver(ActiveObserver, PropertyGroup):
             if layer not in self.layer_observers.keys():
                 self.__add_layer__(layer)
 
+        self.__resubscribe__()
+
     def on_remove(self) -> None:
         """Method called in response to deletion of a layer."""
 
-        log(get_timestamp() + ": layer removed.", 'debug')
+        tracer.instant('layers', '{}: layer removed.', self.name)
 
         gpen_layers = self.gpen.layers
         observed_layers = self.layer_observers.keys()
@@ -283,6 +826,8 @@ class GPenObserver(ActiveObserver, PropertyGroup):
         for layer in to_remove:
             self.__remove_layer__(layer)
 
+        self.__resubscribe__()
+
         # adjust layer_index
         self.gpen.layer_index = min(
             max(0, self.gpen.layer_index - 1),
@@ -292,7 +837,7 @@ class GPenObserver(ActiveObserver, PropertyGroup):
     def notify(self) -> None:
         """Method to notify observer of change in layer count."""
 
-        log(str(self.gpen) + ' notified of change', 'debug')
+        tracer.instant('layers', '{} notified of change.', self.name)
         new_count = self.get_layer_count()
 
         if(self.last_count < new_count):
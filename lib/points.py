@@ -0,0 +1,167 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from bpy.types import GPencilFrame      # type: ignore
+import numpy as np                      # type: ignore
+
+
+class FramePoints():
+    """Point data of all strokes in a frame stored in contiguous arrays.
+
+        Points of stroke i are stored in the range
+        offsets[i]:offsets[i + 1] of the point arrays.
+    """
+
+    __slots__ = (
+        'co',
+        'pressure',
+        'strength',
+        'offsets',
+        'material_index',
+        'line_width',
+        'hardness',
+        'use_cyclic',
+        'display_mode'
+    )
+
+    def __init__(self, co: np.ndarray, pressure: np.ndarray,
+                 strength: np.ndarray, offsets: np.ndarray,
+                 material_index: np.ndarray, line_width: np.ndarray,
+                 hardness: np.ndarray, use_cyclic: np.ndarray,
+                 display_mode: list) -> None:
+        self.co = co                            # (points, 3) float32
+        self.pressure = pressure                # (points,) float32
+        self.strength = strength                # (points,) float32
+        self.offsets = offsets                  # (strokes + 1,) int64
+        self.material_index = material_index    # (strokes,) int32
+        self.line_width = line_width            # (strokes,) int32
+        self.hardness = hardness                # (strokes,) float32
+        self.use_cyclic = use_cyclic            # (strokes,) bool
+        self.display_mode = display_mode        # strokes enum names
+
+    def __len__(self) -> int:
+        """Get number of strokes."""
+
+        return len(self.offsets) - 1
+
+    @property
+    def point_count(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Get number of points of every stroke."""
+
+        return np.diff(self.offsets)
+
+    def stroke_slice(self, index: int) -> slice:
+        """Get slice of point arrays belonging to a stroke."""
+
+        return slice(int(self.offsets[index]), int(self.offsets[index + 1]))
+
+
+def read_frame_points(frame: GPencilFrame) -> FramePoints:
+    """Read point data of all strokes in a frame using foreach_get.
+
+        Stroke attributes are read for the whole frame at once, point
+        attributes are read per stroke directly into views of the
+        preallocated arrays. Display mode is an enum, which foreach_get
+        cannot read, so it is read per stroke.
+    """
+
+    strokes = frame.strokes
+    stroke_count = len(strokes)
+
+    material_index = np.empty(stroke_count, dtype=np.int32)
+    line_width = np.empty(stroke_count, dtype=np.int32)
+    hardness = np.empty(stroke_count, dtype=np.float32)
+    use_cyclic = np.empty(stroke_count, dtype=bool)
+    strokes.foreach_get('material_index', material_index)
+    strokes.foreach_get('line_width', line_width)
+    strokes.foreach_get('hardness', hardness)
+    strokes.foreach_get('use_cyclic', use_cyclic)
+    display_mode = [stroke.display_mode for stroke in strokes]
+
+    counts = np.fromiter(
+        (len(stroke.points) for stroke in strokes),
+        dtype=np.int64,
+        count=stroke_count
+    )
+    offsets = np.zeros(stroke_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    total = int(offsets[-1])
+
+    co = np.empty(total * 3, dtype=np.float32)
+    pressure = np.empty(total, dtype=np.float32)
+    strength = np.empty(total, dtype=np.float32)
+
+    bounds = offsets.tolist()
+    for index, stroke in enumerate(strokes):
+        start, end = bounds[index], bounds[index + 1]
+        if start == end:
+            continue
+
+        points = stroke.points
+        points.foreach_get('co', co[start * 3:end * 3])
+        points.foreach_get('pressure', pressure[start:end])
+        points.foreach_get('strength', strength[start:end])
+
+    return FramePoints(
+        co.reshape(total, 3),
+        pressure,
+        strength,
+        offsets,
+        material_index,
+        line_width,
+        hardness,
+        use_cyclic,
+        display_mode
+    )
+
+
+def read_frame_points_slow(frame: GPencilFrame) -> FramePoints:
+    """Read point data of all strokes one point at a time.
+
+        Reference implementation used for benchmarks and testing.
+    """
+
+    co, pressure, strength = list(), list(), list()
+    offsets = [0]
+    material_index, line_width = list(), list()
+    hardness, use_cyclic, display_mode = list(), list(), list()
+
+    for stroke in frame.strokes:
+        for point in stroke.points:
+            co.append(tuple(point.co))
+            pressure.append(point.pressure)
+            strength.append(point.strength)
+
+        offsets.append(len(pressure))
+        material_index.append(stroke.material_index)
+        line_width.append(stroke.line_width)
+        hardness.append(stroke.hardness)
+        use_cyclic.append(stroke.use_cyclic)
+        display_mode.append(stroke.display_mode)
+
+    return FramePoints(
+        np.array(co, dtype=np.float32).reshape(-1, 3),
+        np.array(pressure, dtype=np.float32),
+        np.array(strength, dtype=np.float32),
+        np.array(offsets, dtype=np.int64),
+        np.array(material_index, dtype=np.int32),
+        np.array(line_width, dtype=np.int32),
+        np.array(hardness, dtype=np.float32),
+        np.array(use_cyclic, dtype=bool),
+        display_mode
+    )
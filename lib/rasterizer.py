@@ -0,0 +1,664 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Software rasterizer of Grease Pencil strokes for draft previews.
+
+    Stroke points are projected through the scene camera and drawn as
+    anti-aliased polylines whose width follows point pressure. All pixels
+    covered by a stroke are computed at once with NumPy, so a frame takes
+    milliseconds instead of a full render. Fills, textures and effects
+    are not drawn.
+"""
+
+
+from bpy.types import GPencilFrame      # type: ignore
+import numpy as np                      # type: ignore
+
+from .fingerprint import points_fingerprints
+from .points import read_frame_points
+
+from bisect import bisect_right
+from typing import Union
+import struct
+import zlib
+
+
+# stroke thickness of 1000 is one unit wide in 3D space
+THICKNESS_SCALE = 1000.0
+
+
+class CameraProjection():
+    """Projection of world coordinates onto pixels of the output image.
+
+        Pixel coordinates start at the top left corner. Every projected
+        point also gets the number of pixels per unit at its depth, used
+        to scale stroke thickness.
+    """
+
+    def __init__(self, view: np.ndarray, width: int, height: int,
+                 perspective: bool, scale: float,
+                 shift: tuple = (0.0, 0.0)) -> None:
+        self.view = view                # world to camera 4x4 matrix
+        self.width = width
+        self.height = height
+        self.perspective = perspective
+        # focal length in pixels or pixels per unit of orthographic view
+        self.scale = scale
+        size = max(width, height)
+        self.center = (width / 2 + shift[0] * size,
+                       height / 2 - shift[1] * size)
+
+    @classmethod
+    def from_camera(cls, camera, width: int, height: int):
+        """Create projection of a camera object."""
+
+        camera_data = camera.data
+        sensor_fit = camera_data.sensor_fit
+        if sensor_fit == 'VERTICAL':
+            sensor, size = camera_data.sensor_height, height
+        elif sensor_fit == 'HORIZONTAL':
+            sensor, size = camera_data.sensor_width, width
+        else:
+            sensor, size = camera_data.sensor_width, max(width, height)
+
+        perspective = camera_data.type != 'ORTHO'
+        if perspective:
+            scale = camera_data.lens / sensor * size
+        else:
+            scale = size / camera_data.ortho_scale
+
+        return cls(
+            np.linalg.inv(np.array(camera.matrix_world, dtype=np.float64)),
+            width,
+            height,
+            perspective,
+            scale,
+            (camera_data.shift_x, camera_data.shift_y)
+        )
+
+    @classmethod
+    def fit(cls, points: np.ndarray, width: int, height: int,
+            margin: float = 0.05):
+        """Create front orthographic projection showing all points.
+
+            Used when the scene has no camera. Points are drawn on the XZ
+            plane, the default drawing plane of Grease Pencil.
+        """
+
+        # camera looking along +Y with Z up
+        view = np.array([
+            [1.0, 0.0, 0.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0],
+            [0.0, -1.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0, 1.0]
+        ])
+        if len(points) == 0:
+            return cls(view, width, height, False, min(width, height) / 2)
+
+        low = points[:, [0, 2]].min(axis=0)
+        high = points[:, [0, 2]].max(axis=0)
+        extent = np.maximum(high - low, 1e-6) * (1 + 2 * margin)
+        scale = min(width / extent[0], height / extent[1])
+        center = (low + high) / 2
+        view[0, 3] = -center[0]
+        view[1, 3] = -center[1]
+
+        return cls(view, width, height, False, scale)
+
+    def project(self, points: np.ndarray) -> tuple:
+        """Project (n, 3) world points.
+
+            Returns (n, 2) pixel coordinates and (n,) pixels per unit,
+            points behind the camera get zero pixels per unit.
+        """
+
+        camera = points @ self.view[:3, :3].T + self.view[:3, 3]
+        if self.perspective:
+            depth = -camera[:, 2]
+            visible = depth > 1e-6
+            factor = np.zeros(len(points))
+            factor[visible] = self.scale / depth[visible]
+        else:
+            factor = np.full(len(points), self.scale)
+
+        pixels = np.empty((len(points), 2))
+        pixels[:, 0] = self.center[0] + camera[:, 0] * factor
+        pixels[:, 1] = self.center[1] - camera[:, 1] * factor
+
+        return pixels, factor
+
+
+def subdivide(pixels: np.ndarray, radii: np.ndarray, alphas: np.ndarray,
+              min_length: float = 8.0) -> tuple:
+    """Split long segments of a polyline into short pieces.
+
+        Pieces are at most min_length or the stroke width long, so their
+        bounding boxes stay small.
+    """
+
+    direction = np.diff(pixels, axis=0)
+    lengths = np.hypot(direction[:, 0], direction[:, 1])
+    piece_length = max(min_length, 2 * float(radii.max()))
+    pieces = np.ceil(lengths / piece_length).astype(np.int64)
+    np.maximum(pieces, 1, out=pieces)
+    if pieces.max() == 1:
+        return pixels, radii, alphas
+
+    segment = np.repeat(np.arange(len(pieces)), pieces)
+    offsets = np.arange(len(segment)) - np.repeat(
+        np.cumsum(pieces) - pieces,
+        pieces
+    )
+    fraction = offsets / pieces[segment]
+
+    def split(values: np.ndarray) -> np.ndarray:
+        steps = np.diff(values, axis=0)[segment]
+        if values.ndim > 1:
+            steps = steps * fraction[:, None]
+        else:
+            steps = steps * fraction
+        return np.concatenate((values[:-1][segment] + steps, values[-1:]))
+
+    return split(pixels), split(radii), split(alphas)
+
+
+def merge_close(pixels: np.ndarray, radii: np.ndarray,
+                alphas: np.ndarray) -> tuple:
+    """Merge points of a polyline closer than a quarter of its radius.
+
+        Dense strokes have more points than their width needs. A point is
+        kept when it starts the next interval of the spacing along the
+        polyline, both ends are always kept.
+    """
+
+    spacing = max(1.0, float(radii.max()) / 4)
+    steps = np.hypot(*np.diff(pixels, axis=0).T)
+    distance = np.concatenate(([0.0], np.cumsum(steps)))
+    if distance[-1] / spacing >= len(pixels) - 1:
+        return pixels, radii, alphas
+
+    cells = np.floor(distance / spacing).astype(np.int64)
+    keep = np.empty(len(pixels), dtype=bool)
+    keep[0] = keep[-1] = True
+    keep[1:-1] = cells[1:-1] != cells[:-2]
+
+    return pixels[keep], radii[keep], alphas[keep]
+
+
+def segments_coverage(box: np.ndarray, top: int, left: int,
+                      start: np.ndarray, direction: np.ndarray,
+                      low: np.ndarray, size: tuple,
+                      start_radius: np.ndarray, radius_change: np.ndarray,
+                      start_alpha: np.ndarray,
+                      alpha_change: np.ndarray) -> None:
+    """Draw coverage of segments into the box by maximum."""
+
+    box_width, box_height = size
+    height, width = box.shape
+
+    # pixels of all boxes as (segments, box_height, box_width) arrays
+    x = low[:, 0, None, None] + np.arange(box_width)[None, None, :]
+    y = low[:, 1, None, None] + np.arange(box_height)[None, :, None]
+    center_x = (x + 0.5).astype(np.float32) - start[:, 0, None, None]
+    center_y = (y + 0.5).astype(np.float32) - start[:, 1, None, None]
+
+    length = np.einsum('ij,ij->i', direction, direction)
+    length[length == 0] = 1.0
+    dx = direction[:, 0, None, None]
+    dy = direction[:, 1, None, None]
+    t = center_x * dx + center_y * dy
+    t /= length[:, None, None]
+    np.clip(t, 0.0, 1.0, out=t)
+
+    # distance from pixel center to the nearest point of the segment
+    distance = np.hypot(center_x - t * dx, center_y - t * dy)
+    coverage = start_radius[:, None, None] + t * radius_change[:, None, None]
+    coverage += 0.5
+    coverage -= distance
+    np.clip(coverage, 0.0, 1.0, out=coverage)
+    coverage *= start_alpha[:, None, None] + t * alpha_change[:, None, None]
+
+    x -= left
+    y -= top
+    covered = ((coverage > 0) & (x >= 0) & (x < width)
+               & (y >= 0) & (y < height))
+    segment, row, column = np.nonzero(covered)
+    # overlapping segments of one stroke do not blend with each other
+    np.maximum.at(
+        box,
+        (low[segment, 1] - top + row, low[segment, 0] - left + column),
+        coverage[covered]
+    )
+
+
+# number of box pixels evaluated at once by stroke_coverage
+CHUNK_PIXELS = 1 << 20
+
+
+def stroke_coverage(pixels: np.ndarray, radii: np.ndarray,
+                    alphas: np.ndarray, width: int,
+                    height: int) -> Union[tuple, None]:
+    """Get anti-aliased coverage of a polyline.
+
+        Every segment covers pixels closer to it than the radius
+        interpolated between its end points, edges fade over one pixel.
+        Close points are merged and long segments are split, so bounding
+        boxes of all segments have about the same size and are evaluated
+        in chunks of arrays with bounded size. Returns top, left and
+        coverage of the bounding box of the polyline inside the image,
+        or None if it is not visible.
+    """
+
+    if len(pixels) == 1:
+        # a single point is drawn as a dot
+        pixels = np.repeat(pixels, 2, axis=0)
+        radii = np.repeat(radii, 2)
+        alphas = np.repeat(alphas, 2)
+
+    pixels, radii, alphas = merge_close(pixels, radii, alphas)
+    pixels, radii, alphas = subdivide(pixels, radii, alphas)
+    valid = (radii[:-1] > 0) & (radii[1:] > 0)
+    if not valid.any():
+        return None
+
+    pixels = pixels.astype(np.float32)
+    radii = radii.astype(np.float32)
+    alphas = alphas.astype(np.float32)
+    start = pixels[:-1][valid]
+    direction = np.diff(pixels, axis=0)[valid]
+    start_radius = radii[:-1][valid]
+    radius_change = np.diff(radii)[valid]
+    start_alpha = alphas[:-1][valid]
+    alpha_change = np.diff(alphas)[valid]
+
+    # bounding boxes of segments extended by radius and the fading edge
+    reach = np.maximum(start_radius, start_radius + radius_change) + 1.0
+    low = np.floor(
+        np.minimum(start, start + direction) - reach[:, None]
+    ).astype(np.int64)
+    high = np.ceil(
+        np.maximum(start, start + direction) + reach[:, None]
+    ).astype(np.int64)
+
+    left, top = np.maximum(low.min(axis=0), 0)
+    right = min(int(high[:, 0].max()) + 1, width)
+    bottom = min(int(high[:, 1].max()) + 1, height)
+    if left >= right or top >= bottom:
+        return None
+
+    size = tuple((high - low).max(axis=0) + 1)
+    box = np.zeros((bottom - top, right - left), dtype=np.float32)
+    chunk = max(1, CHUNK_PIXELS // (size[0] * size[1]))
+    for first in range(0, len(start), chunk):
+        part = slice(first, first + chunk)
+        segments_coverage(
+            box,
+            int(top),
+            int(left),
+            start[part],
+            direction[part],
+            low[part],
+            size,
+            start_radius[part],
+            radius_change[part],
+            start_alpha[part],
+            alpha_change[part]
+        )
+
+    if not box.any():
+        return None
+
+    return int(top), int(left), box
+
+
+def union(area: Union[tuple, None],
+          other: Union[tuple, None]) -> Union[tuple, None]:
+    """Get bounding area of two areas given as top, left, bottom, right."""
+
+    if area is None:
+        return other
+    if other is None:
+        return area
+
+    return (min(area[0], other[0]), min(area[1], other[1]),
+            max(area[2], other[2]), max(area[3], other[3]))
+
+
+class Canvas():
+    """RGBA image strokes are drawn onto, stored as premultiplied floats.
+
+        Areas of the image are given as tuples of top, left, bottom and
+        right pixel, bottom and right are excluded.
+    """
+
+    def __init__(self, width: int, height: int,
+                 background: tuple = (1.0, 1.0, 1.0, 1.0)) -> None:
+        self.width = width
+        self.height = height
+        self.area = (0, 0, height, width)
+        self.background = np.array(background, dtype=np.float32)
+        self.background[:3] *= self.background[3]
+        self.pixels = np.empty((height, width, 4), dtype=np.float32)
+        self.clear()
+
+    def region(self, area: tuple) -> np.ndarray:
+        top, left, bottom, right = area
+        return self.pixels[top:bottom, left:right]
+
+    def clear(self, area: Union[tuple, None] = None) -> None:
+        self.region(area or self.area)[:] = self.background
+
+    def draw_polyline(self, pixels: np.ndarray, radii: np.ndarray,
+                      alphas: np.ndarray,
+                      color: np.ndarray) -> Union[tuple, None]:
+        """Draw polyline of a color over the image, get the drawn area."""
+
+        coverage = stroke_coverage(
+            pixels,
+            radii,
+            alphas,
+            self.width,
+            self.height
+        )
+        if coverage is None:
+            return None
+
+        top, left, box = coverage
+        area = (top, left, top + box.shape[0], left + box.shape[1])
+        region = self.region(area)
+        alpha = (box * color[3])[:, :, None]
+        premultiplied = np.append(color[:3], 1.0)
+        region *= 1.0 - alpha
+        region += alpha * premultiplied
+
+        return area
+
+    def composite(self, layer: 'Canvas', opacity: float = 1.0,
+                  area: Union[tuple, None] = None) -> None:
+        """Draw area of another premultiplied image over this image."""
+
+        area = area or self.area
+        pixels = layer.region(area)
+        if opacity < 1.0:
+            pixels = pixels * opacity
+
+        region = self.region(area)
+        region *= 1.0 - pixels[:, :, 3:]
+        region += pixels
+
+    def to_rgba(self, area: Union[tuple, None] = None) -> np.ndarray:
+        """Get area of the image as (height, width, 4) uint8 array."""
+
+        pixels = self.region(area or self.area)
+        if self.background[3] == 1.0:
+            # opaque image is not premultiplied
+            image = pixels * 255
+        else:
+            alpha = pixels[:, :, 3:]
+            image = np.divide(pixels, alpha, out=np.zeros_like(pixels),
+                              where=alpha > 0)
+            image[:, :, 3:] = alpha
+            image *= 255
+
+        image += 0.5
+        np.clip(image, 0.0, 255.0, out=image)
+
+        return image.astype(np.uint8)
+
+
+def write_png(file_path: str, image: np.ndarray) -> None:
+    """Write (height, width, 4) uint8 RGBA image as a PNG file."""
+
+    height, width, _ = image.shape
+    # every row starts with filter type 0
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, width * 4)
+
+    def chunk(kind: bytes, payload: bytes) -> bytes:
+        return (struct.pack('>I', len(payload)) + kind + payload
+                + struct.pack('>I', zlib.crc32(kind + payload)))
+
+    with open(file_path, 'wb') as png_file:
+        png_file.write(b'\x89PNG\r\n\x1a\n')
+        png_file.write(chunk(
+            b'IHDR',
+            struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+        ))
+        png_file.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)))
+        png_file.write(chunk(b'IEND', b''))
+
+
+def material_colors(gpen) -> list:
+    """Get stroke colors of materials, None for hidden strokes."""
+
+    colors = list()
+    for material in gpen.materials:
+        style = getattr(material, 'grease_pencil', None)
+        if style is None or not style.show_stroke:
+            colors.append(None)
+        else:
+            colors.append(np.array(style.color, dtype=np.float32))
+
+    return colors
+
+
+class LayerPreview():
+    """Strokes of keyframes of a layer drawn onto an image of the layer.
+
+        The shown keyframe is read and projected only once, as it is
+        usually shown on many frames, and dropped when the next keyframe
+        is shown. When the next keyframe only adds strokes to the drawn
+        one, only the added strokes are drawn.
+    """
+
+    def __init__(self, layer, matrix: np.ndarray, thickness: float,
+                 colors: list) -> None:
+        frames = sorted(layer.frames, key=lambda frame: frame.frame_number)
+        self.numbers = [frame.frame_number for frame in frames]
+        self.frames = frames
+        self.hidden = layer.hide
+        self.opacity = layer.opacity
+        self.line_change = getattr(layer, 'line_change', 0)
+        self.matrix = matrix            # object to world
+        self.thickness = thickness      # world units per stroke thickness
+        self.colors = colors            # stroke colors of materials
+        self.index = -1                 # index of the projected keyframe
+        self.strokes: tuple = ((), ())  # its fingerprints and strokes
+
+        self.canvas: Union[Canvas, None] = None
+        self.drawn: list = list()       # fingerprints of drawn strokes
+
+    def keyframe(self, frame_number: int) -> int:
+        """Get index of the keyframe shown on frame number, -1 if none."""
+
+        if self.hidden:
+            return -1
+
+        return bisect_right(self.numbers, frame_number) - 1
+
+    def __project__(self, frame: GPencilFrame,
+                    projection: CameraProjection) -> tuple:
+        """Get fingerprints and projected strokes of a frame."""
+
+        points = read_frame_points(frame)
+        cyclic = np.zeros(len(points), dtype=bool)
+        frame.strokes.foreach_get('use_cyclic', cyclic)
+
+        co = points.co.astype(np.float64)
+        world = co @ self.matrix[:3, :3].T + self.matrix[:3, 3]
+        pixels, factor = projection.project(world)
+        width = (points.line_width + self.line_change).astype(np.float64)
+
+        strokes = list()
+        for index in range(len(points)):
+            point_range = points.stroke_slice(index)
+            material = int(points.material_index[index])
+            color = None
+            if material < len(self.colors):
+                color = self.colors[material]
+            if point_range.start == point_range.stop or color is None:
+                strokes.append(None)
+                continue
+
+            radii = (factor[point_range] * points.pressure[point_range]
+                     * width[index] * self.thickness / 2)
+            stroke = [
+                pixels[point_range],
+                radii,
+                points.strength[point_range].astype(np.float64),
+                color
+            ]
+            if cyclic[index]:
+                for item in range(3):
+                    stroke[item] = np.concatenate(
+                        (stroke[item], stroke[item][:1])
+                    )
+            strokes.append(stroke)
+
+        return points_fingerprints(points), strokes
+
+    def draw(self, index: int,
+             projection: CameraProjection) -> Union[tuple, None]:
+        """Draw keyframe with index onto the image of the layer.
+
+            Returns area of the image which has changed.
+        """
+
+        if index != self.index:
+            self.strokes = self.__project__(self.frames[index], projection)
+            self.index = index
+        fingerprints, strokes = self.strokes
+
+        if self.canvas is None:
+            self.canvas = Canvas(
+                projection.width,
+                projection.height,
+                (0.0, 0.0, 0.0, 0.0)
+            )
+
+        canvas = self.canvas
+        drawn = len(self.drawn)
+        changed = None
+        if fingerprints[:drawn] != self.drawn:
+            canvas.clear()
+            drawn = 0
+            changed = canvas.area
+
+        for stroke in strokes[drawn:]:
+            if stroke is not None:
+                changed = union(changed, canvas.draw_polyline(*stroke))
+        self.drawn = fingerprints
+
+        return changed
+
+
+class PreviewRenderer():
+    """Draft renderer of tracked Grease Pencil objects.
+
+        Keyframes are expected to be built. Objects and the camera are
+        drawn in their current placement. Every layer keeps its own
+        image, so memory grows with the number of layers.
+    """
+
+    def __init__(self, scene, objects: list, scale: float = 1.0) -> None:
+        render = scene.render
+        factor = render.resolution_percentage / 100 * scale
+        self.width = max(1, int(render.resolution_x * factor))
+        self.height = max(1, int(render.resolution_y * factor))
+
+        self.layers = list()
+        for obj in objects:
+            matrix = np.array(obj.matrix_world, dtype=np.float64)
+            thickness = getattr(obj.data, 'pixel_factor', 1.0) \
+                / THICKNESS_SCALE
+            colors = material_colors(obj.data)
+            for layer in obj.data.layers:
+                self.layers.append(
+                    LayerPreview(layer, matrix, thickness, colors)
+                )
+
+        if scene.camera is not None:
+            self.projection = CameraProjection.from_camera(
+                scene.camera,
+                self.width,
+                self.height
+            )
+        else:
+            self.projection = CameraProjection.fit(
+                self.__all_points__(),
+                self.width,
+                self.height
+            )
+
+        if render.film_transparent:
+            background = (0.0, 0.0, 0.0, 0.0)
+        else:
+            background = (1.0, 1.0, 1.0, 1.0)
+        self.canvas = Canvas(self.width, self.height, background)
+        self.shown: Union[tuple, None] = None
+        self.image: Union[np.ndarray, None] = None
+
+    def __all_points__(self) -> np.ndarray:
+        """Get world coordinates of points of last keyframes."""
+
+        parts = [np.empty((0, 3))]
+        for layer in self.layers:
+            if layer.frames:
+                co = read_frame_points(layer.frames[-1]).co
+                parts.append(co @ layer.matrix[:3, :3].T + layer.matrix[:3, 3])
+
+        return np.concatenate(parts)
+
+    def render(self, frame_number: int) -> np.ndarray:
+        """Get (height, width, 4) uint8 RGBA image of a frame."""
+
+        shown = tuple(layer.keyframe(frame_number) for layer in self.layers)
+        if shown == self.shown:
+            return self.image
+
+        canvas = self.canvas
+        if self.shown is None:
+            previous = (None,) * len(shown)
+            changed = canvas.area
+        else:
+            previous = self.shown
+            changed = None
+
+        for layer, index, last in zip(self.layers, shown, previous):
+            if index == last:
+                continue
+            if index < 0 or last is None or last < 0:
+                # layer has appeared or disappeared
+                changed = canvas.area
+            if index >= 0:
+                changed = union(changed, layer.draw(index, self.projection))
+
+        # only the changed area is composited and converted
+        if changed is not None:
+            canvas.clear(changed)
+            for layer, index in zip(self.layers, shown):
+                if index >= 0:
+                    canvas.composite(layer.canvas, layer.opacity, changed)
+
+            if self.image is None:
+                self.image = canvas.to_rgba()
+            else:
+                # frames are handed to the encoder, do not change them
+                self.image = self.image.copy()
+                top, left, bottom, right = changed
+                self.image[top:bottom, left:right] = canvas.to_rgba(changed)
+
+        self.shown = shown
+
+        return self.image
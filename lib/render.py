@@ -0,0 +1,250 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import bpy      # type: ignore
+
+from .utils import log
+
+from typing import Union
+from os import path
+import subprocess
+import time
+
+
+def split_frames(start: int, end: int, shard_count: int) -> list:
+    """Split inclusive frame range into contiguous shards.
+
+        Shards differ in length by at most one frame.
+    """
+
+    frame_count = end - start + 1
+    shard_count = max(1, min(shard_count, frame_count))
+    size, rest = divmod(frame_count, shard_count)
+
+    shards = list()
+    first = start
+    for index in range(shard_count):
+        last = first + size - 1 + (1 if index < rest else 0)
+        shards.append((first, last))
+        first = last + 1
+
+    return shards
+
+
+def split_ranges(ranges: list, shard_count: int) -> list:
+    """Split inclusive frame ranges into at least shard_count shards.
+
+        Ranges longer than a fair share of all frames are split, so
+        shards stay contiguous and roughly equal in length.
+    """
+
+    frame_count = sum(end - start + 1 for start, end in ranges)
+    if frame_count == 0:
+        return list()
+
+    size = -(-frame_count // max(1, shard_count))      # ceiling division
+    shards = list()
+    for start, end in ranges:
+        parts = -(-(end - start + 1) // size)
+        shards.extend(split_frames(start, end, parts))
+
+    return shards
+
+
+def frame_ranges(frames: list) -> list:
+    """Group sorted frame numbers into inclusive contiguous ranges."""
+
+    ranges = list()
+    for frame in frames:
+        if ranges and ranges[-1][1] == frame - 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+
+    return [tuple(frame_range) for frame_range in ranges]
+
+
+def frame_path(pattern: str, frame: int, extension: str = '.png') -> str:
+    """Get path of a rendered frame from output pattern with #### mark."""
+
+    return pattern.replace('####', f'{ frame:04d}') + extension
+
+
+class Shard():
+    """Range of frames rendered by one worker process."""
+
+    def __init__(self, index: int, start: int, end: int) -> None:
+        self.index = index
+        self.start = start
+        self.end = end
+        self.attempts = 0
+        self.process: Union[subprocess.Popen, None] = None
+        self.log_file = None
+
+    def __len__(self) -> int:
+        return self.end - self.start + 1
+
+    def frames(self) -> range:
+        return range(self.start, self.end + 1)
+
+
+class ShardedRender():
+    """Render of frame ranges split among background blender processes.
+
+        Every worker renders one shard of frames of a saved blend file
+        with `blender -b`. At most `workers` processes run at once,
+        failed shards are started again up to `retries` times. Frames are
+        named by their number, so merged output keeps the frame order.
+    """
+
+    # more shards than workers balance shards of different cost
+    shards_per_worker = 2
+
+    def __init__(self, blend_path: str, output: str, ranges: list,
+                 workers: int, retries: int = 1, file_format: str = 'PNG',
+                 blender: Union[str, None] = None) -> None:
+        self.blend_path = blend_path
+        self.output = output            # path pattern containing ####
+        self.workers = max(1, workers)
+        self.retries = max(0, retries)
+        self.file_format = file_format
+        self.blender = blender or bpy.app.binary_path
+
+        self.pending = [
+            Shard(index, first, last)
+            for index, (first, last) in enumerate(
+                split_ranges(ranges, self.workers * self.shards_per_worker)
+            )
+        ]
+        self.frame_count = sum(len(shard) for shard in self.pending)
+        self.running: list[Shard] = list()
+        self.finished: list[Shard] = list()
+        self.failed: list[Shard] = list()
+        self.start_time = 0.0
+
+    def __command__(self, shard: Shard) -> list:
+        return [
+            self.blender,
+            '--background',
+            self.blend_path,
+            '--render-output', self.output,
+            '--render-format', self.file_format,
+            '--use-extension', '1',
+            '--frame-start', str(shard.start),
+            '--frame-end', str(shard.end),
+            '--render-anim'
+        ]
+
+    def __launch__(self, shard: Shard) -> None:
+        shard.attempts += 1
+        log_path = self.output.replace('####', f'_shard{ shard.index }.log')
+        shard.log_file = open(log_path, 'w')
+        shard.process = subprocess.Popen(
+            self.__command__(shard),
+            stdout=shard.log_file,
+            stderr=subprocess.STDOUT
+        )
+        self.running.append(shard)
+        log(f'Render shard { shard.index } ({ shard.start }-{ shard.end }),'
+            f' attempt { shard.attempts }')
+
+    def __succeeded__(self, shard: Shard) -> bool:
+        """Check if worker finished and wrote all frames of its shard."""
+
+        if shard.process.returncode != 0:
+            return False
+
+        extension = '.' + self.file_format.lower()
+        return all(
+            path.isfile(frame_path(self.output, frame, extension))
+            for frame in shard.frames()
+        )
+
+    def start(self) -> None:
+        """Launch the first batch of workers."""
+
+        self.start_time = time.monotonic()
+        self.poll()
+
+    def poll(self) -> bool:
+        """Collect finished workers and launch pending shards.
+
+            Returns True while the render is running.
+        """
+
+        for shard in tuple(self.running):
+            if shard.process.poll() is None:
+                continue
+
+            self.running.remove(shard)
+            shard.log_file.close()
+
+            if self.__succeeded__(shard):
+                self.finished.append(shard)
+            elif shard.attempts <= self.retries:
+                log(f'Render shard { shard.index } failed, retrying',
+                    'warning')
+                self.pending.append(shard)
+            else:
+                log(f'Render shard { shard.index } failed', 'error')
+                self.failed.append(shard)
+
+        while self.pending and len(self.running) < self.workers:
+            self.__launch__(self.pending.pop(0))
+
+        return self.is_running()
+
+    def wait(self, interval: float = 0.1) -> bool:
+        """Block until all shards are rendered.
+
+            Returns True if every shard succeeded.
+        """
+
+        if not self.start_time:
+            self.start()
+
+        while self.poll():
+            time.sleep(interval)
+
+        return not self.failed
+
+    def cancel(self) -> None:
+        """Terminate all running workers."""
+
+        for shard in self.running:
+            shard.process.terminate()
+        for shard in self.running:
+            shard.process.wait()
+            shard.log_file.close()
+
+        self.failed.extend(self.running)
+        self.failed.extend(self.pending)
+        self.running.clear()
+        self.pending.clear()
+
+    def is_running(self) -> bool:
+        return bool(self.running or self.pending)
+
+    def rendered_frames(self) -> int:
+        """Get number of frames of finished shards."""
+
+        return sum(len(shard) for shard in self.finished)
+
+    def progress(self) -> float:
+        """Get finished portion of the render in range from 0 to 1."""
+
+        if self.frame_count == 0:
+            return 1.0
+
+        return self.rendered_frames() / self.frame_count
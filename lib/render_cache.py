@@ -0,0 +1,504 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Content-addressed cache of rendered frames.
+
+    Every frame is keyed by a hash of everything visible in it: point
+    data and style of strokes of the keyframes shown on the frame, layer
+    styles, transforms and materials of the tracked objects, lights, the
+    camera, the world and render settings. Frames with equal keys look
+    the same, so they are rendered only once.
+
+    Other objects drawn in the render, such as meshes and curves, are not
+    hashed. While there are any, keys are unique to the export, so frames
+    are only shared among equal frames of the export and never reused by
+    later exports.
+"""
+
+
+from bpy.types import (                 # type: ignore
+    GPencilFrame,
+    GPencilLayer
+)
+import numpy as np                      # type: ignore
+
+from .points import read_frame_points
+from .utils import log
+
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Union
+import hashlib
+import os
+import uuid
+
+
+# properties of layers and materials which change rendered strokes
+LAYER_STYLE = (
+    'info',
+    'hide',
+    'opacity',
+    'blend_mode',
+    'tint_color',
+    'tint_factor',
+    'line_change',
+    'use_lights',
+    'use_mask_layer',
+    'vertex_paint_opacity',
+    'location',
+    'rotation',
+    'scale'
+)
+MATERIAL_STYLE = (
+    'show_stroke',
+    'show_fill',
+    'hide',
+    'mode',
+    'stroke_style',
+    'color',
+    'pixel_size',
+    'alignment_mode',
+    'alignment_rotation',
+    'use_stroke_holdout',
+    'fill_style',
+    'fill_color',
+    'gradient_type',
+    'mix_color',
+    'mix_factor',
+    'mix_stroke_factor',
+    'texture_offset',
+    'texture_scale',
+    'texture_angle',
+    'texture_clamp',
+    'use_fill_holdout',
+    'use_overlap_strokes',
+    'flip'
+)
+GPENCIL_STYLE = (
+    'pixel_factor',
+    'stroke_thickness_space',
+    'stroke_depth_order'
+)
+LIGHT_STYLE = (
+    'type',
+    'color',
+    'energy',
+    'shadow_soft_size',
+    'spot_size',
+    'spot_blend'
+)
+# objects drawn in renders, other types are not visible or are hashed
+RENDERED_TYPES = (
+    'MESH',
+    'CURVE',
+    'CURVES',
+    'SURFACE',
+    'META',
+    'FONT',
+    'VOLUME',
+    'POINTCLOUD',
+    'GPENCIL',
+    'GREASEPENCIL'
+)
+
+
+def digest(*values) -> str:
+    """Get hash of representation of values."""
+
+    return hashlib.blake2b(repr(values).encode(), digest_size=16).hexdigest()
+
+
+def digest_arrays(*arrays: np.ndarray) -> str:
+    """Get hash of contents of arrays."""
+
+    hasher = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        hasher.update(np.ascontiguousarray(array).tobytes())
+
+    return hasher.hexdigest()
+
+
+def style_state(struct, names: tuple) -> tuple:
+    """Get values of given properties, missing ones are skipped.
+
+        Properties differ among versions of blender.
+    """
+
+    values = list()
+    for name in names:
+        value = getattr(struct, name, None)
+        if value is None:
+            continue
+        if hasattr(value, '__len__') and not isinstance(value, str):
+            value = tuple(value)
+        else:
+            # images and other data are identified by their name
+            value = getattr(value, 'name', value)
+        values.append((name, value))
+
+    return tuple(values)
+
+
+def keyframe_digest(frame: GPencilFrame) -> str:
+    """Get hash of point data and style of all strokes in a keyframe."""
+
+    points = read_frame_points(frame)
+    strokes = frame.strokes
+    stroke_count = len(strokes)
+
+    hardness = np.empty(stroke_count, dtype=np.float32)
+    cyclic = np.empty(stroke_count, dtype=bool)
+    fill_colors = np.empty(stroke_count * 4, dtype=np.float32)
+    strokes.foreach_get('hardness', hardness)
+    strokes.foreach_get('use_cyclic', cyclic)
+    strokes.foreach_get('vertex_color_fill', fill_colors)
+
+    colors = np.empty(points.point_count * 4, dtype=np.float32)
+    bounds = points.offsets.tolist()
+    for index, stroke in enumerate(strokes):
+        start, end = bounds[index], bounds[index + 1]
+        if start != end:
+            stroke.points.foreach_get('vertex_color',
+                                      colors[start * 4:end * 4])
+
+    return digest_arrays(
+        points.co,
+        points.pressure,
+        points.strength,
+        points.offsets,
+        points.material_index,
+        points.line_width,
+        hardness,
+        cyclic,
+        fill_colors,
+        colors
+    )
+
+
+def render_state(scene, use_viewport: bool) -> tuple:
+    """Get render settings which affect rendered images."""
+
+    render = scene.render
+    view = scene.view_settings
+    return (
+        render.engine,
+        render.resolution_x,
+        render.resolution_y,
+        render.resolution_percentage,
+        render.film_transparent,
+        view.view_transform,
+        view.look,
+        view.exposure,
+        view.gamma,
+        use_viewport
+    )
+
+
+def world_state(scene) -> tuple:
+    """Get color of the world and default values of its nodes."""
+
+    world = scene.world
+    if world is None:
+        return ()
+
+    nodes = list()
+    if world.use_nodes and world.node_tree is not None:
+        for node in world.node_tree.nodes:
+            nodes.append((
+                node.name,
+                node.bl_idname,
+                tuple(
+                    repr(getattr(socket, 'default_value', None))
+                    for socket in node.inputs
+                ),
+                tuple(socket.is_linked for socket in node.inputs)
+            ))
+
+    return (world.name, tuple(world.color), world.use_nodes, tuple(nodes))
+
+
+def camera_state(scene) -> tuple:
+    """Get placement and projection of the scene camera."""
+
+    camera = scene.camera
+    if camera is None:
+        return ()
+
+    camera_data = camera.data
+    return (
+        tuple(tuple(row) for row in camera.matrix_world),
+        camera_data.type,
+        camera_data.lens,
+        camera_data.ortho_scale,
+        camera_data.shift_x,
+        camera_data.shift_y
+    )
+
+
+def is_animated(id_data) -> bool:
+    animation_data = getattr(id_data, 'animation_data', None)
+    return animation_data is not None and animation_data.action is not None
+
+
+def object_state(obj) -> tuple:
+    """Get transform, drawing settings and material styles of an object."""
+
+    materials = list()
+    for material in obj.data.materials:
+        if material is None or material.grease_pencil is None:
+            materials.append(None)
+            continue
+
+        materials.append((
+            material.name,
+            style_state(material.grease_pencil, MATERIAL_STYLE)
+        ))
+
+    return (
+        tuple(tuple(row) for row in obj.matrix_world),
+        style_state(obj.data, GPENCIL_STYLE),
+        tuple(materials)
+    )
+
+
+def light_state(light) -> tuple:
+    """Get placement and settings of a light."""
+
+    return (
+        light.name,
+        tuple(tuple(row) for row in light.matrix_world),
+        style_state(light.data, LIGHT_STYLE)
+    )
+
+
+def untracked_objects(scene, objects: list, types: tuple) -> list:
+    """Get objects of given types shown in renders other than the given
+        ones."""
+
+    tracked = {obj.name for obj in objects}
+    return [
+        obj for obj in scene.objects
+        if obj.name not in tracked and obj.type in types
+        and not obj.hide_render
+    ]
+
+
+class LayerKeys():
+    """Hashes of keyframes of a layer looked up by frame number.
+
+        Hashes of keyframes rebuilt from snapshots are known without
+        reading their strokes, other keyframes are read once.
+    """
+
+    def __init__(self, layer: GPencilLayer,
+                 known: Union[dict, None] = None) -> None:
+        frames = sorted(layer.frames, key=lambda frame: frame.frame_number)
+        self.numbers = [frame.frame_number for frame in frames]
+        self.frames = frames
+        self.known = known or dict()    # frame number -> hash
+        self.hashes: dict[int, str] = dict()
+        self.visible = style_state(layer, LAYER_STYLE)
+
+    def key(self, frame_number: int) -> Union[str, None]:
+        """Get hash of the keyframe shown on frame number."""
+
+        index = bisect_right(self.numbers, frame_number) - 1
+        if index < 0:
+            return None
+
+        # every keyframe is read only once
+        if index not in self.hashes:
+            frame = self.frames[index]
+            known = self.known.get(frame.frame_number)
+            if known is None:
+                known = keyframe_digest(frame)
+            self.hashes[index] = known
+
+        return self.hashes[index]
+
+
+def frame_keys(scene, objects: list, frame_numbers: list,
+               use_viewport: bool = False,
+               digests: Union[dict, None] = None) -> list:
+    """Get cache keys of frames showing given Grease Pencil objects.
+
+        Keyframes are expected to be built, digests may hold known hashes
+        of keyframes by layer pointer and frame number. The scene is moved
+        through frames only if the camera, the world, a light or some of
+        the objects is animated. Keys of scenes with other rendered
+        objects are unique to the call, keys of their animated frames
+        to the frame number.
+    """
+
+    digests = digests or dict()
+    layers = [
+        LayerKeys(layer, digests.get(layer.as_pointer()))
+        for obj in objects
+        for layer in obj.data.layers
+    ]
+    render = render_state(scene, use_viewport)
+    others = untracked_objects(scene, objects, RENDERED_TYPES)
+    lights = untracked_objects(scene, objects, ('LIGHT',))
+    animated = (is_animated(scene.camera) or is_animated(scene.world)
+                or any(map(is_animated, objects))
+                or any(map(is_animated, lights)))
+    export = uuid.uuid4().hex if others else ''
+    others_animated = any(map(is_animated, others))
+    if others:
+        log(f'Render cache: { len(others) } untracked objects are rendered, '
+            f'frames are not reused by other exports')
+
+    def scene_state() -> str:
+        return digest(
+            render,
+            camera_state(scene),
+            world_state(scene),
+            tuple(object_state(obj) for obj in objects),
+            tuple(light_state(light) for light in lights),
+            export
+        )
+
+    state = scene_state()
+    current_frame = scene.frame_current
+    keys = list()
+    for frame_number in frame_numbers:
+        if animated:
+            scene.frame_set(frame_number)
+            state = scene_state()
+
+        keys.append(digest(
+            state,
+            frame_number if others_animated else None,
+            tuple((layer.visible, layer.key(frame_number))
+                  for layer in layers)
+        ))
+
+    if animated:
+        scene.frame_set(current_frame)
+
+    return keys
+
+
+class RenderCache():
+    """Directory of rendered frames with size-limited LRU eviction.
+
+        Files are named by their keys. Order of use is kept in memory
+        and restored from modification times, which are updated on use.
+    """
+
+    extension = '.png'
+
+    def __init__(self, directory: str, max_size: int) -> None:
+        self.directory = directory
+        self.max_size = max_size        # bytes
+        self.entries: OrderedDict[str, int] = OrderedDict()    # key -> size
+        self.size = 0
+
+        os.makedirs(directory, exist_ok=True)
+        files = list()
+        for entry in os.scandir(directory):
+            name, extension = os.path.splitext(entry.name)
+            if extension == self.extension and entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, name, stat.st_size))
+
+        for _, name, size in sorted(files):
+            self.entries[name] = size
+            self.size += size
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.extension)
+
+    def get(self, key: str) -> Union[str, None]:
+        """Get path of cached frame and mark it as recently used."""
+
+        if key not in self.entries:
+            return None
+
+        file_path = self.path(key)
+        try:
+            os.utime(file_path)
+        except OSError:
+            # removed outside of the cache
+            self.size -= self.entries.pop(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return file_path
+
+    def put(self, key: str, source: str) -> str:
+        """Move rendered image into the cache and get its new path."""
+
+        file_path = self.path(key)
+        os.replace(source, file_path)
+
+        self.size -= self.entries.pop(key, 0)
+        self.entries[key] = os.path.getsize(file_path)
+        self.size += self.entries[key]
+
+        return file_path
+
+    def evict(self, keep: Union[set, None] = None) -> int:
+        """Remove least recently used frames until the cache fits its size.
+
+            Frames with keys in keep are not removed. Returns number
+            of removed frames.
+        """
+
+        keep = keep or set()
+        removed = 0
+        for key in list(self.entries):
+            if self.size <= self.max_size:
+                break
+            if key in keep:
+                continue
+
+            try:
+                os.remove(self.path(key))
+            except OSError as e:
+                log(f'Cannot remove cached frame { key }: { e }', 'warning')
+            self.size -= self.entries.pop(key)
+            removed += 1
+
+        return removed
+
+
+def missing_frames(cache: RenderCache, frames: list, keys: list) -> dict:
+    """Get first frame of every key which is not cached yet."""
+
+    missing: dict[str, int] = dict()
+    for frame, key in zip(frames, keys):
+        if key not in missing and cache.get(key) is None:
+            missing[key] = frame
+
+    return missing
+
+
+def frame_runs(cache: RenderCache, keys: list) -> list:
+    """Get cached images as pairs of path and number of frames it is
+        shown for, runs of equal frames are merged."""
+
+    runs = list()
+    for key in keys:
+        if runs and runs[-1][0] == key:
+            runs[-1][1] += 1
+        else:
+            runs.append([key, 1])
+
+    return [(cache.path(key), count) for key, count in runs]
@@ -0,0 +1,237 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import bpy                                  # type: ignore
+import bpy.app.timers as timers             # type: ignore
+
+from .encoder import (
+    CODECS,
+    find_ffmpeg,
+    sequence_command,
+    write_concat_list
+)
+from .render import (
+    frame_path,
+    frame_ranges,
+    ShardedRender
+)
+from .render_cache import (
+    frame_runs,
+    RenderCache
+)
+from .utils import log
+
+from typing import Union
+import json
+import os
+import shutil
+import subprocess
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), 'sequence_worker.py')
+
+
+def redraw_panels() -> None:
+    """Redraw 3D views, so the panel shows current progress."""
+
+    window_manager = bpy.context.window_manager
+    if window_manager is None:
+        return
+
+    for window in window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+class RenderJob():
+    """Export of a recording running in background processes.
+
+        The job works on a saved copy of the file, so the scene can be
+        edited and recorded while it runs. Missing frames are rendered
+        by blender workers and stored in the render cache, then the cached
+        frames are encoded by ffmpeg or by a background blender. Progress
+        is polled by a timer.
+    """
+
+    poll_interval = 0.5
+
+    def __init__(self, work_dir: str, blend_path: str, missing: dict,
+                 keys: list, cache: RenderCache, output: str,
+                 settings, resolution: tuple) -> None:
+        self.work_dir = work_dir
+        self.keys = keys
+        self.cache = cache
+        self.output = output            # path without extension
+        self.settings = settings
+        self.resolution = resolution
+        self.frame_keys = {frame: key for key, frame in missing.items()}
+
+        self.pattern = os.path.join(work_dir, 'capture####')
+        self.render = ShardedRender(
+            blend_path,
+            self.pattern,
+            frame_ranges(sorted(missing.values())),
+            settings.workers if settings.parallel else 1,
+            settings.retries
+        )
+        self.stored = 0                 # number of cached finished shards
+        self.encoder: Union[subprocess.Popen, None] = None
+        self.state = 'RENDERING'
+        self.message = ''
+        # timers are compared by identity, keep a single bound method
+        self.callback = self.poll
+
+    def start(self) -> None:
+        """Start the render and polling of its progress."""
+
+        self.render.start()
+        timers.register(self.callback, first_interval=self.poll_interval)
+
+    def is_running(self) -> bool:
+        return self.state in ('RENDERING', 'ENCODING')
+
+    def progress(self) -> float:
+        """Get rendered portion of frames in range from 0 to 1."""
+
+        return self.render.progress()
+
+    def status(self) -> str:
+        """Get text describing state of the job."""
+
+        if self.state == 'RENDERING':
+            return (f'Rendering { self.render.rendered_frames() } / '
+                    f'{ self.render.frame_count } frames '
+                    f'({ self.progress():.0%}).')
+        if self.state == 'ENCODING':
+            return 'Encoding video.'
+        if self.state == 'FINISHED':
+            return f'Render has finished: { self.message }'
+        if self.state == 'CANCELLED':
+            return 'Render has been cancelled.'
+
+        return f'Render has failed: { self.message }'
+
+    def __store_frames__(self) -> None:
+        """Move frames of newly finished shards into the cache.
+
+            Frames are cached as soon as their shard is finished, so they
+            are not rendered again if the job is cancelled.
+        """
+
+        finished = self.render.finished
+        for shard in finished[self.stored:]:
+            for frame in shard.frames():
+                self.cache.put(
+                    self.frame_keys[frame],
+                    frame_path(self.pattern, frame)
+                )
+        self.stored = len(finished)
+
+    def __start_encoder__(self) -> None:
+        settings = self.settings
+        codec = CODECS[settings.codec]
+        output = self.output + codec.extension
+        images = frame_runs(self.cache, self.keys)
+        ffmpeg = find_ffmpeg()
+
+        if ffmpeg is not None:
+            list_path = os.path.join(self.work_dir, 'frames.ffconcat')
+            write_concat_list(images, list_path, settings.framerate)
+            command = sequence_command(
+                ffmpeg,
+                list_path,
+                output,
+                settings.framerate,
+                settings.codec,
+                settings.quality
+            )
+        else:
+            job_path = os.path.join(self.work_dir, 'sequence.json')
+            with open(job_path, 'w') as job_file:
+                json.dump({
+                    'images': images,
+                    'output': self.output,
+                    'resolution': self.resolution,
+                    'fps': settings.framerate,
+                    'container': codec.container,
+                    'codec': codec.blender_codec,
+                    'quality': settings.quality
+                }, job_file)
+            command = [
+                bpy.app.binary_path,
+                '--background',
+                '--factory-startup',
+                '--python', WORKER_SCRIPT,
+                '--', job_path
+            ]
+
+        self.message = output
+        self.encoder = subprocess.Popen(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        self.state = 'ENCODING'
+
+    def __finish__(self, state: str, message: str = '') -> None:
+        self.state = state
+        if message:
+            self.message = message
+        self.cache.evict(keep=set(self.keys))
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        log(self.status())
+
+    def poll(self) -> Union[float, None]:
+        """Advance the job, called by blender timer."""
+
+        if self.state == 'RENDERING':
+            running = self.render.poll()
+            self.__store_frames__()
+            if not running:
+                if self.render.failed:
+                    frames = ', '.join(
+                        f'{ shard.start }-{ shard.end }'
+                        for shard in self.render.failed
+                    )
+                    self.__finish__('FAILED', f'frames { frames }')
+                else:
+                    self.__start_encoder__()
+
+        elif self.state == 'ENCODING':
+            code = self.encoder.poll()
+            if code == 0:
+                self.__finish__('FINISHED')
+            elif code is not None:
+                self.__finish__('FAILED', 'video encoding')
+
+        redraw_panels()
+
+        return self.poll_interval if self.is_running() else None
+
+    def cancel(self) -> None:
+        """Stop all processes of the job."""
+
+        if not self.is_running():
+            return
+
+        self.render.cancel()
+        self.__store_frames__()
+        if self.encoder is not None and self.encoder.poll() is None:
+            self.encoder.terminate()
+            self.encoder.wait()
+
+        if timers.is_registered(self.callback):
+            timers.unregister(self.callback)
+        self.__finish__('CANCELLED')
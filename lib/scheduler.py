@@ -0,0 +1,223 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+import bpy.app.timers as timers             # type: ignore
+
+from .stats import stats
+from .trace import tracer
+from .utils import log
+
+from collections import deque
+from typing import Callable, Union
+import heapq
+import time
+import traceback
+
+
+class Scheduler():
+    """Scheduler calling observing functions of all active observers.
+
+        A single blender timer is registered for all observers. Every tick
+        calls the observing functions which are due and sleeps until the
+        next observer becomes due. Due times are kept in a heap, so a tick
+        only touches due observers regardless of how many are scheduled.
+        An observer whose function fails, e.g. as its struct has been
+        removed by undo or file load, is dropped and the others go on.
+    """
+
+    history_length = 256
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        # observers are keyed by id, bpy structs are not reliably hashable
+        self.observers: dict[int, object] = dict()
+        self.due: dict[int, float] = dict()         # observer id -> due time
+        # (due time, observer id), outdated entries are skipped when popped
+        self.queue: list[tuple] = list()
+        # timers are compared by identity, keep a single bound method
+        self.callback = self.tick
+
+        self.tick_count = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.durations = deque(maxlen=self.history_length)
+        self.failures = deque(maxlen=self.history_length)
+
+    def __len__(self) -> int:
+        return len(self.observers)
+
+    def __schedule__(self, key: int, due_time: float) -> None:
+        self.due[key] = due_time
+        heapq.heappush(self.queue, (due_time, key))
+
+    def __fail__(self, key: int, error: Exception) -> None:
+        """Drop observer whose observing function has failed."""
+
+        observer = self.observers.pop(key)
+        self.due.pop(key, None)
+        name = getattr(observer.func, 'func', observer.func).__name__
+        self.failures.append(f'{ name }: { error!r}')
+        stats.count('failed')
+        log(f'Observing function { name } failed, observer is dropped.\n'
+            f'{ traceback.format_exc() }', 'error')
+
+    def is_scheduled(self, observer) -> bool:
+        """Check if observer is scheduled for observation."""
+
+        return id(observer) in self.observers
+
+    def add(self, observer) -> None:
+        """Schedule observer, it will be observed on the next tick."""
+
+        self.observers[id(observer)] = observer
+        self.__schedule__(id(observer), self.clock())
+
+        if not timers.is_registered(self.callback):
+            timers.register(self.callback)
+
+    def remove(self, observer) -> None:
+        """Stop observing observer."""
+
+        self.observers.pop(id(observer), None)
+        self.due.pop(id(observer), None)
+
+        if not self.due:
+            self.queue.clear()
+            if timers.is_registered(self.callback):
+                timers.unregister(self.callback)
+
+    def wake(self, observers: list) -> None:
+        """Make observers due immediately.
+
+            Used by event handlers, so the change is observed without
+            waiting for the polling interval to pass.
+        """
+
+        now = self.clock()
+        woken = False
+
+        for observer in observers:
+            key = id(observer)
+            if key in self.due and self.due[key] > now:
+                self.__schedule__(key, now)
+                woken = True
+
+        if woken:
+            stats.count('wake')
+            # restart the timer so the tick happens right away
+            if timers.is_registered(self.callback):
+                timers.unregister(self.callback)
+            timers.register(self.callback, first_interval=0.0)
+
+    def clear(self) -> None:
+        """Remove all observers and unregister the timer."""
+
+        self.observers.clear()
+        self.due.clear()
+        self.queue.clear()
+
+        if timers.is_registered(self.callback):
+            timers.unregister(self.callback)
+
+    def tick(self) -> Union[float, None]:
+        """Observe all due observers.
+
+            This function is called by blender and returns time until
+            the next observer is due.
+        """
+
+        start_ns = time.perf_counter_ns()
+        now = self.clock()
+        observers = self.observers
+        due = self.due
+        queue = self.queue
+        observed = list()
+        timed = stats.enabled
+        traced = tracer.enabled
+
+        while queue and queue[0][0] <= now:
+            due_time, key = heapq.heappop(queue)
+            # skip rescheduled observers and observers removed
+            # by previously called functions
+            if due.get(key) != due_time:
+                continue
+            func = observers[key].func
+            func_start = time.perf_counter_ns() if timed or traced else 0
+            try:
+                interval = func()
+            except Exception as e:
+                self.__fail__(key, e)
+                continue
+            if func_start:
+                # observing functions are partials of module functions
+                name = func.func.__name__
+                if timed:
+                    duration_ns = time.perf_counter_ns() - func_start
+                    stats.add(name, duration_ns / 1e9)
+                tracer.complete('observer', func_start, name)
+            # reschedule after the loop, so no observer runs twice a tick
+            if key in due:
+                observed.append((key, now + interval))
+
+        for key, due_time in observed:
+            if key in due:
+                self.__schedule__(key, due_time)
+
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
+        self.tick_count += 1
+        self.last_duration = duration
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        self.durations.append(duration)
+        if timed:
+            stats.add('tick', duration)
+            stats.count('observed', len(observed))
+        tracer.complete(
+            'scheduler',
+            start_ns,
+            'Tick {}, {} observed',
+            self.tick_count,
+            len(observed)
+        )
+
+        # drop outdated entries, so the first one is the next due time
+        while queue and due.get(queue[0][1]) != queue[0][0]:
+            heapq.heappop(queue)
+
+        if not queue:
+            return None
+
+        return max(0.0, queue[0][0] - self.clock())
+
+    def report(self) -> dict:
+        """Get statistics of tick durations in seconds."""
+
+        if self.tick_count:
+            mean = self.total_duration / self.tick_count
+        else:
+            mean = 0.0
+
+        return {
+            'observers': len(self.observers),
+            'ticks': self.tick_count,
+            'last': self.last_duration,
+            'mean': mean,
+            'max': self.max_duration,
+            'failures': len(self.failures),
+        }
+
+
+# shared scheduler instance
+scheduler = Scheduler()
@@ -0,0 +1,68 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Script compiling rendered images into a video in background blender.
+
+    Used by background render jobs when ffmpeg is not installed:
+
+        blender -b --factory-startup --python sequence_worker.py -- job.json
+
+    The job file holds images as pairs of path and frame count, output
+    path without extension, resolution and FFMPEG output settings.
+    The render operator compiles images in the same way in a temporary
+    scene when ffmpeg is not installed.
+"""
+
+
+import bpy      # type: ignore
+
+import json
+import os
+import sys
+
+
+def compile_video(scene, job: dict) -> None:
+    """Render images of the job through the sequencer of the scene."""
+
+    render = scene.render
+    render.resolution_x, render.resolution_y = job['resolution']
+    render.resolution_percentage = 100
+    render.fps = job['fps']
+    render.image_settings.file_format = 'FFMPEG'
+    render.ffmpeg.format = job['container']
+    render.ffmpeg.codec = job['codec']
+    render.ffmpeg.constant_rate_factor = job['quality']
+    render.filepath = job['output']
+    # images already have the view transform of the recorded scene
+    scene.view_settings.view_transform = 'Standard'
+
+    images = [image for image, count in job['images'] for _ in range(count)]
+    editor = scene.sequence_editor_create()
+    strip = editor.sequences.new_image(
+        name=os.path.basename(images[0]),
+        filepath=images[0],
+        frame_start=1,
+        channel=1
+    )
+    for image in images[1:]:
+        strip.elements.append(os.path.basename(image))
+
+    strip.frame_final_duration = len(images)
+    scene.frame_start = 1
+    scene.frame_end = len(images)
+    bpy.ops.render.render(animation=True, scene=scene.name)
+
+
+if __name__ == '__main__':
+    with open(sys.argv[sys.argv.index('--') + 1]) as job_file:
+        compile_video(bpy.context.scene, json.load(job_file))
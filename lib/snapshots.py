@@ -0,0 +1,308 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from bpy.types import (     # type: ignore
+    GPencilFrame,
+    GPencilLayer,
+    GPencilStroke
+)
+
+from .fingerprint import points_fingerprints
+from .points import (
+    FramePoints,
+    read_frame_points
+)
+
+from bisect import bisect_right
+from collections import Counter
+from typing import Union
+import hashlib
+
+
+class StrokeData():
+    """Copy of a single stroke's geometry and style.
+
+        Instances are shared between all snapshots containing the stroke,
+        so they must never be modified after creation.
+    """
+
+    __slots__ = (
+        'co',
+        'pressure',
+        'strength',
+        'material_index',
+        'line_width',
+        'hardness',
+        'use_cyclic',
+        'display_mode'
+    )
+
+    def __init__(self, points: FramePoints, index: int) -> None:
+        point_range = points.stroke_slice(index)
+        self.co = points.co[point_range].copy()
+        self.pressure = points.pressure[point_range].copy()
+        self.strength = points.strength[point_range].copy()
+
+        self.material_index = int(points.material_index[index])
+        self.line_width = int(points.line_width[index])
+        self.hardness = float(points.hardness[index])
+        self.use_cyclic = bool(points.use_cyclic[index])
+        self.display_mode = points.display_mode[index]
+
+    def __len__(self) -> int:
+        return len(self.pressure)
+
+    def write(self, frame: GPencilFrame) -> GPencilStroke:
+        """Recreate the stroke inside of given frame."""
+
+        stroke = frame.strokes.new()
+        stroke.material_index = self.material_index
+        stroke.line_width = self.line_width
+        stroke.hardness = self.hardness
+        stroke.use_cyclic = self.use_cyclic
+        stroke.display_mode = self.display_mode
+
+        points = stroke.points
+        points.add(len(self))
+        points.foreach_set('co', self.co.ravel())
+        points.foreach_set('pressure', self.pressure)
+        points.foreach_set('strength', self.strength)
+
+        return stroke
+
+
+class StrokeStore():
+    """Storage of stroke data shared by all snapshots of a Grease Pencil.
+
+        Strokes are deduplicated by their key, so a stroke which stays
+        unchanged over many steps is stored only once.
+    """
+
+    def __init__(self) -> None:
+        self.strokes: dict[tuple, StrokeData] = dict()
+        self.digests: dict[tuple, bytes] = dict()
+
+    def __len__(self) -> int:
+        return len(self.strokes)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.strokes
+
+    def add(self, key: tuple, points: FramePoints, index: int) -> None:
+        """Store a stroke under a key unless it is already stored.
+
+            Point data and style of the stroke are copied from points of
+            its frame. Keys are stroke fingerprints, which hash the style
+            too, so strokes differing only in style are stored apart.
+        """
+
+        if key not in self.strokes:
+            self.strokes[key] = StrokeData(points, index)
+
+    def get(self, key: tuple) -> StrokeData:
+        """Get stored stroke data."""
+
+        return self.strokes[key]
+
+    def digest(self, key: tuple) -> bytes:
+        """Get hash of point data and style of a stored stroke.
+
+            Stored strokes never change, so every stroke is hashed once.
+        """
+
+        value = self.digests.get(key)
+        if value is None:
+            data = self.strokes[key]
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(data.co.tobytes())
+            hasher.update(data.pressure.tobytes())
+            hasher.update(data.strength.tobytes())
+            hasher.update(repr((
+                data.material_index,
+                data.line_width,
+                data.hardness,
+                data.use_cyclic,
+                data.display_mode
+            )).encode())
+            value = self.digests[key] = hasher.digest()
+
+        return value
+
+    def point_count(self) -> int:
+        """Get number of points held by the store."""
+
+        return sum(len(data) for data in self.strokes.values())
+
+    def memory_size(self) -> int:
+        """Get number of bytes used by stored point data."""
+
+        return sum(
+            data.co.nbytes + data.pressure.nbytes + data.strength.nbytes
+            for data in self.strokes.values()
+        )
+
+
+class LayerSnapshots():
+    """Delta-encoded history of strokes in a single layer.
+
+        Every recorded step only stores the keys of removed strokes and
+        the keys and positions of added strokes. Full stroke lists are
+        rebuilt on demand by replaying the deltas from the closest
+        checkpoint.
+    """
+
+    checkpoint_interval = 64
+
+    def __init__(self, store: StrokeStore, frame: GPencilFrame,
+                 start_step: int = 0) -> None:
+        self.store = store
+        self.start_step = start_step
+        self.keys: list[tuple] = self.__read_frame__(frame)
+        self.base: list[tuple] = list(self.keys)
+
+        self.steps: list[int] = list()              # steps with a delta
+        self.deltas: list[tuple] = list()           # (removed, added)
+        self.checkpoints: dict[int, list] = dict()  # delta index -> keys
+        self.materialized: list[GPencilFrame] = list()
+        # frame number -> hash of strokes of a materialized frame
+        self.digests: dict[int, str] = dict()
+
+    def __read_frame__(self, frame: GPencilFrame) -> list:
+        """Read keys of all strokes in a frame and store new strokes."""
+
+        points = read_frame_points(frame)
+        keys = points_fingerprints(points)
+
+        for index, key in enumerate(keys):
+            self.store.add(key, points, index)
+
+        return keys
+
+    def record(self, step: int, frame: GPencilFrame,
+               keys: Union[list, None] = None,
+               points: Union[FramePoints, None] = None) -> bool:
+        """Record the current state of frame as a given step.
+
+            Stroke fingerprints and point data of the frame can be passed
+            when they are already known, then the frame is not read again.
+            Returns whether the frame changed since the previous step.
+        """
+
+        old_keys = self.keys
+        if keys is None:
+            new_keys = self.__read_frame__(frame)
+        else:
+            new_keys = list(keys)
+
+        removed = Counter(old_keys)
+        removed.subtract(new_keys)
+        removed = tuple(removed.elements())
+
+        kept = Counter(old_keys)
+        kept.subtract(removed)
+        added = list()
+        for index, key in enumerate(new_keys):
+            if kept[key] > 0:
+                kept[key] -= 1
+            else:
+                added.append((index, key))
+
+        if not (removed or added):
+            return False
+
+        if keys is not None:
+            for index, key in added:
+                self.store.add(key, points, index)
+
+        if self.__replay__(old_keys, removed, added) != new_keys:
+            # strokes have been reordered, store a full replacement
+            removed = tuple(old_keys)
+            added = list(enumerate(new_keys))
+
+        self.steps.append(step)
+        self.deltas.append((removed, tuple(added)))
+        if len(self.deltas) % self.checkpoint_interval == 0:
+            self.checkpoints[len(self.deltas)] = list(new_keys)
+        self.keys = new_keys
+
+        return True
+
+    @staticmethod
+    def __replay__(keys: list, removed: tuple, added: tuple) -> list:
+        """Apply a single delta to a list of stroke keys."""
+
+        keys = list(keys)
+        for key in removed:
+            keys.remove(key)
+        for index, key in added:
+            keys.insert(index, key)
+
+        return keys
+
+    def keys_at(self, step: int) -> list:
+        """Rebuild list of stroke keys valid after a given step."""
+
+        count = bisect_right(self.steps, step)
+        start = count - count % self.checkpoint_interval
+
+        keys = self.checkpoints.get(start, self.base)
+        for removed, added in self.deltas[start:count]:
+            keys = self.__replay__(keys, removed, added)
+
+        return keys
+
+    def materialize(self, layer: GPencilLayer,
+                    origin: int, live_number: int) -> None:
+        """Rebuild full frames of recorded steps inside of a layer.
+
+            The state after step N is placed onto frame origin + N - 1.
+            Steps without a change in this layer are left out, so Grease
+            Pencil holds the previous keyframe on them. The observed frame
+            placed at live_number already holds the latest state.
+        """
+
+        self.release(layer)
+
+        keys = self.base
+        base_number = origin + self.start_step
+        first_step = self.steps[0] if self.steps else None
+
+        if base_number < live_number and first_step != self.start_step + 1:
+            self.__write_frame__(layer, base_number, keys)
+
+        for step, (removed, added) in zip(self.steps, self.deltas):
+            keys = self.__replay__(keys, removed, added)
+            self.__write_frame__(layer, origin + step - 1, keys)
+
+    def __write_frame__(self, layer: GPencilLayer,
+                        frame_number: int, keys: list) -> None:
+        """Create a frame containing strokes with given keys."""
+
+        frame = layer.frames.new(frame_number)
+        hasher = hashlib.blake2b(digest_size=16)
+        for key in keys:
+            self.store.get(key).write(frame)
+            hasher.update(self.store.digest(key))
+
+        self.materialized.append(frame)
+        self.digests[frame_number] = hasher.hexdigest()
+
+    def release(self, layer: GPencilLayer) -> None:
+        """Remove frames created by materialization."""
+
+        for frame in self.materialized:
+            layer.frames.remove(frame)
+
+        self.materialized.clear()
+        self.digests.clear()
@@ -0,0 +1,147 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Counters and timing histograms of hot paths of the add-on.
+
+    Collection is disabled by default. Measured code checks the enabled
+    flag once and skips the clock entirely when it is off:
+
+        start = time.perf_counter() if stats.enabled else 0.0
+        ...
+        if start:
+            stats.add('name', time.perf_counter() - start)
+"""
+
+
+from typing import Union
+import json
+import time
+
+
+class Histogram():
+    """Durations of a measured code path.
+
+        Durations are counted in buckets of powers of two microseconds,
+        bucket i holds durations shorter than 2 ** i microseconds.
+    """
+
+    bucket_count = 24
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * self.bucket_count
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+        bucket = int(duration * 1e6).bit_length()
+        self.buckets[min(bucket, self.bucket_count - 1)] += 1
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """Get upper bound of the bucket holding the percentile in seconds."""
+
+        if not self.count:
+            return 0.0
+
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                break
+
+        return min((1 << bucket) / 1e6, self.max)
+
+    def report(self) -> dict:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean(),
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max': self.max,
+            'buckets_us': {
+                f'<{ 1 << bucket }': count
+                for bucket, count in enumerate(self.buckets)
+                if count
+            }
+        }
+
+
+class Stats():
+    """Named counters and timing histograms."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.started = 0.0
+        self.histograms: dict[str, Histogram] = dict()
+        self.counters: dict[str, int] = dict()
+
+    def set_enabled(self, status: bool) -> None:
+        if status and not self.enabled:
+            self.started = time.time()
+        self.enabled = status
+
+    def add(self, name: str, duration: float) -> None:
+        """Add duration in seconds to the histogram of name."""
+
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(duration)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def clear(self) -> None:
+        self.histograms.clear()
+        self.counters.clear()
+        self.started = time.time() if self.enabled else 0.0
+
+    def report(self) -> dict:
+        """Get collected statistics, durations are in seconds."""
+
+        return {
+            'started': self.started,
+            'histograms': {
+                name: histogram.report()
+                for name, histogram in sorted(self.histograms.items())
+            },
+            'counters': dict(sorted(self.counters.items()))
+        }
+
+    def dump(self, file_path: str,
+             extra: Union[dict, None] = None) -> None:
+        """Write collected statistics into a JSON file."""
+
+        report = self.report()
+        report['time'] = time.time()
+        if extra:
+            report.update(extra)
+
+        with open(file_path, 'w') as dump_file:
+            json.dump(report, dump_file, indent=2)
+
+
+# shared statistics instance
+stats = Stats()
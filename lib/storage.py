@@ -0,0 +1,327 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Append-only binary log of recorded changes.
+
+    The file starts with a header followed by length-prefixed records:
+
+        header:  magic (6 bytes), version (u16)
+        record:  payload length (u32), kind (u8), payload
+
+    All numbers are little-endian. Strings are stored as u16 length
+    followed by UTF-8 bytes. Stroke keys are stored as point count (u32),
+    material index (i32) and coordinate hash (u32). Strokes are stored
+    with line width (i32), hardness (f32) and cyclic flag (u8), logs of
+    version 1 hold only line width. Records are always appended in the
+    version of the log file.
+"""
+
+
+import numpy as np      # type: ignore
+
+from .points import FramePoints
+
+from collections import namedtuple
+from typing import Iterator, Union
+import mmap
+import os
+import struct
+import zlib
+
+
+MAGIC = b'ARLOG\x00'
+VERSION = 2
+
+HEADER = struct.Struct('<6sH')
+RECORD = struct.Struct('<IB')
+SESSION = struct.Struct('<di')           # time, origin frame
+CHANGE = struct.Struct('<Id')           # step, time
+KEY = struct.Struct('<IiI')             # count, material, hash
+STEP = struct.Struct('<I')
+LINE_WIDTH = struct.Struct('<i')         # stroke style of version 1
+STYLE = struct.Struct('<if?')           # line width, hardness, cyclic
+STRING = struct.Struct('<H')
+
+# record kinds
+KIND_SESSION, KIND_CHANGE, KIND_STROKE, KIND_REMOVE = range(4)
+
+SessionRecord = namedtuple('SessionRecord', 'time origin')
+ChangeRecord = namedtuple('ChangeRecord', 'step time layer text icon')
+StrokeRecord = namedtuple(
+    'StrokeRecord',
+    'step layer key line_width hardness use_cyclic co pressure strength'
+)
+RemoveRecord = namedtuple('RemoveRecord', 'step layer key')
+
+
+def log_name(name: str, blend_path: str = '') -> str:
+    """Get name of the log file for Grease Pencil without extension.
+
+        Logs are kept per blend file and Grease Pencil, as Grease Pencils
+        of different files often share default names. The file is told
+        apart by its name and a hash of its path, unsaved files share
+        a single name.
+    """
+
+    if blend_path:
+        stem = os.path.splitext(os.path.basename(blend_path))[0]
+        path_hash = zlib.crc32(os.path.abspath(blend_path).encode())
+        blend_name = f'{ stem }-{ path_hash:08x}'
+    else:
+        blend_name = 'untitled'
+
+    return ''.join(
+        c if c.isalnum() or c in '-_' else '_'
+        for c in f'{ blend_name }-{ name }'
+    )
+
+
+def log_path(directory: str, name: str, blend_path: str = '') -> str:
+    """Get path of the log file for Grease Pencil of a given name."""
+
+    return os.path.join(directory, log_name(name, blend_path) + '.arlog')
+
+
+def pack_string(text: str) -> bytes:
+    data = text.encode('utf-8')[:0xFFFF]
+    return STRING.pack(len(data)) + data
+
+
+def unpack_string(buffer, offset: int) -> tuple:
+    length, = STRING.unpack_from(buffer, offset)
+    start = offset + STRING.size
+    text = bytes(buffer[start:start + length]).decode('utf-8', 'replace')
+
+    return text, start + length
+
+
+class RecordingLog():
+    """Writer appending records to a log file.
+
+        Every record is written and flushed as soon as it is appended,
+        so the log stays usable even if blender is closed unexpectedly.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.file = open(path, 'a+b')
+        self.version = VERSION
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION))
+        else:
+            self.file.seek(0)
+            header = self.file.read(HEADER.size)
+            if len(header) == HEADER.size:
+                magic, self.version = HEADER.unpack(header)
+            if self.version > VERSION:
+                self.file.close()
+                raise ValueError(f'{ path } has a newer log version.')
+
+    def __append__(self, kind: int, *parts: bytes) -> None:
+        payload = b''.join(parts)
+        self.file.write(RECORD.pack(len(payload), kind))
+        self.file.write(payload)
+        self.file.flush()
+
+    def is_open(self) -> bool:
+        return not self.file.closed
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+
+    def append_session(self, time: float, origin: int) -> None:
+        """Append record marking the start of recording session."""
+
+        self.__append__(KIND_SESSION, SESSION.pack(time, origin))
+
+    def append_change(self, step: int, time: float,
+                      layer: str, text: str, icon: str) -> None:
+        """Append record describing a recorded change."""
+
+        self.__append__(
+            KIND_CHANGE,
+            CHANGE.pack(step, time),
+            pack_string(layer),
+            pack_string(text),
+            pack_string(icon)
+        )
+
+    def append_stroke(self, step: int, layer: str, key: tuple,
+                      points: FramePoints, index: int) -> None:
+        """Append record with point data of an added stroke."""
+
+        point_range = points.stroke_slice(index)
+        line_width = int(points.line_width[index])
+        if self.version > 1:
+            style = STYLE.pack(
+                line_width,
+                float(points.hardness[index]),
+                bool(points.use_cyclic[index])
+            )
+        else:
+            style = LINE_WIDTH.pack(line_width)
+
+        self.__append__(
+            KIND_STROKE,
+            STEP.pack(step),
+            pack_string(layer),
+            KEY.pack(*key[:3]),
+            style,
+            points.co[point_range].astype('<f4').tobytes(),
+            points.pressure[point_range].astype('<f4').tobytes(),
+            points.strength[point_range].astype('<f4').tobytes()
+        )
+
+    def append_remove(self, step: int, layer: str, key: tuple) -> None:
+        """Append record of a removed stroke."""
+
+        self.__append__(
+            KIND_REMOVE,
+            STEP.pack(step),
+            pack_string(layer),
+            KEY.pack(*key[:3])
+        )
+
+
+class RecordingLogReader():
+    """Reader of a log file.
+
+        The file is memory-mapped and records are decoded only when
+        accessed. Point data of strokes are returned as read-only NumPy
+        views into the mapped file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, 'rb')
+        self.offsets: Union[list, None] = None
+        self.version = VERSION
+
+        size = os.fstat(self.file.fileno()).st_size
+        if size < HEADER.size:
+            self.map = b''
+            return
+
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or self.version > VERSION:
+            self.close()
+            raise ValueError(f'{ path } is not a supported recording log.')
+
+    def __len__(self) -> int:
+        return len(self.index())
+
+    def __getitem__(self, index: int):
+        return self.decode(self.index()[index])
+
+    def __iter__(self) -> Iterator:
+        return (self.decode(offset) for offset in self.index())
+
+    def close(self) -> None:
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def index(self) -> list:
+        """Get offsets of all complete records.
+
+            Only record headers are read, payloads are skipped.
+        """
+
+        if self.offsets is None:
+            offsets = list()
+            offset = HEADER.size if self.map else 0
+            end = len(self.map)
+            unpack = RECORD.unpack_from
+
+            while offset + RECORD.size <= end:
+                length, _ = unpack(self.map, offset)
+                if offset + RECORD.size + length > end:
+                    break       # incomplete record at the end of file
+                offsets.append(offset)
+                offset += RECORD.size + length
+
+            self.offsets = offsets
+
+        return self.offsets
+
+    def kind(self, offset: int) -> int:
+        """Get kind of record at offset."""
+
+        return RECORD.unpack_from(self.map, offset)[1]
+
+    def decode(self, offset: int):
+        """Decode record at offset."""
+
+        length, kind = RECORD.unpack_from(self.map, offset)
+        offset += RECORD.size
+        buffer = self.map
+
+        if kind == KIND_SESSION:
+            return SessionRecord(*SESSION.unpack_from(buffer, offset))
+
+        if kind == KIND_CHANGE:
+            step, time = CHANGE.unpack_from(buffer, offset)
+            layer, offset = unpack_string(buffer, offset + CHANGE.size)
+            text, offset = unpack_string(buffer, offset)
+            icon, offset = unpack_string(buffer, offset)
+            return ChangeRecord(step, time, layer, text, icon)
+
+        step, = STEP.unpack_from(buffer, offset)
+        layer, offset = unpack_string(buffer, offset + STEP.size)
+        key = KEY.unpack_from(buffer, offset)
+        offset += KEY.size
+
+        if kind == KIND_REMOVE:
+            return RemoveRecord(step, layer, key)
+
+        if kind == KIND_STROKE:
+            if self.version > 1:
+                line_width, hardness, use_cyclic = \
+                    STYLE.unpack_from(buffer, offset)
+                offset += STYLE.size
+            else:
+                line_width, = LINE_WIDTH.unpack_from(buffer, offset)
+                hardness, use_cyclic = 1.0, False
+                offset += LINE_WIDTH.size
+            count = key[0]
+            co = np.frombuffer(buffer, '<f4', count * 3, offset)
+            offset += co.nbytes
+            pressure = np.frombuffer(buffer, '<f4', count, offset)
+            offset += pressure.nbytes
+            strength = np.frombuffer(buffer, '<f4', count, offset)
+            return StrokeRecord(
+                step,
+                layer,
+                key,
+                line_width,
+                hardness,
+                use_cyclic,
+                co.reshape(count, 3),
+                pressure,
+                strength
+            )
+
+        raise ValueError(f'Unknown record kind { kind }.')
+
+    def records(self, kind: int) -> Iterator:
+        """Iterate over decoded records of a given kind."""
+
+        for offset in self.index():
+            if self.kind(offset) == kind:
+                yield self.decode(offset)
@@ -0,0 +1,337 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Export of recordings into an animated SVG.
+
+    Strokes are read from columnar files of recording logs, so no frames
+    are built and nothing is rendered. Every stroke becomes one path
+    which is shown from the step adding it until the step removing it.
+    Only the latest recording session is exported, as steps of the
+    video also belong to the current session. Paths are written one
+    layer at a time.
+
+    Coordinates are written in tenths of a pixel as integer offsets
+    from the previous point, which keeps the file small.
+"""
+
+
+import numpy as np      # type: ignore
+
+from .columnar import (
+    NEVER,
+    ColumnarRecording
+)
+from .compaction import realtime_starts
+from .rasterizer import (
+    material_colors,
+    CameraProjection,
+    THICKNESS_SCALE
+)
+
+from typing import TextIO
+from xml.sax.saxutils import quoteattr
+
+
+# svg units per pixel of the output
+UNITS = 10
+
+
+class SessionStrokes():
+    """Strokes and changes of the latest session of a recording.
+
+        Steps are counted from the start of the session, strokes which
+        are never removed have no removed step.
+    """
+
+    def __init__(self, recording: ColumnarRecording) -> None:
+        self.recording = recording
+        first, last = recording.session_steps()
+
+        added = recording.column('added')
+        self.start = int(np.searchsorted(added, first))
+        self.added = added[self.start:].astype(np.int64) - first
+        removed = recording.column('removed')[self.start:]
+        self.removed = np.where(
+            removed == NEVER,
+            -1,
+            removed.astype(np.int64) - first
+        )
+
+        # stroke indices by layer name
+        layers = recording.column('layer')[self.start:]
+        self.layers = {
+            name: self.start + np.flatnonzero(layers == index)
+            for index, name in enumerate(recording.layer_names)
+        }
+
+        steps = recording.column('steps')
+        in_session = (steps >= first) & (steps <= last)
+        self.times = dict(zip(
+            (steps[in_session].astype(np.int64) - first).tolist(),
+            recording.column('times')[in_session].tolist()
+        ))
+
+        points = recording.column('points')[self.start]
+        co = recording.column('co')[points:]
+        if len(co):
+            self.low, self.high = co.min(axis=0), co.max(axis=0)
+        else:
+            self.low = self.high = None
+
+    def corners(self, matrix: np.ndarray) -> np.ndarray:
+        """Get corners of bounds of all points in world coordinates."""
+
+        if self.low is None:
+            return np.empty((0, 3))
+
+        corners = np.array([
+            [x, y, z]
+            for x in (self.low[0], self.high[0])
+            for y in (self.low[1], self.high[1])
+            for z in (self.low[2], self.high[2])
+        ], dtype=np.float64)
+        return corners @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+class StepTimes():
+    """Start times of steps in seconds of the animation.
+
+        Timing follows render settings: steps take one frame each,
+        time-lapse spreads steps evenly over the target length and
+        real-time timing follows recorded times of changes.
+    """
+
+    def __init__(self, settings, times: dict) -> None:
+        self.timing = settings.timing
+        steps = sorted(times)
+        last = steps[-1] if steps else 1
+
+        if self.timing == 'TIMELAPSE':
+            self.duration = settings.target_length / max(1, last)
+        else:
+            self.duration = 1 / settings.framerate
+
+        self.steps = np.array(steps, dtype=np.int64)
+        self.starts = realtime_starts(
+            np.array([times[step] for step in steps]),
+            settings.speed,
+            settings.max_gap
+        )
+
+    def start(self, step: int) -> float:
+        """Get time when the state after step is shown."""
+
+        if self.timing != 'REALTIME':
+            return max(0, step - 1) * self.duration
+
+        # steps without change records start with the next change
+        index = int(np.searchsorted(self.steps, step))
+        if index >= len(self.steps):
+            return float(self.starts[-1]) if len(self.starts) else 0.0
+
+        return float(self.starts[index])
+
+
+class SvgObject():
+    """Grease Pencil object exported from its recording."""
+
+    def __init__(self, obj, recording: ColumnarRecording) -> None:
+        gpen = obj.data
+        self.name = gpen.name
+        self.session = SessionStrokes(recording)
+        self.matrix = np.array(obj.matrix_world, dtype=np.float64)
+        self.thickness = getattr(gpen, 'pixel_factor', 1.0) \
+            / THICKNESS_SCALE
+        self.colors = material_colors(gpen)
+        # layers of the object from the bottom, removed layers on top
+        self.layers = [
+            (layer.info, layer.hide, layer.opacity,
+             getattr(layer, 'line_change', 0))
+            for layer in gpen.layers
+        ]
+        known = {layer.info for layer in gpen.layers}
+        self.layers.extend(
+            (name, False, 1.0, 0)
+            for name in self.session.layers
+            if name not in known
+        )
+
+
+def scene_projection(scene, svg_objects: list) -> CameraProjection:
+    """Get projection of the scene camera at render resolution.
+
+        Without a camera, the view is fitted to bounds of recorded points.
+    """
+
+    render = scene.render
+    factor = render.resolution_percentage / 100
+    width = max(1, int(render.resolution_x * factor))
+    height = max(1, int(render.resolution_y * factor))
+
+    if scene.camera is not None:
+        return CameraProjection.from_camera(scene.camera, width, height)
+
+    corners = [
+        svg_object.session.corners(svg_object.matrix)
+        for svg_object in svg_objects
+    ]
+    return CameraProjection.fit(np.concatenate(corners), width, height)
+
+
+def color_hex(color: np.ndarray) -> str:
+    red, green, blue = (np.clip(color[:3], 0.0, 1.0) * 255 + 0.5).astype(int)
+    return f'#{ red:02x}{ green:02x}{ blue:02x}'
+
+
+def path_data(pixels: np.ndarray) -> str:
+    """Get path data of a polyline as relative integer offsets."""
+
+    units = np.rint(pixels * UNITS).astype(np.int64)
+    offsets = np.diff(units, axis=0)
+    # points closer than a unit do not change the path
+    offsets = offsets[offsets.any(axis=1)]
+    if len(offsets) == 0:
+        offsets = np.zeros((1, 2), dtype=np.int64)
+
+    return (f'M{ units[0, 0] } { units[0, 1] }l'
+            + ' '.join(map(str, offsets.ravel().tolist())))
+
+
+def write_timing(svg_file: TextIO, begin: float, end) -> None:
+    """Write animation showing a path from begin until end."""
+
+    if end is None:
+        svg_file.write(
+            f'<set attributeName="visibility" to="visible" '
+            f'begin="{ begin:.3f}s" fill="freeze"/>'
+        )
+    else:
+        svg_file.write(
+            f'<set attributeName="visibility" to="visible" '
+            f'begin="{ begin:.3f}s" end="{ end:.3f}s"/>'
+        )
+
+
+def write_layer(svg_file: TextIO, svg_object: SvgObject, index: int,
+                layer: tuple, projection: CameraProjection,
+                times: StepTimes) -> int:
+    """Write paths of all strokes of a layer, get number of paths."""
+
+    name, hidden, opacity, line_change = layer
+    indices = svg_object.session.layers.get(name)
+    if hidden or indices is None or not len(indices):
+        return 0
+
+    svg_file.write(f'<g id={ quoteattr(f"{ svg_object.name }.{ name }") }')
+    if opacity < 1.0:
+        svg_file.write(f' opacity="{ opacity:.3f}"')
+    svg_file.write('>\n')
+
+    session = svg_object.session
+    recording = session.recording
+    matrix = svg_object.matrix
+    colors = svg_object.colors
+    count = 0
+
+    for stroke_index in indices.tolist():
+        record = recording.stroke(stroke_index)
+        material = record.key[1]
+        if material >= len(colors) or colors[material] is None:
+            continue
+
+        world = record.co.astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+        pixels, factor = projection.project(world)
+        visible = factor > 0
+        if not visible.any():
+            continue
+
+        # paths have a single width, pressure is averaged
+        width = (float(np.mean(factor[visible] * record.pressure[visible]))
+                 * (record.line_width + line_change)
+                 * svg_object.thickness * UNITS)
+        strength = float(np.mean(record.strength))
+        data = path_data(pixels[visible])
+        if record.use_cyclic and visible.all():
+            data += 'z'
+
+        svg_file.write(
+            f'<path class="o{ index }m{ material }" '
+            f'stroke-width="{ width:.1f}" d="{ data }"'
+        )
+        if strength < 1.0:
+            # inline style overrides opacity of the material class
+            alpha = float(colors[material][3]) * strength
+            svg_file.write(f' style="stroke-opacity:{ alpha:.3f}"')
+
+        begin = times.start(int(session.added[stroke_index - session.start]))
+        end_step = int(session.removed[stroke_index - session.start])
+        end = None if end_step < 0 else times.start(end_step)
+        if begin <= 0.0 and end is None:
+            svg_file.write('/>\n')
+        else:
+            svg_file.write(' visibility="hidden">')
+            write_timing(svg_file, begin, end)
+            svg_file.write('</path>\n')
+        count += 1
+
+    svg_file.write('</g>\n')
+
+    return count
+
+
+def export_svg(output: str, svg_objects: list, projection: CameraProjection,
+               times: StepTimes, background: bool = True) -> int:
+    """Write recorded strokes of objects into an animated SVG.
+
+        Returns number of written strokes.
+    """
+
+    width, height = projection.width, projection.height
+    count = 0
+
+    with open(output, 'w', encoding='utf-8') as svg_file:
+        svg_file.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{ width }" height="{ height }" '
+            f'viewBox="0 0 { width * UNITS } { height * UNITS }">\n'
+            '<style>\n'
+            'path{fill:none;stroke-linecap:round;stroke-linejoin:round}\n'
+        )
+        for index, svg_object in enumerate(svg_objects):
+            for material, color in enumerate(svg_object.colors):
+                if color is not None:
+                    svg_file.write(
+                        f'.o{ index }m{ material }{{'
+                        f'stroke:{ color_hex(color) };'
+                        f'stroke-opacity:{ float(color[3]):.3f}}}\n'
+                    )
+        svg_file.write('</style>\n')
+
+        if background:
+            svg_file.write('<rect width="100%" height="100%" fill="#fff"/>\n')
+
+        for index, svg_object in enumerate(svg_objects):
+            for layer in svg_object.layers:
+                count += write_layer(
+                    svg_file,
+                    svg_object,
+                    index,
+                    layer,
+                    projection,
+                    times
+                )
+
+        svg_file.write('</svg>\n')
+
+    return count
@@ -0,0 +1,174 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Structured trace of events kept in an in-memory ring buffer.
+
+    Events store their message template and arguments without formatting
+    them, messages are formatted only when the trace is exported. When
+    tracing is disabled, recording an event returns right away.
+
+    The trace is exported in the Chrome trace event format, which can be
+    opened in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+
+from array import array
+from typing import Iterator
+import json
+import os
+import time
+
+
+INSTANT = 'i'
+COMPLETE = 'X'
+
+
+class Tracer():
+    """Ring buffer of the latest trace events.
+
+        Every event is a fixed-size record of its start time, duration,
+        phase, category, message template and arguments. Older events are
+        overwritten when the buffer is full.
+    """
+
+    def __init__(self, capacity: int = 65536) -> None:
+        self.enabled = False
+        self.capacity = capacity
+        self.start_ns = time.perf_counter_ns()
+        self.count = 0              # number of recorded events
+        self.times = array('q', bytes(8 * capacity))       # ns since start
+        self.durations = array('q', bytes(8 * capacity))   # ns
+        self.phases = [INSTANT] * capacity
+        self.categories = [''] * capacity
+        self.messages = [''] * capacity
+        self.args: list[tuple] = [()] * capacity
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def set_enabled(self, status: bool) -> None:
+        self.enabled = status
+
+    def clear(self) -> None:
+        self.count = 0
+        self.args = [()] * self.capacity
+
+    def __record__(self, phase: str, category: str, start_ns: int,
+                   duration_ns: int, message: str, args: tuple) -> None:
+        index = self.count % self.capacity
+        self.times[index] = start_ns - self.start_ns
+        self.durations[index] = duration_ns
+        self.phases[index] = phase
+        self.categories[index] = category
+        self.messages[index] = message
+        self.args[index] = args
+        self.count += 1
+
+    def instant(self, category: str, message: str, *args) -> None:
+        """Record an event happening now.
+
+            Message is a str.format template of args, it is formatted
+            only on export.
+        """
+
+        if not self.enabled:
+            return
+
+        self.__record__(
+            INSTANT,
+            category,
+            time.perf_counter_ns(),
+            0,
+            message,
+            args
+        )
+
+    def complete(self, category: str, start_ns: int, message: str,
+                 *args) -> None:
+        """Record an event lasting from start_ns until now.
+
+            Start is a value of time.perf_counter_ns taken by the caller.
+        """
+
+        if not self.enabled:
+            return
+
+        self.__record__(
+            COMPLETE,
+            category,
+            start_ns,
+            time.perf_counter_ns() - start_ns,
+            message,
+            args
+        )
+
+    def events(self) -> Iterator[tuple]:
+        """Get recorded events from the oldest as tuples of time and
+            duration in nanoseconds, phase, category and message."""
+
+        first = max(0, self.count - self.capacity)
+        for position in range(first, self.count):
+            index = position % self.capacity
+            message = self.messages[index]
+            args = self.args[index]
+            try:
+                text = message.format(*args) if args else message
+            except (IndexError, KeyError, ValueError):
+                text = f'{ message } { args }'
+
+            yield (
+                self.times[index],
+                self.durations[index],
+                self.phases[index],
+                self.categories[index],
+                text
+            )
+
+    def chrome_trace(self) -> dict:
+        """Get recorded events in the Chrome trace event format."""
+
+        pid = os.getpid()
+        trace_events = list()
+        for start, duration, phase, category, text in self.events():
+            event = {
+                'name': text,
+                'cat': category,
+                'ph': phase,
+                'ts': start / 1000,
+                'pid': pid,
+                'tid': 0
+            }
+            if phase == COMPLETE:
+                event['dur'] = duration / 1000
+            else:
+                event['s'] = 'p'
+            trace_events.append(event)
+
+        return {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'dropped': max(0, self.count - self.capacity)
+            }
+        }
+
+    def export(self, file_path: str) -> None:
+        """Write recorded events into a Chrome trace JSON file."""
+
+        with open(file_path, 'w') as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+
+# shared tracer instance
+tracer = Tracer()
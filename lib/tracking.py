@@ -11,14 +11,18 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import bpy                  # type: ignore
+from bpy.app.handlers import persistent    # type: ignore
 from bpy.types import (     # type: ignore
     PropertyGroup,
+    GreasePencil,
     Object
 )
 from bpy.props import (     # type: ignore
     PointerProperty,
     StringProperty,
     IntProperty,
+    FloatProperty,
     CollectionProperty
 )
 
@@ -32,10 +36,16 @@ class ChangeGroup(PropertyGroup):
     obj: PointerProperty(type=Object)
     text: StringProperty()
     icon: StringProperty(default='')
+    journal_index: IntProperty(default=-1)
+    timestamp: FloatProperty(default=0.0)   # seconds since tracking start
 
 
 class LayerChangesGroup(PropertyGroup):
-    """Property group for storing changes to a layer."""
+    """Property group for storing changes to a layer.
+
+        Only a window of the latest changes is kept in changes, the full
+        history is stored in the ChangeJournal of the observer.
+    """
 
     layer_name: StringProperty()
     change_index: IntProperty(default=0)
@@ -51,14 +61,17 @@ def observe_layers(observer) -> float:
     """
 
     new_count = observer.get_layer_count()
+    changed = observer.last_count != new_count
 
     if(observer.last_count < new_count):
         observer.on_add()
     elif(observer.last_count > new_count):
         observer.on_remove()
     observer.last_count = new_count
+    # renames by scripts are not reported by the message bus
+    observer.sync_layer_names()
 
-    return observer.interval
+    return observer.adapt_interval(changed)
 
 
 def observe_strokes(observer) -> float:
@@ -68,15 +81,16 @@ def observe_strokes(observer) -> float:
         changes to the active observer.
     """
 
-    new_count = observer.get_stroke_count()
+    diff = observer.diff_strokes()
 
-    if(observer.last_count < new_count):
-        observer.on_add()
-    elif(observer.last_count > new_count):
-        observer.on_remove()
-    observer.last_count = new_count
+    if diff:
+        observer.on_change(diff)
+
+    interval = observer.adapt_interval(bool(diff))
+    if observer.is_pending():
+        interval = observer.settle(interval)
 
-    return observer.interval
+    return interval
 
 
 # passive observation functions
@@ -101,3 +115,99 @@ def notify_layer_change(self, context):
 
     if database.data.is_observed(self):
         database.data.get_observer(self).notify()
+
+
+# event driven observation
+@persistent
+def depsgraph_update(scene, depsgraph) -> None:
+    """Wake observers of Grease Pencils updated in depsgraph.
+
+        This function is appended to depsgraph_update_post handlers.
+    """
+
+    if not database.data.is_active():
+        return
+
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if not isinstance(id_data, GreasePencil):
+            continue
+
+        observer = database.data.find_observer(id_data)
+        if observer is not None and observer.event_driven:
+            observer.wake()
+
+
+@persistent
+def load_pre(*args) -> None:
+    """Stop all observers before a file is loaded.
+
+        This function is appended to load_pre handlers, observers of the
+        previous file would keep structs which are freed by the load.
+    """
+
+    database.data.clear_observers()
+
+
+def notify_layers(observer) -> None:
+    """Function handling message bus notifications of layer changes."""
+
+    notify_layer_change(observer.get_gpen(), bpy.context)
+    observer.sync_layer_names()
+    observer.wake()
+
+
+def subscribe(observer) -> None:
+    """Subscribe observer to message bus notifications of its Grease Pencil.
+
+        Only layers of the observed Grease Pencil are subscribed, one by
+        one, so the observer is subscribed again when its layers change.
+    """
+
+    gpen = observer.get_gpen()
+    keys = [gpen.path_resolve('layers', False)]
+    keys.extend(layer.path_resolve('info', False) for layer in gpen.layers)
+
+    for key in keys:
+        bpy.msgbus.subscribe_rna(
+            key=key,
+            owner=observer.msgbus_owner,
+            args=(observer,),
+            notify=notify_layers
+        )
+
+
+def unsubscribe(observer) -> None:
+    """Remove message bus subscriptions of observer."""
+
+    bpy.msgbus.clear_by_owner(observer.msgbus_owner)
+
+
+def resubscribe(observer) -> None:
+    """Renew message bus subscriptions of observer after its layers changed.
+
+        Called from a timer, so subscriptions are not changed while the
+        message bus notifies them.
+    """
+
+    unsubscribe(observer)
+    if observer.is_active() and observer.event_driven:
+        subscribe(observer)
+
+
+def register_handlers() -> None:
+    """Append event handlers to blender."""
+
+    if depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(depsgraph_update)
+    if load_pre not in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.append(load_pre)
+
+
+def unregister_handlers() -> None:
+    """Remove event handlers from blender."""
+
+    if depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update)
+    if load_pre in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(load_pre)
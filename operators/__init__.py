@@ -19,24 +19,45 @@ from ..lib import (
 
 from .io import (
     RECORDER_OT_render,
+    RECORDER_OT_preview,
+    RECORDER_OT_export_svg,
+    RECORDER_OT_cancel_render,
     RECORDER_OT_render_settings
 )
 
+from .stats import (
+    RECORDER_OT_toggle_stats,
+    RECORDER_OT_reset_stats,
+    RECORDER_OT_dump_stats,
+    RECORDER_OT_toggle_trace,
+    RECORDER_OT_export_trace
+)
+
 from .tracking import (
     RECORDER_OT_start_track_active,
     RECORDER_OT_stop_track_active,
     RECORDER_OT_pause_tracking,
-    RECORDER_OT_resume_tracking
+    RECORDER_OT_resume_tracking,
+    RECORDER_OT_record_settings
 )
 
 
 classes = [
     RECORDER_OT_render,
+    RECORDER_OT_preview,
+    RECORDER_OT_export_svg,
+    RECORDER_OT_cancel_render,
     RECORDER_OT_render_settings,
     RECORDER_OT_start_track_active,
     RECORDER_OT_stop_track_active,
     RECORDER_OT_pause_tracking,
     RECORDER_OT_resume_tracking,
+    RECORDER_OT_record_settings,
+    RECORDER_OT_toggle_stats,
+    RECORDER_OT_reset_stats,
+    RECORDER_OT_dump_stats,
+    RECORDER_OT_toggle_trace,
+    RECORDER_OT_export_trace,
 ]
 
 
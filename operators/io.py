@@ -11,9 +11,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import bpy                                      # type: ignore
 from bpy.ops import render as render_call       # type: ignore
+from bpy.ops import wm as wm_call               # type: ignore
 from bpy.props import (                         # type: ignore
     BoolProperty,
+    EnumProperty,
+    FloatProperty,
     IntProperty,
     StringProperty
 )
@@ -22,27 +26,91 @@ from bpy.types import (                         # type: ignore
 )
 
 from ..lib import data
+from ..lib.encoder import (
+    CODECS,
+    encode_sequence,
+    find_ffmpeg,
+    video_path,
+    FrameEncoder
+)
+from ..lib.frame_render import (
+    FrameRender,
+    RenderProgress
+)
+from ..lib.rasterizer import (
+    write_png,
+    PreviewRenderer
+)
+from ..lib.render_cache import (
+    frame_keys,
+    frame_runs,
+    missing_frames,
+    RenderCache
+)
+from ..lib.render_job import (
+    redraw_panels,
+    RenderJob
+)
+from ..lib.sequence_worker import compile_video
+from ..lib.svg import (
+    export_svg,
+    scene_projection,
+    SvgObject,
+    StepTimes
+)
+from ..lib.utils import log
 
 from os import (
+    cpu_count,
     environ,
     path
 )
-from pathlib import Path
+from copy import copy
+from shutil import rmtree
+from sys import maxsize
+from tempfile import mkdtemp
+
+
+class RecordingFrames():
+    """Base class for operators drawing frames of the recording."""
 
+    def __build_frames__(self) -> None:
+        for observer in data.get_active_observers():
+            observer.build_frames()
 
-class RECORDER_OT_render(Operator):
+    def __release_frames__(self) -> None:
+        for observer in data.get_active_observers():
+            observer.release_frames()
+
+    def __tracked_objects__(self, context) -> list:
+        """Get objects of all tracked Grease Pencils in the scene."""
+
+        tracked = {observer.id for observer in data.get_active_observers()}
+        return [
+            obj for obj in context.scene.objects
+            if obj.type == 'GPENCIL' and obj.data.as_pointer() in tracked
+        ]
+
+
+class RECORDER_OT_render(RecordingFrames, Operator):
     """Start rendering captured sequence."""
 
     bl_idname = "action_recorder.render"
     bl_label = "Render"
     bl_description = "Render the captured sequence"
-    bl_options = {'BLOCKING'}
+
+    resume: BoolProperty(
+        name='Resume',
+        description='Resume cancelled render from the last finished frame.',
+        default=False,
+        options={'HIDDEN', 'SKIP_SAVE'}
+    )
 
     @classmethod
     def poll(cls, context) -> bool:
         """Check if operator can be executed."""
 
-        return data.is_active()
+        return data.is_active() and not data.is_rendering()
 
     def invoke(self, context, event):
         """Invoke the dialog window."""
@@ -52,21 +120,198 @@ class RECORDER_OT_render(Operator):
     def draw(self, context) -> set:
         """Draw operator dialog."""
 
-        self.layout.label(
-            text='Please do not modify the scene until rendering is finished.'
+        if data.render_settings.background:
+            self.layout.label(
+                text='Rendering will continue in background.'
+            )
+        else:
+            self.layout.label(
+                text=('Please do not modify the scene until rendering '
+                      'is finished.')
+            )
+
+    def __plan_frames__(self, context, cache: RenderCache) -> tuple:
+        """Get keys of all frames and first frames of keys missing
+            in the cache. Keyframes have to be built."""
+
+        scene = context.scene
+        frames = data.get_render_frames()
+        digests = dict()
+        for observer in data.get_active_observers():
+            digests.update(observer.keyframe_digests())
+        keys = frame_keys(
+            scene,
+            self.__tracked_objects__(context),
+            frames,
+            data.render_settings.use_viewport,
+            digests
+        )
+        missing = missing_frames(cache, frames, keys)
+        log(f'Render cache: { len(missing) } of { len(frames) } '
+            f'frames missing')
+
+        return keys, missing
+
+    def __render_background__(self, context, video_base_path: str) -> None:
+        """Start background render job on a snapshot of the recording.
+
+            Keyframes are built only to compute frame keys and save a copy
+            of the file, the job itself runs in other processes.
+        """
+
+        settings = data.render_settings
+        scene = context.scene
+        work_dir = mkdtemp(prefix='action_recorder_')
+
+        if settings.use_cache:
+            cache = data.get_render_cache()
+        else:
+            # frames are still rendered once, but only for this job
+            cache = RenderCache(path.join(work_dir, 'frames'), maxsize)
+
+        self.__build_frames__()
+        keys, missing = self.__plan_frames__(context, cache)
+
+        # workers are given the image format on their command line
+        blend_path = path.join(work_dir, 'capture.blend')
+        wm_call.save_as_mainfile(filepath=blend_path, copy=True)
+        self.__release_frames__()
+
+        render = scene.render
+        scale = render.resolution_percentage / 100
+        data.render_job = RenderJob(
+            work_dir,
+            blend_path,
+            missing,
+            keys,
+            cache,
+            video_base_path,
+            copy(settings),
+            (int(render.resolution_x * scale),
+             int(render.resolution_y * scale))
+        )
+        data.render_job.start()
+
+    def __start_frame_render__(self, context, video_base_path: str) -> None:
+        """Start rendering missing frames one by one from a timer.
+
+            Resumed render keeps its cache and progress, frames finished
+            before cancelling are found in the cache.
+        """
+
+        settings = data.render_settings
+        previous = data.frame_render
+        if self.resume and previous is not None and previous.can_resume():
+            cache = previous.cache
+            done = previous.progress.done
+        elif settings.use_cache:
+            cache = data.get_render_cache()
+            done = 0
+        else:
+            cache = RenderCache(mkdtemp(prefix='action_recorder_'), maxsize)
+            done = 0
+
+        self.__build_frames__()
+        keys, missing = self.__plan_frames__(context, cache)
+
+        job = FrameRender(
+            cache,
+            keys,
+            missing,
+            video_path(video_base_path, settings.codec)
         )
+        job.progress = RenderProgress(done + len(job.queue), done)
+        data.frame_render = job
+
+        scene = context.scene
+        render = scene.render
+        self._frame_current = scene.frame_current
+        self._output = (render.filepath, render.image_settings.file_format)
+        self._image_base = path.join(mkdtemp(prefix='action_recorder_'),
+                                     'frame')
+        render.image_settings.file_format = 'PNG'
+        render.filepath = self._image_base
+
+        window_manager = context.window_manager
+        self._timer = window_manager.event_timer_add(
+            0.01,
+            window=context.window
+        )
+        window_manager.modal_handler_add(self)
+
+    def __end_frame_render__(self, context) -> None:
+        """Remove the timer and built frames after the render and restore
+            the output of the scene."""
+
+        context.window_manager.event_timer_remove(self._timer)
+        self.__release_frames__()
+        scene = context.scene
+        scene.frame_set(self._frame_current)
+        scene.render.filepath, scene.render.image_settings.file_format = \
+            self._output
+        rmtree(path.dirname(self._image_base), ignore_errors=True)
+
+    def __encode__(self, context, job: FrameRender,
+                   video_base_path: str) -> None:
+        """Encode cached frames of finished render into the video."""
+
+        settings = data.render_settings
+        job.cache.evict(keep=set(job.keys))
+        images = frame_runs(job.cache, job.keys)
+
+        encoded = encode_sequence(
+            images,
+            job.output,
+            settings.framerate,
+            settings.codec,
+            settings.quality
+        )
+        if not encoded:
+            self.__compile_images__(context, images, video_base_path)
+
+        if job.cache is not data.render_cache:
+            rmtree(job.cache.directory, ignore_errors=True)
+
+    def __compile_images__(self, context, images: list,
+                           video_base_path: str) -> None:
+        """Compile rendered images into video using the sequencer.
+
+            Used when ffmpeg is not available to encode the images, only
+            images are re-encoded. Images are compiled in a temporary
+            scene, so output settings and sequencer of the scene are kept.
+        """
+
+        render = context.scene.render
+        scale = render.resolution_percentage / 100
+        settings = data.render_settings
+        codec = CODECS[settings.codec]
+        scene = bpy.data.scenes.new('Action Recorder Video')
+        try:
+            compile_video(scene, {
+                'images': images,
+                'output': video_base_path,
+                'resolution': (int(render.resolution_x * scale),
+                               int(render.resolution_y * scale)),
+                'fps': settings.framerate,
+                'container': codec.container,
+                'codec': codec.blender_codec,
+                'quality': settings.quality
+            })
+        finally:
+            bpy.data.scenes.remove(scene)
 
     def execute(self, context) -> set:
         """Execute the operator."""
 
-        if not data.render_settings.valid():
+        settings = data.render_settings
+        if not settings.valid():
             self.report(
                 {'ERROR_INVALID_INPUT'},
                 'Invalid render settings.'
             )
             return {'CANCELLED'}
 
-        frame_count = data.get_active_observer().frame_count
+        frame_count = data.get_step_count()
 
         if frame_count == 0:
             self.report(
@@ -75,45 +320,244 @@ class RECORDER_OT_render(Operator):
             )
             return {'CANCELLED'}
 
-        context.scene.frame_end = frame_count
-        base_dir_path = data.render_settings.render_path
-        render_dir_path = f'{base_dir_path}{path.sep}render'
+        video_base_path = settings.render_path + path.sep + 'animation'
+        self._video_base_path = video_base_path
+
+        if settings.background:
+            self.__render_background__(context, video_base_path)
+            self.report(
+                {'INFO'},
+                'Render has started in background.'
+            )
+            return {'FINISHED'}
+
+        self.__start_frame_render__(context, video_base_path)
+
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event) -> set:
+        """Render one frame on every timer event."""
+
+        job = data.frame_render
+        if event.type == 'ESC':
+            job.cancel()
+
+        if job.state == 'CANCELLED':
+            self.__end_frame_render__(context)
+            self.report({'INFO'}, job.status())
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER' or event.timer is not self._timer:
+            return {'PASS_THROUGH'}
 
-        # render animation images
-        context.scene.render.filepath = render_dir_path + path.sep + 'capture'
+        if job.is_finished():
+            self.__end_frame_render__(context)
+            self.__encode__(context, job, self._video_base_path)
+            job.state = 'FINISHED'
+            self.report({'INFO'}, 'Render has finished.')
+            return {'FINISHED'}
+
+        frame, _ = job.pending()
+        context.scene.frame_set(frame)
         render_call.render(
-            animation=True,
+            write_still=True,
             use_viewport=data.render_settings.use_viewport
         )
+        job.finish_frame(self._image_base + '.png')
+        redraw_panels()
 
-        # compile images into animation
-        render_dir = Path(render_dir_path)
-        images = sorted(list(render_dir.glob('*.png')))
-        context.scene.sequence_editor_clear()
-        editor = context.scene.sequence_editor_create()
-        sequence = editor.sequences
-
-        first = images.pop(0)
-        image_strip = sequence.new_image(
-            name=first.name,
-            filepath=str(first),
-            frame_start=1,
-            channel=1
-        )
+        return {'PASS_THROUGH'}
 
-        while images:
-            image_strip.elements.append(images.pop(0).name)
 
-        image_strip.frame_final_duration = frame_count
-        image_strip.update()
-        context.scene.render.filepath = base_dir_path + path.sep + 'animation'
-        context.scene.render.image_settings.file_format = 'AVI_JPEG'
-        context.scene.render.fps = data.render_settings.framerate
-        render_call.render(animation=True)
+class RECORDER_OT_preview(RecordingFrames, Operator):
+    """Draw draft preview of the recording without rendering."""
+
+    bl_idname = "action_recorder.preview"
+    bl_label = "Preview"
+    bl_description = ("Draw a draft of the recording without the render "
+                      "pipeline, only strokes are drawn")
+
+    output: EnumProperty(
+        name='Output',
+        description='Kind of the preview.',
+        items=[
+            ('VIDEO', 'Video', 'Draft video with the render codec'),
+            ('GIF', 'GIF', 'Animated GIF'),
+            ('FRAME', 'Frame', 'PNG image of the current frame'),
+        ],
+        default='VIDEO'
+    )
+    scale: FloatProperty(
+        name='Scale',
+        description='Size of the preview relative to render resolution.',
+        default=0.5,
+        min=0.05,
+        max=1.0,
+        subtype='FACTOR'
+    )
 
+    @classmethod
+    def poll(cls, context) -> bool:
+        """Check if operator can be executed."""
+
+        return data.is_active() and not data.is_rendering()
+
+    def invoke(self, context, event):
+        """Invoke the dialog window."""
+
+        return context.window_manager.invoke_props_dialog(self)
+
+    def __write_video__(self, renderer: PreviewRenderer, frames: list,
+                        output: str) -> bool:
+        settings = data.render_settings
+        codec = 'GIF' if self.output == 'GIF' else settings.codec
+        with FrameEncoder(
+            output,
+            renderer.width,
+            renderer.height,
+            settings.framerate,
+            codec,
+            settings.quality
+        ) as encoder:
+            for frame in frames:
+                encoder.write(renderer.render(frame))
+
+        return encoder.close()
+
+    def execute(self, context) -> set:
+        """Execute the operator."""
+
+        settings = data.render_settings
+        if not settings.valid():
+            self.report(
+                {'ERROR_INVALID_INPUT'},
+                'Invalid render settings.'
+            )
+            return {'CANCELLED'}
+
+        scene = context.scene
+        if self.output == 'FRAME':
+            frames = [scene.frame_current]
+            output = path.join(settings.render_path, 'preview.png')
+        else:
+            frames = data.get_render_frames()
+            if self.output == 'GIF':
+                extension = '.gif'
+            else:
+                extension = CODECS[settings.codec].extension
+            output = path.join(settings.render_path, 'preview' + extension)
+
+            if not frames:
+                self.report({'ERROR'}, 'There are no frames to preview.')
+                return {'CANCELLED'}
+            if find_ffmpeg() is None:
+                self.report(
+                    {'ERROR'},
+                    'Preview videos need ffmpeg, only frames can be drawn.'
+                )
+                return {'CANCELLED'}
+
+        self.__build_frames__()
+        try:
+            renderer = PreviewRenderer(
+                scene,
+                self.__tracked_objects__(context),
+                self.scale
+            )
+            if self.output == 'FRAME':
+                write_png(output, renderer.render(frames[0]))
+                written = True
+            else:
+                written = self.__write_video__(renderer, frames, output)
+        finally:
+            self.__release_frames__()
+
+        if not written:
+            self.report({'ERROR'}, 'Preview encoding has failed.')
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f'Preview saved to { output }.')
+
+        return {'FINISHED'}
+
+
+class RECORDER_OT_export_svg(RecordingFrames, Operator):
+    """Export recorded strokes into an animated SVG."""
+
+    bl_idname = "action_recorder.export_svg"
+    bl_label = "SVG"
+    bl_description = ("Export strokes from recording logs into an animated "
+                      "SVG, nothing is rendered")
+
+    @classmethod
+    def poll(cls, context) -> bool:
+        """Check if operator can be executed."""
+
+        return data.is_active() and data.record_settings.use_storage
+
+    def execute(self, context) -> set:
+        """Execute the operator."""
+
+        settings = data.render_settings
+        if not settings.valid():
+            self.report(
+                {'ERROR_INVALID_INPUT'},
+                'Invalid render settings.'
+            )
+            return {'CANCELLED'}
+
+        svg_objects = list()
+        for obj in self.__tracked_objects__(context):
+            recording = data.get_columnar(obj.data.name)
+            if recording is not None:
+                svg_objects.append(SvgObject(obj, recording))
+
+        if not svg_objects:
+            self.report({'ERROR'}, 'There are no recording logs to export.')
+            return {'CANCELLED'}
+
+        times = dict()
+        for svg_object in svg_objects:
+            times.update(svg_object.session.times)
+
+        output = path.join(settings.render_path, 'animation.svg')
+        try:
+            count = export_svg(
+                output,
+                svg_objects,
+                scene_projection(context.scene, svg_objects),
+                StepTimes(settings, times),
+                not context.scene.render.film_transparent
+            )
+        except OSError as e:
+            self.report({'ERROR'}, f'Cannot write SVG: { e }')
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f'Exported { count } strokes to { output }.')
+
+        return {'FINISHED'}
+
+
+class RECORDER_OT_cancel_render(Operator):
+    """Cancel background render."""
+
+    bl_idname = "action_recorder.cancel_render"
+    bl_label = "Cancel"
+    bl_description = "Cancel the background render"
+
+    @classmethod
+    def poll(cls, context) -> bool:
+        """Check if operator can be executed."""
+
+        return data.is_rendering()
+
+    def execute(self, context) -> set:
+        """Execute the operator."""
+
+        data.cancel_render()
         self.report(
             {'INFO'},
-            'Render has finished.'
+            'Render has been cancelled.'
         )
 
         return {'FINISHED'}
@@ -142,10 +586,119 @@ class RECORDER_OT_render_settings(Operator):
                      'rendered using a viewport.'),
         default=True
     )
+    background: BoolProperty(
+        name='Render in background',
+        description=('Render in background processes, so the scene '
+                     'can be edited during the render. Viewport is not '
+                     'used by background processes.'),
+        default=False
+    )
+    parallel: BoolProperty(
+        name='Parallel render',
+        description=('Split frames of background render among several '
+                     'blender processes.'),
+        default=False
+    )
+    workers: IntProperty(
+        name='Workers',
+        description='Number of background blender processes.',
+        default=max(1, (cpu_count() or 2) // 2),
+        min=1
+    )
+    retries: IntProperty(
+        name='Retries',
+        description='Number of attempts to render frames of failed worker.',
+        default=1,
+        min=0
+    )
+    timing: EnumProperty(
+        name='Timing',
+        description='Timing of recorded changes in the video.',
+        items=[
+            ('STEPS', 'Every change', 'Show every change for one frame'),
+            ('TIMELAPSE', 'Time-lapse',
+             'Fit the recording into the target length, small changes '
+             'are merged'),
+            ('REALTIME', 'Real time',
+             'Show changes at the time they were made'),
+        ],
+        default='STEPS'
+    )
+    target_length: FloatProperty(
+        name='Target length (s)',
+        description='Length of the time-lapse video in seconds.',
+        default=60.0,
+        min=0.1
+    )
+    change_weight: FloatProperty(
+        name='Follow changes',
+        description=('Share of the video spread by amount of change '
+                     'instead of evenly over recorded steps.'),
+        default=0.5,
+        min=0.0,
+        max=1.0
+    )
+    speed: FloatProperty(
+        name='Speed-up',
+        description='Speed of real-time video compared to the recording.',
+        default=10.0,
+        min=0.01
+    )
+    max_gap: FloatProperty(
+        name='Maximal pause (s)',
+        description='Longest pause between changes in real-time video.',
+        default=1.0,
+        min=0.01
+    )
+    codec: EnumProperty(
+        name='Codec',
+        description='Codec of the exported video.',
+        items=[
+            ('H264', 'H.264', 'MP4 video playable everywhere'),
+            ('VP9', 'VP9', 'WebM video for web pages'),
+        ],
+        default='H264'
+    )
+    quality: EnumProperty(
+        name='Quality',
+        description='Quality of the exported video.',
+        items=[
+            ('HIGH', 'High', 'Large file with barely visible losses'),
+            ('MEDIUM', 'Medium', 'Balanced quality and file size'),
+            ('LOW', 'Low', 'Small file for previews'),
+        ],
+        default='MEDIUM'
+    )
+    use_cache: BoolProperty(
+        name='Use render cache',
+        description='Render only frames which have not been rendered yet.',
+        default=True
+    )
+    cache_size: IntProperty(
+        name='Cache size (MB)',
+        description='Maximal size of the render cache.',
+        default=2048,
+        min=1
+    )
 
     def invoke(self, context, event):
         """Invoke the dialog window."""
 
+        settings = data.render_settings
+        self.background = settings.background
+        self.parallel = settings.parallel
+        self.workers = settings.workers
+        self.retries = settings.retries
+        self.timing = settings.timing
+        self.target_length = settings.target_length
+        self.change_weight = settings.change_weight
+        self.speed = settings.speed
+        self.max_gap = settings.max_gap
+        self.codec = settings.codec
+        self.quality = settings.quality
+        self.use_cache = settings.use_cache
+        self.cache_size = settings.cache_size
+
         return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
@@ -154,5 +707,18 @@ class RECORDER_OT_render_settings(Operator):
         data.render_settings.render_path = self.path
         data.render_settings.framerate = self.fps
         data.render_settings.use_viewport = self.viewport
+        data.render_settings.background = self.background
+        data.render_settings.parallel = self.parallel
+        data.render_settings.workers = self.workers
+        data.render_settings.retries = self.retries
+        data.render_settings.timing = self.timing
+        data.render_settings.target_length = self.target_length
+        data.render_settings.change_weight = self.change_weight
+        data.render_settings.speed = self.speed
+        data.render_settings.max_gap = self.max_gap
+        data.render_settings.codec = self.codec
+        data.render_settings.quality = self.quality
+        data.render_settings.use_cache = self.use_cache
+        data.render_settings.cache_size = self.cache_size
 
         return {'INTERFACE'}
@@ -0,0 +1,159 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from bpy.props import (      # type: ignore
+    StringProperty
+)
+from bpy.types import (      # type: ignore
+    Operator
+)
+
+from ..lib.scheduler import scheduler
+from ..lib.stats import stats
+from ..lib.trace import tracer
+
+from os import path
+from tempfile import gettempdir
+
+
+class RECORDER_OT_toggle_stats(Operator):
+    """Enable or disable collection of statistics."""
+
+    bl_idname = "action_recorder.toggle_stats"
+    bl_label = "Collect statistics"
+    bl_description = "Measure time spent by observers and recording"
+
+    def execute(self, context) -> set:
+        """Execute the operator."""
+
+        stats.set_enabled(not stats.enabled)
+
+        return {'FINISHED'}
+
+
+class RECORDER_OT_reset_stats(Operator):
+    """Clear collected statistics."""
+
+    bl_idname = "action_recorder.reset_stats"
+    bl_label = "Reset"
+    bl_description = "Clear collected statistics"
+
+    def execute(self, context) -> set:
+        """Execute the operator."""
+
+        stats.clear()
+
+        return {'FINISHED'}
+
+
+class RECORDER_OT_dump_stats(Operator):
+    """Write collected statistics into a JSON file."""
+
+    bl_idname = "action_recorder.dump_stats"
+    bl_label = "Save"
+    bl_description = "Save collected statistics into a JSON file"
+
+    filepath: StringProperty(
+        name='File path',
+        subtype='FILE_PATH',
+        default=path.join(gettempdir(), 'action_recorder_stats.json')
+    )
+    filter_glob: StringProperty(
+        default='*.json',
+        options={'HIDDEN'}
+    )
+
+    def invoke(self, context, event) -> set:
+        """Select the file before execution."""
+
+        context.window_manager.fileselect_add(self)
+
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context) -> set:
+        """Execute the operator."""
+
+        try:
+            stats.dump(self.filepath, {'scheduler': scheduler.report()})
+        except OSError as e:
+            self.report({'ERROR'}, f'Cannot save statistics: { e }')
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f'Statistics saved to { self.filepath }.')
+
+        return {'FINISHED'}
+
+
+class RECORDER_OT_toggle_trace(Operator):
+    """Enable or disable tracing of events."""
+
+    bl_idname = "action_recorder.toggle_trace"
+    bl_label = "Trace events"
+    bl_description = "Keep a trace of the latest events of observers"
+
+    def execute(self, context) -> set:
+        """Execute the operator."""
+
+        tracer.set_enabled(not tracer.enabled)
+
+        return {'FINISHED'}
+
+
+class RECORDER_OT_export_trace(Operator):
+    """Write traced events into a Chrome trace JSON file."""
+
+    bl_idname = "action_recorder.export_trace"
+    bl_label = "Export trace"
+    bl_description = (
+        "Save traced events into a JSON file for chrome://tracing"
+    )
+
+    filepath: StringProperty(
+        name='File path',
+        subtype='FILE_PATH',
+        default=path.join(gettempdir(), 'action_recorder_trace.json')
+    )
+    filter_glob: StringProperty(
+        default='*.json',
+        options={'HIDDEN'}
+    )
+
+    @classmethod
+    def poll(cls, context) -> bool:
+        """Check if operator can be executed."""
+
+        return len(tracer) > 0
+
+    def invoke(self, context, event) -> set:
+        """Select the file before execution."""
+
+        context.window_manager.fileselect_add(self)
+
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context) -> set:
+        """Execute the operator."""
+
+        try:
+            tracer.export(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f'Cannot save trace: { e }')
+            return {'CANCELLED'}
+
+        self.report(
+            {'INFO'},
+            f'{ len(tracer) } events saved to { self.filepath }.'
+        )
+
+        return {'FINISHED'}
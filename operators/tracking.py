@@ -13,12 +13,21 @@
 
 
 import bpy                  # type: ignore
+from bpy.props import (     # type: ignore
+    BoolProperty,
+    EnumProperty,
+    FloatProperty,
+    IntProperty,
+    StringProperty
+)
 from bpy.types import (     # type: ignore
     Operator
 )
 
 from ..lib import data
 
+from copy import copy
+
 
 class Track():
     """Base class for tracking operators."""
@@ -28,10 +37,10 @@ class Track():
 
         data.start_tracking(gpen)
 
-    def remove_tracker(self, context):
-        """Remove gpen from tracking list"""
+    def remove_tracker(self, context, gpen=None):
+        """Remove gpen from tracking list, all gpens if it is not given."""
 
-        data.stop_tracking()
+        data.stop_tracking(gpen)
 
 
 class TrackActiveABC(Track):
@@ -98,9 +107,22 @@ class RECORDER_OT_stop_track_active(Track, Operator):
     bl_description = "Stop tracking selected Grease Pencil"
 
     def execute(self, context) -> set:
-        """Execute the operator."""
+        """Execute the operator.
+
+            Stops tracking of selected Grease Pencils, or of all of them
+            if none of the selected ones is tracked.
+        """
+
+        selected = [
+            obj.data for obj in context.selected_objects
+            if obj.type == 'GPENCIL' and data.is_observed(obj.data)
+        ]
 
-        self.remove_tracker(context)
+        if selected:
+            for gpen in selected:
+                self.remove_tracker(context, gpen)
+        else:
+            self.remove_tracker(context)
 
         return {'FINISHED'}
 
@@ -115,9 +137,7 @@ class RECORDER_OT_pause_tracking(Operator):
     def execute(self, context) -> set:
         """Execute the operator."""
 
-        gpen = data.get_active_observer()
-
-        if gpen:
+        for gpen in data.get_active_observers():
             gpen.set_active(False)
 
         return {'FINISHED'}
@@ -133,9 +153,131 @@ class RECORDER_OT_resume_tracking(Operator):
     def execute(self, context) -> set:
         """Execute the operator."""
 
-        gpen = data.get_active_observer()
-
-        if gpen:
+        for gpen in data.get_active_observers():
             gpen.set_active(True)
 
         return {'FINISHED'}
+
+
+class RECORDER_OT_record_settings(Operator):
+    """Get the settings for recording."""
+
+    bl_idname = "action_recorder.record_settings"
+    bl_label = ""
+    bl_description = "Edit record settings"
+
+    snapshot_mode: EnumProperty(
+        name='Snapshots',
+        description='Method used to store recorded steps.',
+        items=[
+            ('DELTA', 'Delta', 'Store only strokes changed in each step'),
+            ('FULL', 'Full', 'Store a full copy of all layers in each step'),
+        ],
+        default='DELTA'
+    )
+    sparse_keyframes: BoolProperty(
+        name='Sparse keyframes',
+        description=('Create a new keyframe only in the changed layer, '
+                     'other layers hold their previous keyframe.'),
+        default=True
+    )
+    event_driven: BoolProperty(
+        name='Event driven',
+        description=('Check for changes when blender reports an update, '
+                     'use polling only as a fallback.'),
+        default=True
+    )
+    min_interval: FloatProperty(
+        name='Minimal interval',
+        description='Interval between checks right after a change.',
+        default=0.05,
+        min=0.01,
+        unit='TIME_ABSOLUTE'
+    )
+    max_interval: FloatProperty(
+        name='Maximal interval',
+        description='Interval between checks when no change is happening.',
+        default=4.0,
+        min=0.01,
+        unit='TIME_ABSOLUTE'
+    )
+    fallback_interval: FloatProperty(
+        name='Fallback interval',
+        description=('Interval between checks of event driven recording, '
+                     'used only to catch changes missed by events.'),
+        default=10.0,
+        min=0.01,
+        unit='TIME_ABSOLUTE'
+    )
+    coalesce_window: FloatProperty(
+        name='Coalescing window',
+        description=('Record changes following each other within this '
+                     'time as a single change, 0 records every change.'),
+        default=0.0,
+        min=0.0,
+        unit='TIME_ABSOLUTE'
+    )
+    change_window: IntProperty(
+        name='Listed changes',
+        description='Number of latest changes listed for each layer.',
+        default=100,
+        min=1
+    )
+    use_storage: BoolProperty(
+        name='Write recording log',
+        description=('Write recorded changes into a log on disk, which '
+                     'is needed for the SVG export.'),
+        default=True
+    )
+    storage_path: StringProperty(
+        name='Log directory',
+        description='Directory of recording logs.',
+        default='',
+        subtype='DIR_PATH'
+    )
+
+    def invoke(self, context, event):
+        """Invoke the dialog window."""
+
+        settings = data.record_settings
+        self.snapshot_mode = settings.snapshot_mode
+        self.sparse_keyframes = settings.sparse_keyframes
+        self.event_driven = settings.event_driven
+        self.min_interval = settings.min_interval
+        self.max_interval = settings.max_interval
+        self.fallback_interval = settings.fallback_interval
+        self.coalesce_window = settings.coalesce_window
+        self.change_window = settings.change_window
+        self.use_storage = settings.use_storage
+        self.storage_path = settings.storage_path
+
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        """Execute the operator.
+
+            Settings are applied only if all of them are valid.
+        """
+
+        settings = copy(data.record_settings)
+        settings.snapshot_mode = self.snapshot_mode
+        settings.sparse_keyframes = self.sparse_keyframes
+        settings.event_driven = self.event_driven
+        settings.min_interval = self.min_interval
+        settings.max_interval = self.max_interval
+        settings.fallback_interval = self.fallback_interval
+        settings.coalesce_window = self.coalesce_window
+        settings.change_window = self.change_window
+        settings.use_storage = self.use_storage
+        settings.storage_path = bpy.path.abspath(self.storage_path)
+
+        if not settings.valid():
+            self.report(
+                {'ERROR_INVALID_INPUT'},
+                'Invalid record settings.'
+            )
+            return {'CANCELLED'}
+
+        data.record_settings = settings
+
+        return {'INTERFACE'}
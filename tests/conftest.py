@@ -0,0 +1,87 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Fixtures of tests running the add-on on the fake bpy module.
+
+    The add-on is registered once as package recorder, tests import
+    its modules from there:
+
+        python -m pytest -q tests
+"""
+
+from os import path
+import sys
+
+sys.path.insert(0, path.join(path.dirname(path.dirname(
+    path.abspath(__file__))), 'benchmarks'))
+
+import bench_recording      # noqa: E402
+import bpy      # type: ignore  # noqa: E402
+import numpy as np      # type: ignore  # noqa: E402
+import pytest       # noqa: E402
+
+
+addon = bench_recording.load_addon()
+
+
+@pytest.fixture
+def frame():
+    """Get an empty frame of a new Grease Pencil."""
+
+    gpen = bpy.data.grease_pencils.new('test')
+    yield gpen.layers.new('Layer').frames.new(1)
+    bpy.data.grease_pencils.remove(gpen)
+
+
+@pytest.fixture
+def draw():
+    """Get function adding a stroke with given points to a frame.
+
+        Pressure and strength are set per point, other values are set
+        on the stroke.
+    """
+
+    def add_stroke(frame, co, **values):
+        co = np.asarray(co, dtype=np.float32).reshape(-1, 3)
+        stroke = frame.strokes.new()
+        stroke.points.add(len(co))
+        stroke.points.foreach_set('co', co.ravel())
+        for name, value in values.items():
+            if name in ('pressure', 'strength'):
+                stroke.points.foreach_set(name, value)
+            else:
+                setattr(stroke, name, value)
+        return stroke
+
+    return add_stroke
+
+
+@pytest.fixture
+def log_strokes():
+    """Get function appending all strokes of a frame to a log.
+
+        Keys of the strokes are returned.
+    """
+
+    from recorder.lib.fingerprint import points_fingerprints
+    from recorder.lib.points import read_frame_points
+
+    def append_strokes(log, step: int, layer: str, frame) -> list:
+        points = read_frame_points(frame)
+        keys = [key[:3] for key in points_fingerprints(points)]
+        for index, key in enumerate(keys):
+            log.append_stroke(step, layer, key, points, index)
+        return keys
+
+    return append_strokes
@@ -0,0 +1,120 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Tests of columnar files built from recording logs."""
+
+from recorder.lib.columnar import (
+    HEADER,
+    MAGIC,
+    NEVER,
+    VERSION,
+    ColumnarRecording,
+    columnar_version,
+    write_columnar
+)
+from recorder.lib.storage import RecordingLog, RecordingLogReader
+
+import numpy as np      # type: ignore
+import pytest
+
+
+def build(log_path: str) -> ColumnarRecording:
+    """Get columnar recording of a log."""
+
+    path = log_path.replace('.arlog', '.arcol')
+    reader = RecordingLogReader(log_path)
+    write_columnar(reader, path)
+    reader.close()
+
+    return ColumnarRecording(path)
+
+
+@pytest.fixture
+def recording(tmp_path, frame, draw, log_strokes):
+    """Get recording of two strokes, the first one is removed later."""
+
+    path = str(tmp_path / 'test.arlog')
+    draw(frame, [(0, 0, 0), (1, 1, 1)], line_width=4, hardness=0.5)
+    draw(frame, [(2, 2, 2)], use_cyclic=True)
+
+    log = RecordingLog(path)
+    log.append_session(1000.0, 3)
+    log.append_change(1, 1.0, 'Lines', 'Strokes added.', 'PLUS')
+    keys = log_strokes(log, 1, 'Lines', frame)
+    log.append_change(2, 4.0, 'Lines', 'Stroke removed.', 'REMOVE')
+    log.append_remove(2, 'Lines', keys[0])
+    log.close()
+
+    recording = build(path)
+    yield recording
+    recording.close()
+
+
+def test_strokes_at_steps(recording):
+    assert recording.strokes_at(0).tolist() == []
+    assert recording.strokes_at(1).tolist() == [0, 1]
+    assert recording.strokes_at(2).tolist() == [1]
+    assert recording.strokes_at(2, 'Lines').tolist() == [1]
+    assert recording.strokes_at(2, 'Missing').tolist() == []
+    assert recording.step_count() == 2
+
+
+def test_stroke_points_and_style(recording):
+    first, second = recording.stroke(0), recording.stroke(1)
+
+    np.testing.assert_array_equal(first.co, [(0, 0, 0), (1, 1, 1)])
+    assert (first.line_width, first.hardness, first.use_cyclic) \
+        == (4, 0.5, False)
+    assert second.key[0] == 1 and second.use_cyclic
+    assert recording.column('removed').tolist() == [2, NEVER]
+
+
+def test_changes(recording):
+    assert [(change.step, change.time, change.text)
+            for change in recording.changes()] \
+        == [(1, 1.0, 'Strokes added.'), (2, 4.0, 'Stroke removed.')]
+
+
+def test_sessions_continue_steps(tmp_path, frame, draw, log_strokes):
+    path = str(tmp_path / 'test.arlog')
+    draw(frame, [(0, 0, 0)])
+
+    for origin in (1, 5):
+        log = RecordingLog(path)
+        log.append_session(1000.0, origin)
+        log_strokes(log, 0, 'Lines', frame)
+        log.append_change(1, 1.0, 'Lines', 'Stroke added.', 'PLUS')
+        log_strokes(log, 1, 'Lines', frame)
+        log.close()
+
+    recording = build(path)
+    # the second session starts after step 1 of the first one
+    assert recording.session_steps(0) == (0, 1)
+    assert recording.session_steps() == (2, 3)
+    assert recording.column('origins').tolist() == [1, 5]
+    # strokes of the first session are recorded again by the second one
+    assert recording.column('removed').tolist() == [2, 2, NEVER, NEVER]
+    assert recording.strokes_at(3).tolist() == [2, 3]
+    recording.close()
+
+
+def test_older_version_is_rejected(tmp_path):
+    path = str(tmp_path / 'test.arcol')
+    with open(path, 'wb') as columnar_file:
+        columnar_file.write(HEADER.pack(MAGIC, VERSION - 1, 0))
+
+    assert columnar_version(path) == VERSION - 1
+    with pytest.raises(ValueError):
+        ColumnarRecording(path)
+    assert columnar_version(str(tmp_path / 'missing.arcol')) == 0
@@ -0,0 +1,91 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Tests of selecting steps shown on frames of the video."""
+
+from recorder.lib.compaction import (
+    LAYER_WEIGHT,
+    MIN_WEIGHT,
+    MODIFIED_WEIGHT,
+    compact_steps,
+    realtime_steps,
+    step_times,
+    step_weights
+)
+from recorder.lib.journal import ADDED, MODIFIED, ChangeJournal
+
+import numpy as np      # type: ignore
+
+
+def journal(changes: list) -> ChangeJournal:
+    """Get journal of changes given as step, seconds, kind and size."""
+
+    result = ChangeJournal()
+    for step, seconds, kind, size in changes:
+        result.append(step, int(seconds * 1e9), 'Lines', kind, size, '', '')
+    return result
+
+
+def test_step_weights():
+    weights = step_weights([
+        journal([(1, 0, ADDED, 2), (2, 0, MODIFIED, 1)]),
+        journal([(2, 0, ADDED, 0), (5, 0, ADDED, 1)])
+    ], 3)
+
+    np.testing.assert_array_equal(
+        weights,
+        [2, MODIFIED_WEIGHT + LAYER_WEIGHT, 0]
+    )
+
+
+def test_single_modified_stroke_is_not_a_duplicate():
+    assert MODIFIED_WEIGHT >= MIN_WEIGHT
+
+    weights = np.array([0, 0, MODIFIED_WEIGHT, 0, 0])
+    assert 3 in compact_steps(weights, 2)
+
+
+def test_compaction_fills_budget():
+    weights = np.ones(100)
+    selected = compact_steps(weights, 10)
+
+    assert len(selected) == 10
+    assert np.all(np.diff(selected) > 0)
+    assert selected[-1] == 100
+
+
+def test_compaction_skips_duplicate_steps():
+    weights = np.array([1, 0, 0, 0, 1, 0, 0, 0, 1, 1], dtype=np.float64)
+    selected = compact_steps(weights, 5)
+
+    assert set(selected.tolist()) <= {1, 5, 9, 10}
+
+
+def test_short_recording_repeats_steps():
+    np.testing.assert_array_equal(compact_steps(np.ones(2), 4), [1, 1, 2, 2])
+    assert len(compact_steps(np.empty(0), 4)) == 0
+
+
+def test_step_times_fill_missing_steps():
+    times = step_times([journal([(1, 10, ADDED, 1), (3, 12, ADDED, 1)])], 4)
+
+    np.testing.assert_array_equal(times, [0, 0, 2, 2])
+
+
+def test_realtime_steps_clamp_gaps():
+    times = np.array([0.0, 0.5, 100.0])
+    steps = realtime_steps(times, 2, max_gap=1.0)
+
+    # step 2 starts at 0.5 s, the long pause lasts a single second
+    np.testing.assert_array_equal(steps, [1, 2, 2, 3])
@@ -0,0 +1,103 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Tests of reading point data and fingerprints of strokes."""
+
+from recorder.lib.fingerprint import (
+    COUNT,
+    BOUNDS,
+    diff_fingerprints,
+    points_fingerprints
+)
+from recorder.lib.points import read_frame_points, read_frame_points_slow
+
+import numpy as np      # type: ignore
+import pytest
+
+
+LINE = [(0, 0, 0), (1, 0, 1), (2, 0, 0)]
+
+
+def fingerprints(frame) -> list:
+    return points_fingerprints(read_frame_points(frame))
+
+
+def test_fast_and_slow_reading_agree(frame, draw):
+    draw(frame, LINE, line_width=5, hardness=0.5, use_cyclic=True)
+    draw(frame, [(3, 1, 2)], pressure=[0.5], display_mode='2DSPACE')
+
+    fast = read_frame_points(frame)
+    slow = read_frame_points_slow(frame)
+
+    for name in ('co', 'pressure', 'strength', 'offsets', 'material_index',
+                 'line_width', 'hardness', 'use_cyclic'):
+        np.testing.assert_array_equal(getattr(fast, name),
+                                      getattr(slow, name))
+    assert fast.display_mode == slow.display_mode == ['3DSPACE', '2DSPACE']
+    assert points_fingerprints(fast) == points_fingerprints(slow)
+
+
+def test_fingerprint_holds_count_and_bounds(frame, draw):
+    draw(frame, LINE)
+
+    fingerprint, = fingerprints(frame)
+
+    assert fingerprint[COUNT] == 3
+    assert fingerprint[BOUNDS] == (0, 0, 0, 2, 0, 1)
+
+
+@pytest.mark.parametrize('name, value', [
+    ('line_width', 20),
+    ('hardness', 0.25),
+    ('use_cyclic', True),
+    ('display_mode', 'SCREEN')
+])
+def test_style_change_is_modification(frame, draw, name, value):
+    stroke = draw(frame, LINE)
+    old = fingerprints(frame)
+
+    setattr(stroke, name, value)
+    diff = diff_fingerprints(old, fingerprints(frame))
+
+    assert (diff.added, diff.removed, diff.modified) == ([], [], [(0, 0)])
+
+
+def test_diff_of_added_and_removed_strokes(frame, draw):
+    first = draw(frame, LINE)
+    draw(frame, [(5, 5, 5), (6, 6, 6)])
+    old = fingerprints(frame)
+
+    frame.strokes.remove(first)
+    draw(frame, [(7, 7, 7)])
+    diff = diff_fingerprints(old, fingerprints(frame))
+
+    assert (diff.added, diff.removed, diff.modified) == ([1], [0], [])
+
+
+def test_diff_of_reordered_strokes(frame, draw):
+    draw(frame, LINE)
+    draw(frame, [(5, 5, 5)])
+    old = fingerprints(frame)
+
+    frame.strokes.reverse()
+    diff = diff_fingerprints(old, fingerprints(frame))
+
+    assert not diff.added and not diff.removed
+    assert sorted(diff.modified) == [(0, 1), (1, 0)]
+
+
+def test_unchanged_frame_has_empty_diff(frame, draw):
+    draw(frame, LINE)
+
+    assert not diff_fingerprints(fingerprints(frame), fingerprints(frame))
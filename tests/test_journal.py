@@ -0,0 +1,74 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Tests of the columnar journal of changes."""
+
+from recorder.lib.fingerprint import StrokeDiff
+from recorder.lib.journal import (
+    ADDED,
+    MIXED,
+    MODIFIED,
+    REMOVED,
+    ChangeJournal,
+    diff_kind
+)
+
+import numpy as np      # type: ignore
+
+
+def test_append_and_get():
+    journal = ChangeJournal()
+    journal.append(1, 100, 'Lines', ADDED, 2, 'Strokes added.', 'PLUS')
+    index = journal.append(2, 200, 'Fill', REMOVED, 1, 'Stroke removed.',
+                           'REMOVE')
+
+    assert len(journal) == 2
+    assert index == 1
+    assert journal.get(1) == (2, 200, 'Fill', REMOVED, 1, 'Stroke removed.',
+                              'REMOVE')
+    np.testing.assert_array_equal(journal.column('steps'), [1, 2])
+
+
+def test_strings_are_interned():
+    journal = ChangeJournal()
+    for step in range(10):
+        journal.append(step, step, 'Lines', ADDED, 1, 'Stroke added.', 'PLUS')
+
+    assert len(journal.strings) == 3
+    assert journal.memory_size() < 10 * 32
+
+
+def test_layer_changes():
+    journal = ChangeJournal()
+    journal.append(1, 0, 'Lines', ADDED, 1, 'Stroke added.', 'PLUS')
+    journal.append(2, 0, 'Fill', ADDED, 1, 'Stroke added.', 'PLUS')
+    journal.append(3, 0, 'Lines', ADDED, 1, 'Stroke added.', 'PLUS')
+
+    np.testing.assert_array_equal(journal.layer_changes('Lines'), [0, 2])
+    assert len(journal.layer_changes('Missing')) == 0
+
+
+def test_wall_time_follows_monotonic_clock():
+    journal = ChangeJournal()
+    journal.append(1, journal.start_ns + 2_000_000_000, '', ADDED, 0, '', '')
+
+    assert journal.wall_time(0) == journal.start_time + 2.0
+
+
+def test_diff_kind():
+    assert diff_kind(StrokeDiff([0, 1], [], [])) == (ADDED, 2)
+    assert diff_kind(StrokeDiff([], [3], [])) == (REMOVED, 1)
+    assert diff_kind(StrokeDiff([], [], [(0, 0)])) == (MODIFIED, 1)
+    assert diff_kind(StrokeDiff([2], [1], [])) == (MIXED, 2)
+    assert diff_kind(None) == (MIXED, 0)
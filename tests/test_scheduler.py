@@ -0,0 +1,96 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Tests of the scheduler of observing functions."""
+
+from recorder.lib.scheduler import Scheduler
+
+import bpy.app.timers as timers     # type: ignore
+import functools
+
+
+class Observer():
+    """Observer counting calls of its observing function."""
+
+    def __init__(self, interval: float, fails: bool = False) -> None:
+        self.calls = 0
+        self.func = functools.partial(observe, self, interval, fails)
+
+
+def observe(observer: Observer, interval: float, fails: bool) -> float:
+    observer.calls += 1
+    if fails:
+        raise ReferenceError('StructRNA has been removed')
+    return interval
+
+
+def scheduler() -> Scheduler:
+    return Scheduler(lambda: timers.clock[0])
+
+
+def test_observers_are_called_when_due():
+    tested = scheduler()
+    fast, slow = Observer(0.1), Observer(1.0)
+    tested.add(fast)
+    tested.add(slow)
+
+    assert tested.tick() == 0.1
+    timers.clock[0] += 0.1
+    tested.tick()
+
+    assert (fast.calls, slow.calls) == (2, 1)
+    tested.clear()
+
+
+def test_wake_makes_observer_due():
+    tested = scheduler()
+    observer = Observer(1.0)
+    tested.add(observer)
+    tested.tick()
+
+    tested.wake([observer])
+    tested.tick()
+
+    assert observer.calls == 2
+    tested.clear()
+
+
+def test_failing_observer_is_dropped():
+    tested = scheduler()
+    failing, working = Observer(0.1, fails=True), Observer(0.1)
+    tested.add(failing)
+    tested.add(working)
+
+    tested.tick()
+    timers.clock[0] += 0.1
+    tested.tick()
+
+    assert (failing.calls, working.calls) == (1, 2)
+    assert not tested.is_scheduled(failing)
+    assert tested.is_scheduled(working)
+    assert tested.report()['failures'] == 1
+    assert 'ReferenceError' in tested.failures[0]
+    tested.clear()
+
+
+def test_timer_is_unregistered_with_last_observer():
+    tested = scheduler()
+    observer = Observer(0.1)
+    tested.add(observer)
+    assert timers.is_registered(tested.callback)
+
+    tested.remove(observer)
+
+    assert not timers.is_registered(tested.callback)
+    assert tested.tick() is None
@@ -0,0 +1,123 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Tests of the append-only recording log."""
+
+from recorder.lib.storage import (
+    HEADER,
+    KIND_CHANGE,
+    KIND_STROKE,
+    MAGIC,
+    ChangeRecord,
+    RecordingLog,
+    RecordingLogReader,
+    RemoveRecord,
+    SessionRecord,
+    log_name,
+    log_path
+)
+
+import numpy as np      # type: ignore
+import pytest
+
+
+@pytest.fixture
+def write_log(log_strokes):
+    """Get function writing a session adding all strokes of a frame."""
+
+    def write(path: str, frame) -> list:
+        log = RecordingLog(path)
+        log.append_session(1000.0, 1)
+        log.append_change(1, 2.5, 'Layer', 'Stroke added.', 'PLUS')
+        keys = log_strokes(log, 1, 'Layer', frame)
+        log.append_remove(2, 'Layer', keys[0])
+        log.close()
+        return keys
+
+    return write
+
+
+def test_records_round_trip(tmp_path, frame, draw, write_log):
+    draw(frame, [(0, 0, 0), (1, 2, 3)], pressure=[0.5, 1.0],
+         line_width=7, hardness=0.5, use_cyclic=True)
+    path = str(tmp_path / 'test.arlog')
+    keys = write_log(path, frame)
+
+    reader = RecordingLogReader(path)
+    session, change, stroke, remove = reader
+
+    assert session == SessionRecord(1000.0, 1)
+    assert change == ChangeRecord(1, 2.5, 'Layer', 'Stroke added.', 'PLUS')
+    assert stroke.key == keys[0]
+    assert (stroke.line_width, stroke.hardness, stroke.use_cyclic) \
+        == (7, 0.5, True)
+    np.testing.assert_array_equal(stroke.co, [(0, 0, 0), (1, 2, 3)])
+    np.testing.assert_array_equal(stroke.pressure, [0.5, 1.0])
+    assert remove == RemoveRecord(2, 'Layer', keys[0])
+    assert [record.step for record in reader.records(KIND_STROKE)] == [1]
+    assert len(list(reader.records(KIND_CHANGE))) == 1
+
+    del stroke
+    reader.close()
+
+
+def test_incomplete_record_is_ignored(tmp_path, frame, draw, write_log):
+    draw(frame, [(0, 0, 0)])
+    path = str(tmp_path / 'test.arlog')
+    write_log(path, frame)
+
+    with open(path, 'r+b') as log_file:
+        log_file.truncate(log_file.seek(0, 2) - 1)
+
+    reader = RecordingLogReader(path)
+    assert len(reader) == 3
+    reader.close()
+
+
+def test_appending_keeps_version_of_file(tmp_path, frame, draw,
+                                         write_log):
+    draw(frame, [(0, 0, 0)], line_width=3, hardness=0.5)
+    path = str(tmp_path / 'test.arlog')
+    with open(path, 'wb') as log_file:
+        log_file.write(HEADER.pack(MAGIC, 1))
+
+    write_log(path, frame)
+
+    reader = RecordingLogReader(path)
+    stroke, = reader.records(KIND_STROKE)
+    assert reader.version == 1
+    # style of version 1 holds only the line width
+    assert (stroke.line_width, stroke.hardness, stroke.use_cyclic) \
+        == (3, 1.0, False)
+
+    del stroke
+    reader.close()
+
+
+def test_unsupported_file_is_rejected(tmp_path):
+    path = tmp_path / 'test.arlog'
+    path.write_bytes(b'not a recording log')
+
+    with pytest.raises(ValueError):
+        RecordingLogReader(str(path))
+
+
+def test_log_names_differ_by_blend_file(tmp_path):
+    first = log_name('Stroke', str(tmp_path / 'a.blend'))
+    second = log_name('Stroke', str(tmp_path / 'b' / 'a.blend'))
+
+    assert first != second
+    assert log_name('Stroke') == 'untitled-Stroke'
+    assert log_name('a/b c') == 'untitled-a_b_c'
+    assert log_path('dir', 'Stroke').endswith('untitled-Stroke.arlog')
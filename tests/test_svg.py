@@ -0,0 +1,129 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Tests of the export of recordings into an animated SVG."""
+
+from recorder.lib.columnar import ColumnarRecording, write_columnar
+from recorder.lib.database import RenderSettings
+from recorder.lib.storage import RecordingLog, RecordingLogReader
+from recorder.lib.svg import (
+    StepTimes,
+    SvgObject,
+    export_svg,
+    path_data,
+    scene_projection
+)
+
+from types import SimpleNamespace
+import bpy      # type: ignore
+import numpy as np      # type: ignore
+import pytest
+
+
+@pytest.fixture
+def svg_object(tmp_path, frame, draw, log_strokes):
+    """Get object of a recording with two sessions.
+
+        The latest session starts with a cyclic stroke, adds a faint
+        stroke on step 1 and removes it on step 2.
+    """
+
+    path = str(tmp_path / 'test.arlog')
+    cyclic = draw(frame, [(0, 0, 0), (1, 0, 1), (2, 0, 0)], use_cyclic=True)
+
+    log = RecordingLog(path)
+    log.append_session(1000.0, 1)
+    log.append_change(1, 1.0, 'Layer', 'Stroke added.', 'PLUS')
+    log_strokes(log, 1, 'Layer', frame)
+
+    log.append_session(2000.0, 1)
+    log_strokes(log, 0, 'Layer', frame)
+    frame.strokes.remove(cyclic)
+    draw(frame, [(0, 0, 2), (2, 0, 2)], strength=[0.5, 0.5])
+    log.append_change(1, 12.0, 'Layer', 'Stroke added.', 'PLUS')
+    key, = log_strokes(log, 1, 'Layer', frame)
+    log.append_change(2, 13.0, 'Layer', 'Stroke removed.', 'REMOVE')
+    log.append_remove(2, 'Layer', key)
+    log.close()
+
+    reader = RecordingLogReader(path)
+    write_columnar(reader, str(tmp_path / 'test.arcol'))
+    reader.close()
+    recording = ColumnarRecording(str(tmp_path / 'test.arcol'))
+
+    gpen = bpy.data.grease_pencils.new('Drawing')
+    gpen.layers.new('Layer')
+    gpen.materials.append(SimpleNamespace(grease_pencil=SimpleNamespace(
+        show_stroke=True,
+        color=(1.0, 0.0, 0.0, 0.8)
+    )))
+    obj = bpy.types.Object('Drawing')
+    obj.data = gpen
+    obj.matrix_world = np.eye(4)
+
+    yield SvgObject(obj, recording)
+
+    bpy.data.grease_pencils.remove(gpen)
+    recording.close()
+
+
+def test_path_data_uses_relative_units():
+    pixels = np.array([(1.0, 2.0), (2.0, 2.5), (2.01, 2.5), (0.0, 0.0)])
+
+    assert path_data(pixels) == 'M10 20l10 5 -20 -25'
+    assert path_data(pixels[:1]) == 'M10 20l0 0'
+
+
+def test_only_latest_session_is_exported(svg_object):
+    session = svg_object.session
+
+    assert session.added.tolist() == [0, 1]
+    assert session.removed.tolist() == [-1, 2]
+    assert session.times == {1: 12.0, 2: 13.0}
+
+
+def test_export(tmp_path, svg_object):
+    settings = RenderSettings()
+    output = str(tmp_path / 'test.svg')
+    projection = scene_projection(bpy.context.scene, [svg_object])
+
+    count = export_svg(output, [svg_object], projection,
+                       StepTimes(settings, svg_object.session.times))
+    with open(output, encoding='utf-8') as svg_file:
+        lines = svg_file.readlines()
+    paths = [line for line in lines if line.startswith('<path')]
+
+    assert count == len(paths) == 2
+    assert '.o0m0{stroke:#ff0000;stroke-opacity:0.800}\n' in lines
+    # strokes present at the start of the session are always shown
+    assert paths[0].endswith('z"/>\n')
+    assert 'style="stroke-opacity:0.400"' in paths[1]
+    assert 'visibility="hidden"' in paths[1]
+    assert 'end="0.042s"' in paths[1]
+
+
+def test_step_times():
+    settings = RenderSettings()
+    times = {1: 0.0, 2: 50.0, 3: 55.0}
+
+    assert StepTimes(settings, times).start(3) == 2 / settings.framerate
+
+    settings.timing = 'TIMELAPSE'
+    assert StepTimes(settings, times).start(3) \
+        == 2 * settings.target_length / 3
+
+    settings.timing = 'REALTIME'
+    realtime = StepTimes(settings, times)
+    assert realtime.start(2) == settings.max_gap
+    assert realtime.start(3) == settings.max_gap + 5 / settings.speed
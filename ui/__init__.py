@@ -17,12 +17,14 @@ from ..lib import (
     unregister_classes
 )
 from .main_panel import RECORDER_PT_main_panel
+from .stats_panel import RECORDER_PT_stats_panel
 from .layer_list import RECORDER_UL_layer_list
 from .change_list import RECORDER_UL_change_list
 
 
 classes = [
     RECORDER_PT_main_panel,
+    RECORDER_PT_stats_panel,
     RECORDER_UL_layer_list,
     RECORDER_UL_change_list,
 ]
@@ -37,6 +37,10 @@ class RECORDER_UL_change_list(UIList):
                     icon=display_icon
                 )
 
+            # time since the tracking has started
+            minutes, seconds = divmod(int(item.timestamp), 60)
+            layout.label(text=f'{ minutes }:{ seconds:02d}')
+
         elif self.layout_type in {'GRID'}:
             layout.alignment = 'CENTER'
             layout.label(text='', icon=display_icon)
@@ -60,11 +60,15 @@ class RECORDER_PT_main_panel(Panel):
 
             for line in wrapped_list:
                 layout.label(text=line)
-            layout.operator('action_recorder.start_track_active')
+            row = layout.row()
+            row.operator('action_recorder.start_track_active')
+            row.operator('action_recorder.record_settings', icon='SETTINGS')
         else:
             # gpen has been selected
 
-            gpen_observer = data.get_active_observer()
+            gpen_observer = data.get_active_observer(
+                getattr(context.object, 'data', None)
+            )
             selected_layer = gpen_observer.layers[
                 gpen_observer.get_gpen().layer_index
             ]
@@ -73,6 +77,10 @@ class RECORDER_PT_main_panel(Panel):
             )
 
             layout.label(text=f'Tracking: { gpen_observer.name }.')
+            tracked_count = len(data.get_active_observers())
+            if tracked_count > 1:
+                layout.label(text=f'Tracked objects: { tracked_count }.')
+            layout.operator('action_recorder.start_track_active')
             if gpen_observer.is_active():
                 layout.operator('action_recorder.pause_tracking')
             else:
@@ -104,6 +112,23 @@ class RECORDER_PT_main_panel(Panel):
 
             layout.separator()
             layout.label(text='Export')
-            row = layout.row()
-            row.operator('action_recorder.render')
-            row.operator('action_recorder.render_settings', icon='SETTINGS')
+            for job in (data.render_job, data.frame_render):
+                if job is not None:
+                    layout.label(text=job.status())
+            if data.is_rendering():
+                layout.operator('action_recorder.cancel_render', icon='CANCEL')
+            else:
+                row = layout.row()
+                row.operator('action_recorder.render')
+                row.operator('action_recorder.preview')
+                row.operator('action_recorder.export_svg')
+                frame_render = data.frame_render
+                if frame_render is not None and frame_render.can_resume():
+                    row.operator(
+                        'action_recorder.render',
+                        text='Resume'
+                    ).resume = True
+                row.operator(
+                    'action_recorder.render_settings',
+                    icon='SETTINGS'
+                )
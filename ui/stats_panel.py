@@ -0,0 +1,87 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+from bpy.types import Panel     # type: ignore
+
+from ..lib.scheduler import scheduler
+from ..lib.stats import stats
+from ..lib.trace import tracer
+
+
+def format_ms(seconds: float) -> str:
+    return f'{ seconds * 1000:.2f}'
+
+
+class RECORDER_PT_stats_panel(Panel):
+    """Collapsible section with statistics of observers and recording."""
+
+    bl_idname = "RECORDER_PT_stats_panel"
+    bl_label = "Statistics"
+    bl_category = "Recorder"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = 'UI'
+    bl_parent_id = "RECORDER_PT_main_panel"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+
+        layout.operator(
+            'action_recorder.toggle_stats',
+            text='Stop collecting' if stats.enabled else 'Start collecting',
+            depress=stats.enabled
+        )
+
+        report = scheduler.report()
+        layout.label(text=f'Scheduled observers: { report["observers"] }.')
+        layout.label(
+            text=f'Ticks: { report["ticks"] }, mean '
+                 f'{ format_ms(report["mean"]) } ms, max '
+                 f'{ format_ms(report["max"]) } ms.'
+        )
+        if scheduler.failures:
+            layout.label(
+                text=f'Dropped observers: { report["failures"] }, last '
+                     f'{ scheduler.failures[-1] }.',
+                icon='ERROR'
+            )
+
+        if stats.histograms:
+            grid = layout.grid_flow(columns=5, even_columns=False)
+            for heading in ('Path', 'Count', 'Mean', 'p95', 'Max'):
+                grid.label(text=heading)
+            for name, histogram in sorted(stats.histograms.items()):
+                grid.label(text=name)
+                grid.label(text=str(histogram.count))
+                grid.label(text=format_ms(histogram.mean()))
+                grid.label(text=format_ms(histogram.percentile(0.95)))
+                grid.label(text=format_ms(histogram.max))
+            layout.label(text='Times are in milliseconds.')
+
+        for name, count in sorted(stats.counters.items()):
+            layout.label(text=f'{ name }: { count }')
+
+        row = layout.row()
+        row.operator('action_recorder.reset_stats')
+        row.operator('action_recorder.dump_stats', icon='EXPORT')
+
+        layout.separator()
+        row = layout.row()
+        row.operator(
+            'action_recorder.toggle_trace',
+            text='Stop tracing' if tracer.enabled else 'Start tracing',
+            depress=tracer.enabled
+        )
+        row.operator('action_recorder.export_trace', icon='EXPORT')
+        layout.label(text=f'Traced events: { len(tracer) }.')